@@ -0,0 +1,278 @@
+"""
+Scaling benchmarks for the BioSim simulation core.
+
+Times Map construction, the yearly cycle with and without an event log, carnivore
+feeding, migration and a full BioSim.simulate run over a matrix of island sizes and population
+sizes, and writes the results as JSON. Use compare.py to check a result file against a
+baseline. Timings depend on the machine, so no baseline is committed: write one from the
+reference commit on the same machine before the run to check.
+
+:Example:
+    .. code-block:: none
+
+        git switch --detach <reference commit>
+        python benchmarks/bench_core.py --preset quick --output baseline.json
+        git switch -
+        python benchmarks/bench_core.py --preset quick --output bench.json
+        python benchmarks/compare.py baseline.json bench.json
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import argparse
+import datetime
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from biosim.landscape import Lowland
+from biosim.fauna import Herbivore, Carnivore
+from biosim.event_log import EventLog
+from biosim.island_generator import IslandGenerator
+from biosim.map import Map
+from biosim.simulation import BioSim
+
+# Side lengths of the square islands and total number of animals in the matrix.
+PRESETS = {
+    'quick': {'sizes': [3, 10, 30], 'populations': [10, 100, 1000]},
+    'default': {'sizes': [3, 10, 30, 100], 'populations': [10, 100, 1000, 10000]},
+    'full': {'sizes': [3, 10, 30, 100, 300, 1000],
+             'populations': [10, 100, 1000, 10000, 100000, 1000000, 10000000]},
+}
+
+CASES = ('map_init', 'add_population', 'add_population_arrays', 'yearly_cycle',
+         'event_log', 'feed_carnivore', 'animal_migrate', 'simulate')
+
+# Share of carnivores in the generated populations.
+CARNIVORE_SHARE = 0.1
+
+
+def make_island(size):
+    """This function returns a square island of Lowland surrounded by one row of Water.
+
+    Parameters:
+    ------------
+        size: int
+            Number of rows and columns, at least 3.
+
+    Returns:
+    ----------
+        str
+    """
+    return IslandGenerator(seed=size).island_map(size, size, land_fraction=1.0, lowland=1,
+                                                 highland=0, desert=0)
+
+
+def make_population(size, animals):
+    """This function spreads the animals evenly over the livable cells of make_island(size).
+
+    Parameters:
+    ------------
+        size: int
+        animals: int
+
+    Returns:
+    ----------
+        List of dictionaries in the ini_pop format of BioSim.
+    """
+    livable = (size - 2) ** 2
+    carnivores = int(animals * CARNIVORE_SHARE)
+    return IslandGenerator(seed=animals).population(
+        make_island(size), herbivore_density=(animals - carnivores) / livable,
+        carnivore_density=carnivores / livable, exact=True)
+
+
+def fill_cell(cell, animals):
+    """This function puts `animals` animals into one landscape cell."""
+    carnivores = int(animals * CARNIVORE_SHARE)
+    cell.initial_population['Herbivore'] = [Herbivore(5, 20) for _ in range(animals - carnivores)]
+    cell.initial_population['Carnivore'] = [Carnivore(5, 20) for _ in range(carnivores)]
+
+
+def time_call(setup, func, repeat):
+    """This function calls setup() and then times func(state) `repeat` times.
+
+    Returns:
+    ----------
+        List of wall times in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        func(state)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_case(case, size, animals, repeat, years):
+    """This function runs one benchmark case.
+
+    Parameters:
+    ------------
+        case: str
+            One of CASES.
+        size: int
+        animals: int
+        repeat: int
+        years: int
+            Number of years for the yearly_cycle and simulate cases.
+
+    Returns:
+    ----------
+        List of wall times in seconds. Times of the yearly_cycle and simulate cases are per year.
+    """
+    random.seed(12345)
+    island = make_island(size)
+
+    if case == 'map_init':
+        return time_call(lambda: None, lambda _: Map(island), repeat)
+
+    if case == 'add_population':
+        population = make_population(size, animals)
+        return time_call(lambda: Map(island),
+                         lambda island_map: island_map.add_population(population), repeat)
+
+    if case == 'add_population_arrays':
+        columns = Map.population_arrays(make_population(size, animals))
+        return time_call(lambda: Map(island),
+                         lambda island_map: island_map.add_population_arrays(*columns), repeat)
+
+    if case in ('yearly_cycle', 'event_log'):
+        def setup():
+            island_map = Map(island)
+            island_map.add_population(make_population(size, animals))
+            return island_map
+
+        def cycle(island_map):
+            for _ in range(years):
+                island_map.yearly_cycle()
+
+        if case == 'yearly_cycle':
+            return [t / years for t in time_call(setup, cycle, repeat)]
+
+        # The same cycle with every event written to a log, the log is closed within the time.
+        with tempfile.TemporaryDirectory() as directory:
+            def logged_setup():
+                island_map = setup()
+                event_log = EventLog(directory + '/events.bin')
+                island_map.attach_event_log(event_log)
+                return island_map, event_log
+
+            def logged_cycle(state):
+                cycle(state[0])
+                state[1].close()
+
+            return [t / years for t in time_call(logged_setup, logged_cycle, repeat)]
+
+    if case == 'feed_carnivore':
+        def setup():
+            cell = Lowland()
+            fill_cell(cell, animals)
+            return cell
+
+        return time_call(setup, lambda cell: cell.feed_carnivore(), repeat)
+
+    if case == 'animal_migrate':
+        def setup():
+            cell = Lowland()
+            fill_cell(cell, animals)
+            return cell, [Lowland() for _ in range(4)]
+
+        return time_call(setup, lambda state: state[0].animal_migrate(state[1]), repeat)
+
+    if case == 'simulate':
+        def setup():
+            return BioSim(island, make_population(size, animals), seed=12345, vis_years=0)
+
+        # simulate(years) runs the years 0 to years, one more than it is asked for.
+        return [t / (years + 1)
+                for t in time_call(setup, lambda sim: sim.simulate(years), repeat)]
+
+    raise ValueError('Unknown benchmark case: ' + str(case))
+
+
+def git_commit():
+    """Return the current git commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(cases, sizes, populations, repeat=3, years=5, max_seconds=10.0, log=print):
+    """This function runs all cases over the size and population matrix. Within one case and
+    island size, larger populations are skipped once a run took longer than `max_seconds`, and
+    larger islands are skipped once the smallest population exceeded it.
+
+    Returns:
+    ----------
+        dict with the keys 'meta' and 'results', ready to be written as JSON.
+    """
+    results = []
+    for case in cases:
+        size_over_budget = False
+        for size in sizes:
+            over_budget = size_over_budget
+            # map_init does not depend on the population size.
+            case_populations = populations[:1] if case == 'map_init' else populations
+            for number, animals in enumerate(case_populations):
+                entry = {'case': case, 'size': size, 'animals': animals}
+                if over_budget:
+                    entry['status'] = 'skipped'
+                    results.append(entry)
+                    continue
+
+                start = time.perf_counter()
+                times = run_case(case, size, animals, repeat, years)
+                elapsed = time.perf_counter() - start
+                entry.update({'status': 'ok', 'repeat': repeat,
+                              'best_s': min(times), 'median_s': statistics.median(times)})
+                results.append(entry)
+                log(f"{case:>15} {size:>5}x{size:<5} {animals:>9} animals: "
+                    f"median {entry['median_s']:.6f} s")
+
+                if elapsed > max_seconds:
+                    over_budget = True
+                    size_over_budget = size_over_budget or number == 0
+
+    meta = {'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'commit': git_commit(),
+            'repeat': repeat,
+            'years': years,
+            'max_seconds': max_seconds}
+    return {'meta': meta, 'results': results}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--preset', choices=PRESETS, default='default')
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES))
+    parser.add_argument('--sizes', nargs='+', type=int, help='island side lengths (>= 3)')
+    parser.add_argument('--populations', nargs='+', type=int, help='total numbers of animals')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=10.0,
+                        help='skip larger cases once a case takes longer than this')
+    parser.add_argument('--output', default='bench_results.json')
+    args = parser.parse_args()
+
+    sizes = args.sizes or PRESETS[args.preset]['sizes']
+    populations = args.populations or PRESETS[args.preset]['populations']
+    if min(sizes) < 3:
+        parser.error('island sizes must be at least 3')
+
+    suite = run_suite(args.cases, sizes, populations, args.repeat, args.years, args.max_seconds)
+    with open(args.output, 'w') as fh:
+        json.dump(suite, fh, indent=2)
+    print('results written to ' + args.output)
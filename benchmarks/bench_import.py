@@ -0,0 +1,76 @@
+"""
+Import-time benchmark for the BioSim package.
+
+Measures how long a fresh interpreter needs for ``import biosim.simulation`` and which
+heavy modules get loaded on the way. Headless batch workers pay this cost once per job.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+
+_HEAVY_MODULES = ('matplotlib', 'matplotlib.pyplot', 'mpl_toolkits', 'scipy')
+
+_PROBE = """\
+import sys, time, resource
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(repr((elapsed, heavy, rss)))
+"""
+
+
+def measure_import(module='biosim.simulation', repeat=5):
+    """This function imports the module in `repeat` fresh interpreters.
+
+    Parameters:
+    ------------
+        module: str
+        repeat: int
+
+    Returns:
+    ----------
+        dict with the import times in seconds, the peak RSS in kB and the heavy modules loaded.
+    """
+    times = []
+    rss = []
+    heavy = []
+    probe = _PROBE.format(module=module, heavy=_HEAVY_MODULES)
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', probe], text=True)
+        elapsed, heavy, max_rss = ast.literal_eval(output.strip().splitlines()[-1])
+        times.append(elapsed)
+        rss.append(max_rss)
+
+    return {'module': module,
+            'repeat': repeat,
+            'median_s': statistics.median(times),
+            'min_s': min(times),
+            'max_rss_kb': max(rss),
+            'heavy_modules': heavy}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--module', default='biosim.simulation')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write the result as JSON to this file')
+    args = parser.parse_args()
+
+    result = measure_import(args.module, args.repeat)
+    print(f"import {result['module']}: median {result['median_s'] * 1e3:.1f} ms, "
+          f"min {result['min_s'] * 1e3:.1f} ms, peak RSS {result['max_rss_kb']} kB")
+    if result['heavy_modules']:
+        print('heavy modules loaded: ' + ', '.join(result['heavy_modules']))
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(result, fh, indent=2)
@@ -0,0 +1,84 @@
+"""
+Compare a BioSim benchmark result file against a stored baseline.
+
+Cases are matched on (case, size, animals). A case is flagged as a regression when its
+median time grew by more than the threshold. The exit code is 1 if any regression is found,
+so the script can be used as a CI gate. Both files have to come from the same machine, see
+bench_core.py for writing the baseline.
+
+:Example:
+    .. code-block:: none
+
+        python benchmarks/compare.py baseline.json bench_results.json --threshold 0.2
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import argparse
+import json
+import sys
+
+
+def load_results(file_name):
+    """This function reads a result file written by bench_core.py.
+
+    Returns:
+    ----------
+        dict mapping (case, size, animals) to the median time in seconds of the finished cases.
+    """
+    with open(file_name) as fh:
+        suite = json.load(fh)
+    return {(entry['case'], entry['size'], entry['animals']): entry['median_s']
+            for entry in suite['results'] if entry.get('status') == 'ok'}
+
+
+def compare(baseline, current, threshold=0.2):
+    """This function compares the median times of the cases found in both result sets.
+
+    Parameters:
+    ------------
+        baseline: dict
+        current: dict
+            As returned by load_results().
+        threshold: float
+            Allowed relative slow-down, 0.2 means 20 % slower.
+
+    Returns:
+    ----------
+        List of dicts with the keys case, size, animals, baseline_s, current_s, ratio and
+        status ('regression', 'improvement' or 'ok'), sorted by the ratio, worst first.
+    """
+    rows = []
+    for key in sorted(set(baseline) & set(current)):
+        ratio = current[key] / baseline[key] if baseline[key] > 0 else float('inf')
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 / (1 + threshold):
+            status = 'improvement'
+        else:
+            status = 'ok'
+        case, size, animals = key
+        rows.append({'case': case, 'size': size, 'animals': animals,
+                     'baseline_s': baseline[key], 'current_s': current[key],
+                     'ratio': ratio, 'status': status})
+    return sorted(rows, key=lambda row: row['ratio'], reverse=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed relative slow-down before a case is flagged')
+    args = parser.parse_args()
+
+    rows = compare(load_results(args.baseline), load_results(args.current), args.threshold)
+    for row in rows:
+        print(f"{row['status']:>11} {row['case']:>15} {row['size']:>5} {row['animals']:>9} "
+              f"{row['baseline_s']:.6f} s -> {row['current_s']:.6f} s  x{row['ratio']:.2f}")
+
+    regressions = [row for row in rows if row['status'] == 'regression']
+    print(f"{len(rows)} cases compared, {len(regressions)} regressions")
+    sys.exit(1 if regressions else 0)
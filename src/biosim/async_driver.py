@@ -0,0 +1,185 @@
+"""
+This is the asyncio driver model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import asyncio
+import random
+from concurrent.futures import ProcessPoolExecutor
+from biosim.map import Map
+
+
+def advance(sim, num_years, every, matrices, histograms):
+    """This function simulates a batch of years, see BioSim.iter_years().
+
+    Returns:
+    ----------
+    list of YearSnapshot
+    """
+    return list(sim.iter_years(num_years, every=every, matrices=matrices,
+                               histograms=histograms))
+
+
+def advance_copy(sim, random_state, parameters, num_years, every, matrices, histograms):
+    """This function simulates a batch of years on a copy of the simulation in a worker
+    process, with the random module in the given state and the given animal and landscape
+    parameters, see Map.parameter_state().
+
+    Returns:
+    ----------
+    tuple with the simulation, the state of the random module, the parameters at the end of
+    the batch and the list of YearSnapshot.
+    """
+    random.setstate(random_state)
+    Map.restore_parameters(parameters)
+    snapshots = advance(sim, num_years, every, matrices, histograms)
+    return sim, random.getstate(), Map.parameter_state(), snapshots
+
+
+class AsyncSimulation:
+    """The AsyncSimulation runs a headless BioSim in an executor and publishes its snapshots
+    through an async iterator, so an event loop stays responsive while it supervises many
+    simulations.
+
+    :Example:
+        .. code-block:: python
+
+            async def supervise(sim):
+                driver = AsyncSimulation(sim)
+                async for snapshot in driver.run(1000, every=10, batch=5):
+                    if snapshot.totals['Carnivore'] == 0:
+                        driver.cancel()
+
+            await asyncio.gather(*(supervise(sim) for sim in sims))
+
+    .. note::
+
+        - Without an executor, the batches run in the default thread pool of the event loop
+          and change `sim` in place. Simulations running in threads at the same time share
+          the random module, their results depend on the scheduling.
+        - With a ProcessPoolExecutor, each batch runs on a pickled copy of the simulation,
+          which replaces `sim` when the batch is done. The driver sends its own state of the
+          random module and the animal and landscape parameters with every batch, and
+          takes them back with the results. A worker process may run batches of several
+          drivers, so the results do not depend on which worker runs a batch. The parameters
+          are class attributes, the driver also restores them in the parent process after
+          every batch, so drivers with different parameters should not share a process.
+        - pause() takes effect after the running batch, cancel() also drops the snapshots of
+          the batch which were not yielded yet. Cancelling the task which iterates also
+          waits for the running batch, so `sim` stays consistent.
+    """
+
+    def __init__(self, sim, executor=None):
+        """Constructor for AsyncSimulation class.
+
+        Parameters:
+        ------------
+            sim: BioSim
+            executor: concurrent.futures.Executor
+                Executor running the batches, None for the default thread pool.
+        """
+        self.sim = sim
+        self.executor = executor
+        self.random_state = random.getstate()
+        self.parameters = Map.parameter_state()
+        self.cancelled = False
+        self.running = asyncio.Event()
+        self.running.set()
+
+    @property
+    def paused(self):
+        """True while the driver is paused."""
+        return not self.running.is_set()
+
+    def pause(self):
+        """This method stops the driver before the next batch until resume() is called."""
+        self.running.clear()
+
+    def resume(self):
+        """This method continues a paused driver."""
+        self.running.set()
+
+    def cancel(self):
+        """This method ends the run after the running batch, also when paused."""
+        self.cancelled = True
+        self.running.set()
+
+    async def run_batch(self, num_years, every, matrices, histograms):
+        """This method simulates a batch of years in the executor.
+
+        Returns:
+        ----------
+        list of YearSnapshot
+        """
+        loop = asyncio.get_running_loop()
+        if isinstance(self.executor, ProcessPoolExecutor):
+            future = loop.run_in_executor(self.executor, advance_copy, self.sim,
+                                          self.random_state, self.parameters, num_years,
+                                          every, matrices, histograms)
+        else:
+            future = loop.run_in_executor(self.executor, advance, self.sim, num_years, every,
+                                          matrices, histograms)
+        try:
+            result = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # The batch can not be interrupted, wait for it before the task ends.
+            result = await future
+            if isinstance(self.executor, ProcessPoolExecutor):
+                self.take_copy(*result)
+            raise
+        if isinstance(self.executor, ProcessPoolExecutor):
+            result = self.take_copy(*result)
+        return result
+
+    def take_copy(self, sim, random_state, parameters, snapshots):
+        """This method takes over the simulation, the random state and the parameters
+        returned by advance_copy(), and sets the parameters in this process.
+
+        Returns:
+        ----------
+        list of YearSnapshot
+        """
+        self.sim, self.random_state, self.parameters = sim, random_state, parameters
+        Map.restore_parameters(parameters)
+        return snapshots
+
+    async def run(self, num_years, every=1, batch=1, matrices=False, histograms=False):
+        """This method simulates num_years years and yields a snapshot after every `every`
+        years. Control returns to the event loop after every batch.
+
+        Parameters:
+        ------------
+            num_years: int
+            every: int
+                Years between two snapshots.
+            batch: int
+                Snapshots per batch, a batch simulates every * batch years.
+            matrices: boolean
+            histograms: boolean
+                See BioSim.iter_years().
+
+        Returns:
+        ----------
+        async iterator of YearSnapshot
+
+        Raises:
+        ----------
+        ValueError if every or batch are not positive.
+        """
+        if every < 1 or batch < 1:
+            raise ValueError("every and batch must be positive.")
+        self.cancelled = False
+        remaining = num_years
+        while remaining > 0:
+            await self.running.wait()
+            if self.cancelled:
+                return
+            years = min(every * batch, remaining)
+            for snapshot in await self.run_batch(years, every, matrices, histograms):
+                if self.cancelled:
+                    return
+                yield snapshot
+            remaining -= years
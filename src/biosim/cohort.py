@@ -0,0 +1,580 @@
+"""
+This is the cohort model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import math
+import time
+import numpy as np
+from biosim.map import Map
+from biosim.super_individual import fitness_array, birth_weight_params
+
+
+class CohortMap(Map):
+    """The CohortMap simulates the island on population level. Every livable cell holds, per
+    species, a histogram of animal counts over (age, weight bin) cohorts, and the rules of the
+    individual engine are applied to whole cohorts. The cost of a year depends on the number of
+    cells and cohorts only, not on the number of animals.
+
+    :Example:
+        .. code-block:: python
+
+            sim = BioSim(island_map, ini_pop, seed=1, vis_years=0, engine='cohort')
+            sim.simulate(10000)
+            sim.switch_engine('individual')
+
+    .. note::
+
+        - With `stochastic=False` all transitions use expected values and the counts are
+          real numbers, with `stochastic=True` they are drawn binomially and stay integers.
+        - Weights live on a grid of bin centres `weight_step` apart. A weight between two
+          centres is split linearly between them, which keeps the number and the total weight
+          of the animals. Weights above `max_weight` and ages above `max_age` are kept in the
+          last bin.
+        - Predation works on fitness classes of width 1 / `fitness_classes`. The carnivore
+          classes hunt in order of descending fitness, every herbivore is attacked by all
+          carnivores of the class which are still hungry, and the carnivores of a class are
+          fed one after the other until each has had 'F'.
+        - Migration moves the share mu * fitness of every cohort, a quarter to each neighbour;
+          the share directed towards Water stays.
+    """
+
+    species = ('Herbivore', 'Carnivore')
+    animals_in_cells = False  # quantile sketches are made from the value arrays
+
+    def __init__(self, island_map, seed=None, stochastic=False, max_age=60, weight_step=2.0,
+                 max_weight=300.0, fitness_classes=20):
+        """Constructor for CohortMap class.
+
+        Parameters:
+        ------------
+            island_map: str
+            seed: int
+                Seed of the random number generator used by the engine.
+            stochastic: boolean
+                True for binomially drawn transitions, False for expected values.
+            max_age: int
+                Oldest age cohort.
+            weight_step: float
+                Distance of the weight bins.
+            max_weight: float
+                Centre of the heaviest weight bin, at least.
+            fitness_classes: int
+                Number of fitness classes used for predation.
+        """
+        if max_age < 1 or weight_step <= 0 or max_weight <= weight_step or fitness_classes < 1:
+            raise ValueError("The cohort grid needs max_age >= 1, weight_step > 0, "
+                             "max_weight > weight_step and fitness_classes >= 1.")
+        super().__init__(island_map)
+        self.rng = np.random.default_rng(seed)
+        self.stochastic = stochastic
+        self.ages = np.arange(max_age + 1)
+        self.weight_step = weight_step
+        self.weights = (np.arange(math.ceil(max_weight / weight_step) + 1) + 0.5) * weight_step
+        self.fitness_classes = fitness_classes
+        self.cell_codes = self.landscape_grid[self.livable_locs[:, 0], self.livable_locs[:, 1]]
+        self.counts = {species: np.zeros(self.leading_shape + self.cohort_shape)
+                       for species in self.species}
+
+    @property
+    def leading_shape(self):
+        """Shape of the axes in front of the cell axis of the count arrays."""
+        return ()
+
+    @property
+    def cohort_shape(self):
+        """Shape (cells, ages, weight bins) of the count arrays of one species."""
+        return len(self.livable_locs), len(self.ages), len(self.weights)
+
+    def island_counts(self, species):
+        """Return the counts of one species of shape cohort_shape which the getters report."""
+        return self.counts[species]
+
+    def create_cells(self):
+        """The cohort engine keeps no landscape objects, all animals are counted in cohorts.
+
+        Returns:
+        ----------
+        dict
+        """
+        return {}
+
+    def create_livable_neighbours(self):
+        """The cohort engine uses neighbour_table instead of neighbour cells.
+
+        Returns:
+        ----------
+        dict
+        """
+        return {}
+
+    def params(self, species):
+        """Return the current parameter dict of the species."""
+        return self.animal_classes[species].parameters
+
+    def fitness_grid(self, species):
+        """This method returns the fitness of every (age, weight bin) cohort.
+
+        Returns:
+        ----------
+        numpy.ndarray of shape (ages, weight bins)
+        """
+        return fitness_array(self.ages[:, None], self.weights[None, :], self.params(species))
+
+    def fodder(self):
+        """This method returns the fodder available in every livable cell at the start of the
+        feeding.
+
+        Returns:
+        ----------
+        numpy.ndarray
+        """
+        fodder_by_code = np.array([self.landscape_classes[letter].parameters.get('f_max', 0.0)
+                                   for letter in self.landscape_letters])
+        return fodder_by_code[self.cell_codes]
+
+    def bin_position(self, weight):
+        """This method locates weights on the weight grid.
+
+        Parameters:
+        ------------
+            weight: numpy.ndarray
+
+        Returns:
+        ----------
+            tuple (low, fraction), every weight lies between the bins low and low + 1, the
+            share `fraction` belongs to low + 1.
+        """
+        position = np.clip((weight - self.weights[0]) / self.weight_step, 0,
+                           len(self.weights) - 1)
+        low = np.minimum(np.floor(position).astype(np.int64), len(self.weights) - 2)
+        return low, position - low
+
+    def sample(self, counts, prob):
+        """This method draws how many animals of each cohort are affected by a transition with
+        probability prob, or returns the expected number.
+
+        Parameters:
+        ------------
+            counts: numpy.ndarray
+            prob: numpy.ndarray
+                Broadcastable to counts.
+
+        Returns:
+        ----------
+        numpy.ndarray of the shape of counts
+        """
+        prob = np.clip(np.broadcast_to(prob, counts.shape), 0, 1)
+        if self.stochastic:
+            drawn = np.zeros(counts.shape)
+            occupied = counts > 0
+            drawn[occupied] = self.rng.binomial(counts[occupied].astype(np.int64),
+                                                prob[occupied])
+            return drawn
+        return counts * prob
+
+    def rebin(self, counts, new_weight):
+        """This method moves the animals of every weight bin to the bins around the new weight
+        of that bin.
+
+        Parameters:
+        ------------
+            counts: numpy.ndarray
+                Counts with the weight bins on the last axis.
+            new_weight: numpy.ndarray
+                New weight of the animals of every weight bin.
+
+        Returns:
+        ----------
+        numpy.ndarray of the shape of counts
+        """
+        low, fraction = self.bin_position(new_weight)
+        n_bins = len(self.weights)
+        up = self.sample(counts, fraction)
+        rows = np.arange(counts.size // n_bins).reshape(counts.shape[:-1] + (1,)) * n_bins
+        target = np.concatenate([(rows + low).ravel(), (rows + low + 1).ravel()])
+        moved = np.bincount(target, np.concatenate([(counts - up).ravel(), up.ravel()]),
+                            minlength=counts.size)
+        return moved.reshape(counts.shape)
+
+    def newborn_weights(self, species):
+        """This method discretises the log-normal birth weight of Fauna.weight_default() for
+        every weight bin of the parent.
+
+        Returns:
+        ----------
+            tuple (p_able, child_dist, parent_weight) with, per parent bin, the probability that
+            the child is light enough to be born, the weight bin distribution of the children
+            born and the weight of the parent after the birth.
+        """
+        params = self.params(species)
+        mu, sigma = birth_weight_params(params)
+        edges = np.append(self.weights - self.weight_step / 2, np.inf)
+        with np.errstate(divide='ignore'):
+            z = (np.log(edges) - mu) / (sigma * math.sqrt(2))
+        cdf = 0.5 * (1 + np.vectorize(math.erf)(z))
+        child_pmf = np.diff(cdf)
+
+        allowed = params['xi'] * self.weights[None, :] <= self.weights[:, None]
+        joint = child_pmf[None, :] * allowed
+        p_able = joint.sum(axis=1)
+        child_dist = np.divide(joint, p_able[:, None], out=np.zeros_like(joint),
+                               where=p_able[:, None] > 0)
+        parent_weight = self.weights - params['xi'] * (child_dist @ self.weights)
+        return p_able, child_dist, parent_weight
+
+    def distribute(self, counts, dist):
+        """This method spreads counts over the columns of a row-stochastic matrix.
+
+        Parameters:
+        ------------
+            counts: numpy.ndarray
+                Counts with the rows of dist on the last axis.
+            dist: numpy.ndarray
+
+        Returns:
+        ----------
+        numpy.ndarray with the columns of dist on the last axis.
+        """
+        if not self.stochastic:
+            return counts @ dist
+        result = np.zeros(counts.shape[:-1] + (dist.shape[1],))
+        for row in np.flatnonzero(counts.reshape(-1, counts.shape[-1]).sum(axis=0)):
+            if dist[row].sum() > 0:
+                result += self.rng.multinomial(counts[..., row].astype(np.int64),
+                                               dist[row] / dist[row].sum())
+        return result
+
+    def give_birth(self):
+        """This method lets every cohort give birth with the probability of Fauna.birth_prob()
+        and puts the newborns into the age 0 cohorts.
+        """
+        for species in self.species:
+            counts, params = self.counts[species], self.params(species)
+            number = counts.sum(axis=(-2, -1))[..., None, None]
+            prob = np.where(number > 1,
+                            np.minimum(1, params['gamma'] * self.fitness_grid(species) *
+                                       (number - 1)), 0.0)
+            prob = prob * (self.weights >= params['zeta'] *
+                           (params['w_birth'] + params['sigma_birth']))
+            p_able, child_dist, parent_weight = self.newborn_weights(species)
+            births = self.sample(counts, prob * p_able)
+
+            newborns = self.distribute(births.sum(axis=-2), child_dist)
+            counts += self.rebin(births, parent_weight) - births
+            counts[..., 0, :] += newborns
+
+    def feed_herbivores(self):
+        """This method lets as many herbivores of every cell eat 'F' as the fodder allows, the
+        fed animals are a random share of every cohort.
+        """
+        counts, params = self.counts['Herbivore'], self.params('Herbivore')
+        number = counts.sum(axis=(-2, -1))
+        can_eat = np.floor(self.fodder() / params['F']) if params['F'] > 0 else np.inf
+        share = np.divide(can_eat, number, out=np.ones_like(number), where=number > can_eat)
+        fed = self.sample(counts, share[..., None, None])
+        counts += self.rebin(fed, self.weights + params['beta'] * params['F']) - fed
+
+    def fitness_class(self, species):
+        """Return the fitness class of every (age, weight bin) cohort of the species."""
+        return np.minimum((self.fitness_grid(species) * self.fitness_classes).astype(np.int64),
+                          self.fitness_classes - 1)
+
+    def class_totals(self, counts, classes, values=None):
+        """This method sums counts, or counts times values, per fitness class and cell.
+
+        Returns:
+        ----------
+        numpy.ndarray of shape leading + (cells, fitness classes)
+        """
+        one_hot = np.zeros((classes.size, self.fitness_classes))
+        one_hot[np.arange(classes.size), classes.ravel()] = 1
+        flat = counts if values is None else counts * values
+        return flat.reshape(flat.shape[:-2] + (-1,)) @ one_hot
+
+    def feed_carnivores(self):
+        """This method lets the carnivores of every fitness class prey on the herbivores of
+        lower fitness classes, see the class notes.
+        """
+        herbs, carns = self.counts['Herbivore'], self.counts['Carnivore']
+        c_params = self.params('Carnivore')
+        appetite, delta_phi_max = c_params['F'], c_params['DeltaPhiMax']
+        h_class, c_class = self.fitness_class('Herbivore'), self.fitness_class('Carnivore')
+
+        prey = self.class_totals(herbs, h_class)
+        prey_weight = np.divide(self.class_totals(herbs, h_class, self.weights), prey,
+                                out=np.zeros_like(prey), where=prey > 0)
+        hunters = self.class_totals(carns, c_class)
+        centres = (np.arange(self.fitness_classes) + 0.5) / self.fitness_classes
+        left = prey.copy()
+        fed_share = np.zeros_like(hunters)
+
+        present = np.flatnonzero(prey.reshape(-1, self.fitness_classes).sum(axis=0) > 0)
+        for hunter in range(self.fitness_classes - 1, 0, -1):
+            number = hunters[..., hunter, None]
+            targets = present[present < hunter]
+            if targets.size == 0 or not np.any(number > 0):
+                continue
+            p_kill = np.minimum(1.0, (centres[hunter] - centres[targets]) / delta_phi_max)
+            available, weight = left[..., targets], prey_weight[..., targets]
+
+            # Expected kills of one carnivore, and their food, before each prey class.
+            chances = p_kill * available
+            exposure = np.cumsum(chances, axis=-1) - chances
+            exposure_food = np.cumsum(chances * weight, axis=-1) - chances * weight
+            mean_weight = np.divide(exposure_food, exposure, out=weight.copy(),
+                                    where=exposure > 0)
+            needed = np.ceil(np.divide(appetite, mean_weight, out=np.ones_like(weight),
+                                       where=mean_weight > 0))
+            hungry = number * self.poisson_below(exposure, needed)
+            kills = available * (1 - (1 - p_kill) ** hungry)
+
+            # The class stops eating once every carnivore had 'F'.
+            food = kills * weight
+            before = np.cumsum(food, axis=-1) - food
+            kills *= np.clip(np.divide(number * appetite - before, food,
+                                       out=np.zeros_like(food), where=food > 0), 0, 1)
+            if self.stochastic:
+                kills = np.floor(kills + self.rng.random(kills.shape))
+            left[..., targets] -= kills
+            # Carnivores with 'F' = 0 have no hunger to satisfy, they count as fed.
+            fed_share[..., hunter] = np.divide((kills * weight).sum(axis=-1),
+                                               number[..., 0] * appetite,
+                                               out=np.full(number.shape[:-1],
+                                                           float(appetite <= 0)),
+                                               where=(number[..., 0] > 0) & (appetite > 0))
+
+        killed_share = np.divide(prey - left, prey, out=np.zeros_like(prey), where=prey > 0)
+        herbs -= self.sample(herbs, killed_share[..., h_class])
+        fed = self.sample(carns, fed_share[..., c_class])
+        carns += self.rebin(fed, self.weights + c_params['beta'] * appetite) - fed
+
+    @staticmethod
+    def poisson_below(mean, limit, terms=50):
+        """This method returns P(X < limit) for Poisson distributed X.
+
+        Parameters:
+        ------------
+            mean: numpy.ndarray
+            limit: numpy.ndarray
+            terms: int
+                Largest limit taken into account.
+
+        Returns:
+        ----------
+        numpy.ndarray
+        """
+        term = np.exp(-mean)
+        below = np.zeros(np.shape(mean))
+        for k in range(min(int(np.max(limit, initial=0)), terms)):
+            below += np.where(k < limit, term, 0.0)
+            term = term * mean / (k + 1)
+        return np.minimum(below, 1.0)
+
+    def migrate(self):
+        """This method moves the share mu * fitness of every cohort to the neighbours."""
+        for species in self.species:
+            counts, params = self.counts[species], self.params(species)
+            movers = self.sample(counts, params['mu'] * self.fitness_grid(species))
+            arrivals = np.zeros_like(counts)
+            left = movers
+            for direction in range(4):
+                to_direction = self.sample(left, 1 / (4 - direction))
+                left = left - to_direction
+                source = np.flatnonzero(self.neighbour_table[:, direction] >= 0)
+                destination = self.neighbour_table[source, direction]
+                arrivals[..., destination, :, :] += to_direction[..., source, :, :]
+                counts[..., source, :, :] -= to_direction[..., source, :, :]
+            counts += arrivals
+
+    def age_animals(self):
+        """This method moves every cohort to the next age, the oldest cohort stays."""
+        for species in self.species:
+            counts = self.counts[species]
+            oldest = counts[..., -1, :].copy()
+            counts[..., 1:, :] = counts[..., :-1, :]
+            counts[..., 0, :] = 0
+            counts[..., -1, :] += oldest
+
+    def lose_weight(self):
+        """This method reduces the weight of all animals by the factor 'eta'."""
+        for species in self.species:
+            self.counts[species] = self.rebin(self.counts[species],
+                                              self.weights * (1 - self.params(species)['eta']))
+
+    def die(self):
+        """This method removes the share omega * (1 - fitness) of every cohort, or the whole
+        cohort if its fitness is 0.
+        """
+        for species in self.species:
+            params = self.params(species)
+            fitness = self.fitness_grid(species)
+            prob = np.where(fitness == 0, 1.0, params['omega'] * (1 - fitness))
+            self.counts[species] -= self.sample(self.counts[species], prob)
+
+    def cycle_steps(self):
+        """Return the phases of the yearly cycle as (phase name, method) pairs."""
+        return (('birth', self.give_birth),
+                ('grazing', self.feed_herbivores),
+                ('predation', self.feed_carnivores),
+                ('migration', self.migrate),
+                ('aging', self.age_animals),
+                ('weight_loss', self.lose_weight),
+                ('death', self.die))
+
+    def yearly_cycle(self):
+        """This method runs the phases of the yearly cycle on all cohorts, see
+        Map.yearly_cycle() for the order.
+        """
+        if self.profiler is not None:
+            self.profiled_yearly_cycle()
+            return
+        for _, step in self.cycle_steps():
+            step()
+
+    def profiled_yearly_cycle(self):
+        """This method runs the yearly cycle and adds the time of each phase to the profiler."""
+        for phase, step in self.cycle_steps():
+            start = time.perf_counter()
+            step()
+            self.profiler.add(phase, time.perf_counter() - start, start=start)
+
+    def add_population_arrays(self, locs, species=None, ages=None, weights=None):
+        """This method adds the animals of population columns to the cohorts, see
+        Map.add_population_arrays(). Every weight is split between the two nearest weight
+        bins, in the stochastic engine at random.
+
+        Raises:
+        ----------
+        ValueError if a position is not livable or an age or weight is negative.
+        """
+        rows, cols, species, ages, weights = self.population_columns(locs, species, ages,
+                                                                     weights)
+        shape = self.landscape_grid.shape
+        inside = (rows >= 0) & (rows < shape[0]) & (cols >= 0) & (cols < shape[1])
+        cells = np.full(len(rows), -1, dtype=np.int64)
+        cells[inside] = self.livable_index[rows[inside], cols[inside]]
+        if np.any(cells < 0):
+            bad = np.argwhere(cells < 0)[:, 0]
+            raise ValueError("Animals can only be placed on livable cells, not at pos :" +
+                             self.format_positions(np.stack((rows[bad], cols[bad]), axis=1)))
+        if np.any(ages < 0):
+            raise ValueError("Negative weight or age is not allowed to enter!!")
+
+        ages = np.minimum(ages.astype(np.int64), self.ages[-1])
+        low, fraction = self.bin_position(weights.astype(np.float64))
+        if self.stochastic:
+            fraction = (self.rng.random(len(fraction)) < fraction).astype(np.float64)
+        for code, name in enumerate(self.species_names):
+            chosen = species == code
+            index = (cells[chosen], ages[chosen], low[chosen])
+            counts = self.counts[name]
+            for grid in counts.reshape((-1,) + counts.shape[-3:]):
+                np.add.at(grid, index, 1 - fraction[chosen])
+                np.add.at(grid, index[:2] + (index[2] + 1,), fraction[chosen])
+
+    def export_population(self, cells=None):
+        """This method draws animals from the cohorts, see Map.export_population(). Real
+        counts are rounded at random to whole animals and the weights are drawn uniformly
+        within their weight bin, without a loop over the animals.
+
+        Parameters:
+        ------------
+            cells: numpy.ndarray
+                Indices in livable_locs of the cells to draw from, all cells if None.
+
+        Returns:
+        ----------
+        numpy.ndarray of POPULATION_DTYPE, ordered by species.
+        """
+        selected = np.arange(len(self.livable_locs)) if cells is None else np.asarray(cells)
+        parts = []
+        for code, species in enumerate(self.species_names):
+            counts = self.island_counts(species)[selected]
+            whole = np.floor(counts + self.rng.random(counts.shape)).astype(np.int64)
+            local, ages, bins = np.nonzero(whole)
+            number = whole[local, ages, bins]
+            locs = np.repeat(self.livable_locs[selected[local]], number, axis=0) + 1
+            ages = np.repeat(ages, number)
+            weights = np.maximum(np.repeat(self.weights[bins], number) + self.weight_step *
+                                 (self.rng.random(number.sum()) - 0.5), 0.0)
+            parts.append(self.structured_population(
+                locs[:, 0], locs[:, 1], code, ages, weights,
+                fitness_array(ages, weights, self.params(species))))
+        return np.concatenate(parts)
+
+    def attach_event_log(self, event_log):
+        """Events are logged per animal, which the cohorts do not keep apart.
+
+        Raises:
+        ----------
+        RuntimeError unless event_log is None.
+        """
+        if event_log is not None:
+            raise RuntimeError('Event logs need the individual engine.')
+
+    def to_population(self, cells=None):
+        """This method draws animals from the cohorts as export_population() does.
+
+        Parameters:
+        ------------
+            cells: numpy.ndarray
+                Indices in livable_locs of the cells to draw from, all cells if None.
+
+        Returns:
+        ----------
+        List of dictionaries with 'loc' and 'pop'.
+        """
+        return self.population_list(CohortMap.export_population(self, cells))
+
+    def count_animals(self, species):
+        """This method counts the animals of one species in every livable cell, rounded to
+        whole animals.
+
+        Parameters:
+        ----------
+            species: str
+
+        Returns:
+        ----------
+        numpy.ndarray with one count per livable cell, in the order of livable_locs.
+        """
+        return np.rint(self.island_counts(species).sum(axis=(-2, -1))).astype(np.int64)
+
+    def populated_cells(self):
+        """The cohort engine keeps no landscape objects."""
+        return []
+
+    def cohort_values(self, species, values):
+        """This method repeats the value of every (age, weight bin) cohort by its number of
+        animals on the island, rounded.
+        """
+        totals = np.rint(self.island_counts(species).sum(axis=-3)).astype(np.int64)
+        return np.repeat(np.broadcast_to(values, totals.shape).ravel(), totals.ravel())
+
+    def get_pop_age_herb(self):
+        """This method returns the ages of all herbivores as an array."""
+        return self.cohort_values('Herbivore', self.ages[:, None])
+
+    def get_pop_age_carn(self):
+        """This method returns the ages of all carnivores as an array."""
+        return self.cohort_values('Carnivore', self.ages[:, None])
+
+    def get_pop_weight_herb(self):
+        """This method returns the weights of all herbivores as an array of bin centres."""
+        return self.cohort_values('Herbivore', self.weights[None, :])
+
+    def get_pop_weight_carn(self):
+        """This method returns the weights of all carnivores as an array of bin centres."""
+        return self.cohort_values('Carnivore', self.weights[None, :])
+
+    def get_pop_fitness_herb(self):
+        """This method returns the fitness of all herbivores as an array."""
+        return self.cohort_values('Herbivore', self.fitness_grid('Herbivore'))
+
+    def get_pop_fitness_carn(self):
+        """This method returns the fitness of all carnivores as an array."""
+        return self.cohort_values('Carnivore', self.fitness_grid('Carnivore'))
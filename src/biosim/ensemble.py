@@ -0,0 +1,90 @@
+"""
+This is the ensemble model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import numpy as np
+from biosim.cohort import CohortMap
+
+
+class EnsembleMap(CohortMap):
+    """The EnsembleMap simulates many replicates of the same island at once. The count arrays
+    of CohortMap get a leading replicate axis, so one call of each phase advances every
+    replicate, and the replicates share the map, the neighbour table and the parameters.
+
+    :Example:
+        .. code-block:: python
+
+            sim = BioSim(island_map, ini_pop, seed=1, vis_years=0, engine='ensemble',
+                         engine_options={'replicates': 500})
+            sim.simulate(100)
+            herbivores = sim.map.time_series()['Herbivore']  # shape (years, 500)
+
+    .. note::
+
+        - The transitions are always drawn stochastically, otherwise all replicates would be
+          equal.
+        - The getters, count_animals() and to_population() report the replicate mean, the
+          single replicates are in `counts` and in time_series().
+        - The count arrays hold replicates * cells * ages * weight bins numbers per species;
+          a coarser grid (max_age, weight_step) keeps large ensembles in memory.
+    """
+
+    def __init__(self, island_map, seed=None, replicates=100, **cohort_options):
+        """Constructor for EnsembleMap class.
+
+        Parameters:
+        ------------
+            island_map: str
+            seed: int
+                Seed of the random number generator shared by all replicates.
+            replicates: int
+                Number of replicates.
+            cohort_options: dict
+                Grid options of CohortMap, e.g. weight_step.
+        """
+        if replicates < 1:
+            raise ValueError("The ensemble needs at least one replicate.")
+        self.replicates = replicates
+        super().__init__(island_map, seed=seed, stochastic=True, **cohort_options)
+        self.history = {species: [] for species in self.species}
+
+    @property
+    def leading_shape(self):
+        """Shape (replicates,) of the axes in front of the cell axis of the count arrays."""
+        return (self.replicates,)
+
+    def island_counts(self, species):
+        """Return the counts of one species averaged over the replicates."""
+        return self.counts[species].mean(axis=0)
+
+    def species_totals(self):
+        """This method counts the animals of each species in every replicate.
+
+        Returns:
+        ----------
+        dict with a numpy.ndarray of shape (replicates,) per species.
+        """
+        return {species: np.rint(self.counts[species].sum(axis=(-3, -2, -1))).astype(np.int64)
+                for species in self.species}
+
+    def yearly_cycle(self):
+        """This method runs the yearly cycle on all replicates and records the totals of the
+        year, see time_series().
+        """
+        super().yearly_cycle()
+        for species, totals in self.species_totals().items():
+            self.history[species].append(totals)
+
+    def time_series(self):
+        """This method returns the recorded totals of every simulated year.
+
+        Returns:
+        ----------
+        dict with a numpy.ndarray of shape (years, replicates) per species.
+        """
+        return {species: np.array(totals, dtype=np.int64).reshape(-1, self.replicates)
+                for species, totals in self.history.items()}
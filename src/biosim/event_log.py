@@ -0,0 +1,245 @@
+"""
+This is the event log model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import random
+import numpy as np
+
+# Event types in the order of their codes in the log. 'found' is logged for the animals on the
+# map when the log is attached and for animals added later, which were not born on the island.
+EVENT_TYPES = ('birth', 'death', 'kill', 'move', 'found')
+BIRTH, DEATH, KILL, MOVE, FOUND = range(len(EVENT_TYPES))
+
+# One fixed-width record per event. `cell` is row * columns + col with 0-based row and col,
+# `partner` is the parent of a birth, the carnivore of a kill, the destination cell of a move
+# and -1 for a death or a founder. `weight` is the weight of `animal` when the event happened.
+EVENT_DTYPE = np.dtype([('year', '<i4'), ('event', 'u1'), ('cell', '<u4'), ('animal', '<i8'),
+                        ('partner', '<i8'), ('weight', '<f4')])
+
+# The file starts with the magic, the record size and the number of columns of the map.
+EVENT_MAGIC = b'BSEVENT1'
+_HEADER_DTYPE = np.dtype([('magic', 'S8'), ('itemsize', '<u4'), ('columns', '<u4')])
+
+
+class EventLog:
+    """The EventLog writes births, deaths, kills and moves of single animals to a binary file
+    of fixed-width records, see EVENT_DTYPE. Records are buffered and written in blocks.
+
+    :Example:
+        .. code-block:: python
+
+            with EventLog('events.bin', rates={'move': 0.1}) as log:
+                sim.attach_event_log(log)
+                sim.simulate(100)
+            events = read_events('events.bin')
+            kills = events[events['event'] == KILL]
+
+    .. note::
+
+        - Only the 'individual' engine has single animals to log.
+        - The sampling draws from its own random generator, so a simulation gives the same
+          results with and without a log.
+    """
+
+    def __init__(self, file_name, rates=None, buffer_size=65536, seed=None):
+        """Constructor for EventLog class.
+
+        Parameters:
+        ------------
+            file_name: str
+            rates: dict
+                Share of the events to keep per event type, 1 by default, e.g. {'move': 0.1}.
+            buffer_size: int
+                Number of records kept in memory before they are written.
+            seed: int
+                Seed of the sampling.
+
+        Raises:
+        ----------
+        KeyError for an unknown event type, ValueError for a rate outside [0, 1].
+        """
+        self.rates = [1.0] * len(EVENT_TYPES)
+        for name, rate in (rates or {}).items():
+            if name not in EVENT_TYPES:
+                raise KeyError('Unknown event type: ' + str(name))
+            if not 0 <= rate <= 1:
+                raise ValueError('The rate of ' + name + ' must be between 0 and 1.')
+            self.rates[EVENT_TYPES.index(name)] = rate
+        self.file_name = file_name
+        self.buffer_size = buffer_size
+        self.rng = random.Random(seed)
+        self.buffer = []
+        self.year = 0  # year of the events, set by BioSim
+        self.columns = None  # columns of the map, written to the header by start()
+        self.written = 0  # records written to the file
+        self.file = None
+
+    def start(self, columns):
+        """This method opens the file and writes the header. It is called by
+        Map.attach_event_log(), a log can only be used with one map.
+
+        Parameters:
+        ------------
+            columns: int
+                Number of columns of the map, to decode the cells.
+
+        Raises:
+        ----------
+        ValueError if the log was started for a map with another number of columns.
+        """
+        if self.file is not None:
+            if columns != self.columns:
+                raise ValueError('The event log was started for another map.')
+            return
+        self.columns = columns
+        self.file = open(self.file_name, 'wb')
+        header = np.array((EVENT_MAGIC, EVENT_DTYPE.itemsize, columns), dtype=_HEADER_DTYPE)
+        self.file.write(header.tobytes())
+
+    def add(self, event, cell, animal, partner, weight):
+        """This method logs one event, unless it is left out by the sampling.
+
+        Parameters:
+        ------------
+            event: int
+                Code of the event type, e.g. BIRTH.
+            cell: int
+            animal: int
+            partner: int
+            weight: float
+        """
+        rate = self.rates[event]
+        if rate < 1 and self.rng.random() >= rate:
+            return
+        self.buffer.append((self.year, event, cell, animal, partner, weight))
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """This method writes the buffered records to the file."""
+        if self.buffer and self.file is not None:
+            np.array(self.buffer, dtype=EVENT_DTYPE).tofile(self.file)
+            self.written += len(self.buffer)
+            self.buffer = []
+        if self.file is not None:
+            self.file.flush()
+
+    def close(self):
+        """This method writes the buffered records and closes the file."""
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class EventSinks:
+    """The EventSinks passes the events of a map to several logs, e.g. to an EventLog and a
+    LineageStore, which are given to attach_event_log() together.
+    """
+
+    def __init__(self, *sinks):
+        """Constructor for EventSinks class.
+
+        Parameters:
+        ------------
+            sinks: objects with the methods of EventLog
+        """
+        self.sinks = sinks
+
+    @property
+    def year(self):
+        """Year of the events, set by BioSim."""
+        return self.sinks[0].year if self.sinks else 0
+
+    @year.setter
+    def year(self, year):
+        for sink in self.sinks:
+            sink.year = year
+
+    def start(self, columns):
+        """This method starts all logs, see EventLog.start()."""
+        for sink in self.sinks:
+            sink.start(columns)
+
+    def add(self, event, cell, animal, partner, weight):
+        """This method passes one event to all logs, see EventLog.add()."""
+        for sink in self.sinks:
+            sink.add(event, cell, animal, partner, weight)
+
+    def flush(self):
+        """This method flushes all logs."""
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        """This method closes all logs."""
+        for sink in self.sinks:
+            sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_header(file_name):
+    """This function reads the header of an event log.
+
+    Returns:
+    ----------
+    int, the number of columns of the map.
+
+    Raises:
+    ----------
+    ValueError if the file is not an event log of this version.
+    """
+    header = np.fromfile(file_name, dtype=_HEADER_DTYPE, count=1)
+    if len(header) == 0 or header['magic'][0] != EVENT_MAGIC \
+            or header['itemsize'][0] != EVENT_DTYPE.itemsize:
+        raise ValueError(str(file_name) + ' is not an event log.')
+    return int(header['columns'][0])
+
+
+def read_events(file_name):
+    """This function maps the records of an event log into memory without reading them.
+
+    Returns:
+    ----------
+    numpy.ndarray of EVENT_DTYPE, read-only, backed by the file.
+    """
+    read_header(file_name)
+    with open(file_name, 'rb') as file:
+        file.seek(0, 2)
+        size = file.tell() - _HEADER_DTYPE.itemsize
+    if size < EVENT_DTYPE.itemsize:
+        return np.zeros(0, dtype=EVENT_DTYPE)
+    return np.memmap(file_name, dtype=EVENT_DTYPE, mode='r', offset=_HEADER_DTYPE.itemsize,
+                     shape=(size // EVENT_DTYPE.itemsize,))
+
+
+def cell_positions(file_name, cells):
+    """This function converts cells of an event log into positions on the map.
+
+    Parameters:
+    ------------
+        file_name: str
+        cells: numpy.ndarray
+            E.g. the 'cell' field of read_events(), or the 'partner' field of moves.
+
+    Returns:
+    ----------
+    tuple of numpy.ndarray with the 1-based rows and columns.
+    """
+    columns = read_header(file_name)
+    rows, cols = np.divmod(np.asarray(cells, dtype=np.int64), columns)
+    return rows + 1, cols + 1
@@ -7,6 +7,7 @@ the INF200 project January 2023.
 __author__ = "Navneet Sharma and Sushant Kumar Srivastava"
 __email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
 
+import gc
 import math
 import random
 
@@ -19,6 +20,8 @@ class Fauna:
     """
 
     parameters = {}
+    # Last identifier given to an animal, shared by all species, see next_ids()
+    last_id = 0
 
     def __init__(self, age=None, weight=None):
 
@@ -32,6 +35,9 @@ class Fauna:
         weight : int,float
         fitness : float
         has_migrated : boolean
+        id : int
+        parent_id : int
+            Identifier of the parent, 0 for animals which were not born on the island.
         """
         if age is None:
             self.age = 0
@@ -47,6 +53,9 @@ class Fauna:
 
         self.fitness = None
         self.has_migrated = False
+        Fauna.last_id += 1
+        self.id = Fauna.last_id
+        self.parent_id = 0
         self.calculate_fitness()
 
     def calculate_fitness(self):
@@ -289,6 +298,58 @@ class Fauna:
         """
         return random.random() < self.parameters['mu'] * self.fitness
 
+    @staticmethod
+    def next_ids(number):
+        """This method reserves identifiers for a number of animals. Identifiers are unique
+        within a process, Map keeps the counter when it is pickled.
+
+        Returns:
+        ----------
+            range of int
+        """
+        first = Fauna.last_id + 1
+        Fauna.last_id += number
+        return range(first, first + number)
+
+    @classmethod
+    def from_arrays(cls, ages, weights):
+        """This method creates many animals at once without calling the constructor for each
+        of them. The fitness is calculated with the formula of calculate_fitness(), so the
+        animals equal those of the constructor. The garbage collector is paused meanwhile, as
+        it would otherwise scan the growing list again and again.
+
+        Parameters:
+        -------------
+            ages: list
+            weights: list
+                The weights must not be negative.
+
+        Returns:
+        ----------
+            list of animals
+        """
+        exp = math.exp
+        phi_age, a_half = cls.parameters['phi_age'], cls.parameters['a_half']
+        phi_weight, w_half = cls.parameters['phi_weight'], cls.parameters['w_half']
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            animals = [object.__new__(cls) for _ in range(len(ages))]
+            for animal, age, weight, animal_id in zip(animals, ages, weights,
+                                                      cls.next_ids(len(animals))):
+                animal.age = age
+                animal.weight = weight
+                animal.fitness = 0 if weight == 0 else \
+                    1.0 / (1 + exp(phi_age * (age - a_half))) * \
+                    (1.0 / (1 + exp(-1 * phi_weight * (weight - w_half))))
+                animal.has_migrated = False
+                animal.id = animal_id
+                animal.parent_id = 0
+        finally:
+            if collecting:
+                gc.enable()
+        return animals
+
     @classmethod
     def check_not_defined_params(cls, params):
         """This method checks undefined parameters and raises a ValueError
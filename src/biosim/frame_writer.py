@@ -0,0 +1,139 @@
+"""
+This is the frame writer model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+
+def write_frame(file_name, buffer, img_fmt, dpi=None):
+    """This function compresses one rendered RGBA buffer and writes it to file. It runs on the
+    worker processes of the FrameWriter, so matplotlib is only imported there.
+
+    Parameters:
+    ------------
+        file_name: str
+        buffer: numpy.ndarray
+            Array of shape (height, width, 4) holding the rendered RGBA canvas.
+        img_fmt: str
+        dpi: int or float
+
+    Returns:
+    ----------
+        The name of the written file.
+    """
+    import matplotlib.image as mpimg
+
+    if dpi is None:
+        mpimg.imsave(file_name, buffer, format=img_fmt)
+    else:
+        mpimg.imsave(file_name, buffer, format=img_fmt, dpi=dpi)
+    return file_name
+
+
+class FrameWriter:
+    """The FrameWriter takes the rendered canvas buffers from the Visualization and encodes and
+    writes them on a pool of worker processes, so that the simulation does not wait for the image
+    compression.
+
+    :Example:
+        .. code-block:: python
+
+            writer = FrameWriter(workers=2, max_queue=4)
+            writer.submit('dv_00000.png', rgba_buffer, 'png')
+            writer.close()
+
+    .. note::
+
+        - At most `max_queue` frames are pending at any time, submit() blocks until the oldest
+          frame is written when the limit is reached. This bounds the memory used by the buffers.
+        - Errors raised on a worker are raised again in the simulation process.
+    """
+
+    def __init__(self, workers=None, max_queue=8, dpi=None):
+        """Constructor for FrameWriter class.
+
+        Parameters:
+        ------------
+            workers: int
+                Number of worker processes (default: number of CPUs).
+            max_queue: int
+                Maximum number of frames which are waiting to be written.
+            dpi: int or float
+                Resolution stored in the written files.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("The number of workers must be at least 1.")
+        if max_queue < 1:
+            raise ValueError("The queue depth must be at least 1.")
+
+        self.workers = workers
+        self.max_queue = max_queue
+        self.dpi = dpi
+        self.pending = deque()
+        self.written = []
+        self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        """This method starts the worker processes if they are not running yet."""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def submit(self, file_name, buffer, img_fmt):
+        """This method queues one frame for writing. The buffer is copied, so the caller can
+        reuse its canvas right after the call.
+
+        Parameters:
+        ------------
+            file_name: str
+            buffer: array_like
+                RGBA buffer, e.g. fig.canvas.buffer_rgba().
+            img_fmt: str
+        """
+        self.start()
+        while len(self.pending) >= self.max_queue:
+            self.written.append(self.pending.popleft().result())
+
+        frame = np.array(buffer, dtype=np.uint8, copy=True)
+        self.pending.append(self.executor.submit(write_frame, file_name, frame, img_fmt,
+                                                 self.dpi))
+
+    @property
+    def queue_depth(self):
+        """Number of frames which are not written yet."""
+        return sum(1 for future in self.pending if not future.done())
+
+    def flush(self):
+        """This method waits until all queued frames have been written.
+
+        Returns:
+        ----------
+            List of the file names written since the last flush.
+        """
+        while self.pending:
+            self.written.append(self.pending.popleft().result())
+        written, self.written = self.written, []
+        return written
+
+    def close(self):
+        """This method writes all remaining frames and stops the worker processes."""
+        if self.executor is not None:
+            try:
+                self.flush()
+            finally:
+                self.executor.shutdown()
+                self.executor = None
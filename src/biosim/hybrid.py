@@ -0,0 +1,274 @@
+"""
+This is the hybrid model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import numpy as np
+from biosim.map import Map
+from biosim.cohort import CohortMap
+
+
+class HybridMap(CohortMap):
+    """The HybridMap chooses the representation of every livable cell by its number of
+    animals. Sparse cells keep single animals in their landscape object, like Map, and dense
+    cells keep (age, weight bin) cohorts, like a stochastic CohortMap.
+
+    :Example:
+        .. code-block:: python
+
+            sim = BioSim(island_map, ini_pop, seed=1, vis_years=0, engine='hybrid',
+                         engine_options={'threshold': 500})
+
+    .. note::
+
+        - A cell becomes dense when it holds more than `threshold` animals, and sparse again
+          when it holds fewer than `hysteresis` * `threshold`, so cells near the threshold do
+          not change their representation every year.
+        - The representation is chosen after add_population() and at the end of every year.
+          Animals which migrate into a cell of the other representation are converted on
+          arrival.
+        - Converting a dense cell draws the weight of each animal uniformly within its weight
+          bin, converting a sparse cell splits each weight between the two nearest bins.
+        - A year of the cohorts costs about as much as a year of some hundred single animals
+          per cell, which is why the default threshold is high. Predation in dense cells is
+          the mean-field model of CohortMap.
+    """
+
+    def __init__(self, island_map, seed=None, threshold=1000, hysteresis=0.5, **cohort_options):
+        """Constructor for HybridMap class.
+
+        Parameters:
+        ------------
+            island_map: str
+            seed: int
+                Seed of the random number generator used by the dense cells.
+            threshold: int
+                Number of animals above which a cell becomes dense.
+            hysteresis: float
+                Share of the threshold below which a dense cell becomes sparse again.
+            cohort_options: dict
+                Grid options of CohortMap, e.g. weight_step.
+        """
+        if threshold < 1 or not 0 < hysteresis <= 1:
+            raise ValueError("The hybrid engine needs threshold >= 1 and 0 < hysteresis <= 1.")
+        super().__init__(island_map, seed=seed, stochastic=True, **cohort_options)
+        self.threshold = threshold
+        self.hysteresis = hysteresis
+        self.dense = np.zeros(len(self.livable_locs), dtype=bool)
+        self.sparse_cells = list(zip(self.livable_dict, self.livable_list))
+
+    create_cells = Map.create_cells
+    create_livable_neighbours = Map.create_livable_neighbours
+
+    def take_animals(self, cells, group='initial_population'):
+        """This method removes the single animals of some cells from their landscape objects.
+
+        Parameters:
+        ------------
+            cells: numpy.ndarray
+                Indices in livable_locs.
+            group: str
+                'initial_population' or 'after_migration_population'.
+
+        Returns:
+        ----------
+        List of dictionaries with 'loc' and 'pop', the format of add_population().
+        """
+        population = []
+        for index in cells:
+            animals = getattr(self.livable_list[index], group)
+            pop = [{'species': species, 'age': animal.age, 'weight': animal.weight}
+                   for species in self.species for animal in animals[species]]
+            for species in self.species:
+                animals[species] = []
+            if pop:
+                row, col = self.livable_locs[index]
+                population.append({'loc': (int(row) + 1, int(col) + 1), 'pop': pop})
+        return population
+
+    def place_animals(self, population, group='initial_population'):
+        """This method creates single animals in the landscape objects of their cells.
+
+        Parameters:
+        ------------
+            population: list
+                Dictionaries with 'loc' and 'pop', the format of add_population().
+            group: str
+                'initial_population' or 'after_migration_population'.
+        """
+        for entry in population:
+            animals = getattr(self.livable_dict[(entry['loc'][0] - 1, entry['loc'][1] - 1)],
+                              group)
+            for individual in entry['pop']:
+                species = individual['species']
+                animals[species].append(self.animal_classes[species](individual['age'],
+                                                                     individual['weight']))
+
+    def add_cohorts(self, population):
+        """This method adds the animals of a population list to the cohorts."""
+        CohortMap.add_population_arrays(self, *self.population_arrays(population))
+
+    def clear_cohorts(self, cells):
+        """This method empties the cohorts of some cells."""
+        for species in self.species:
+            self.counts[species][..., cells, :, :] = 0
+
+    def update_modes(self):
+        """This method converts the cells which crossed the threshold, see the class notes."""
+        totals = sum(self.count_animals(species) for species in self.species)
+        to_dense = np.flatnonzero(~self.dense & (totals > self.threshold))
+        to_sparse = np.flatnonzero(self.dense & (totals < self.hysteresis * self.threshold))
+        if to_dense.size > 0:
+            self.add_cohorts(self.take_animals(to_dense))
+        if to_sparse.size > 0:
+            self.place_animals(CohortMap.to_population(self, to_sparse))
+            self.clear_cohorts(to_sparse)
+        self.dense[to_dense] = True
+        self.dense[to_sparse] = False
+        self.sparse_cells = [(tuple(self.livable_locs[index].tolist()), self.livable_list[index])
+                             for index in np.flatnonzero(~self.dense)]
+
+    def add_population_arrays(self, locs, species=None, ages=None, weights=None):
+        """This method adds single animals as Map.add_population_arrays() does, moves the
+        animals of dense cells into their cohorts and converts the cells which became dense.
+        """
+        Map.add_population_arrays(self, locs, species, ages, weights)
+        self.add_cohorts(self.take_animals(np.flatnonzero(self.dense)))
+        self.update_modes()
+
+    def give_birth(self):
+        """This method lets the animals of sparse and dense cells give birth."""
+        for _, cell in self.sparse_cells:
+            cell.add_newborn()
+        if self.dense.any():
+            super().give_birth()
+
+    def feed_herbivores(self):
+        """This method grows the fodder and lets the herbivores of all cells graze."""
+        for _, cell in self.sparse_cells:
+            cell.fodder_grow()
+            cell.feed_herbivore()
+        if self.dense.any():
+            super().feed_herbivores()
+
+    def feed_carnivores(self):
+        """This method lets the carnivores of all cells prey."""
+        for _, cell in self.sparse_cells:
+            cell.feed_carnivore()
+        if self.dense.any():
+            super().feed_carnivores()
+
+    def migrate(self):
+        """This method lets the animals of all cells migrate and converts the animals which
+        arrived in a cell of the other representation.
+        """
+        for loc, cell in self.sparse_cells:
+            cell.animal_migrate(self.neighbours_dict[loc])
+        if not self.dense.any():
+            return
+        super().migrate()
+        sparse = np.flatnonzero(~self.dense)
+        self.place_animals(CohortMap.to_population(self, sparse), 'after_migration_population')
+        self.clear_cohorts(sparse)
+        self.add_cohorts(self.take_animals(np.flatnonzero(self.dense),
+                                           'after_migration_population'))
+
+    def age_animals(self):
+        """This method lets the migrated animals settle and ages the animals of all cells."""
+        for _, cell in self.sparse_cells:
+            cell.add_migrated_population()
+            cell.age_increase()
+        if self.dense.any():
+            super().age_animals()
+
+    def lose_weight(self):
+        """This method reduces the weight of the animals of all cells."""
+        for _, cell in self.sparse_cells:
+            cell.weight_decrease()
+        if self.dense.any():
+            super().lose_weight()
+
+    def die(self):
+        """This method removes the dead animals of all cells and chooses the representation of
+        every cell for the next year.
+        """
+        for _, cell in self.sparse_cells:
+            cell.animal_die()
+        if self.dense.any():
+            super().die()
+        self.update_modes()
+
+    def to_population(self):
+        """This method lists the single animals and draws animals from the cohorts.
+
+        Returns:
+        ----------
+        List of dictionaries with 'loc' and 'pop'.
+        """
+        return Map.to_population(self) + CohortMap.to_population(self)
+
+    def export_population(self):
+        """This method lists the single animals and draws animals from the cohorts, see
+        Map.export_population().
+
+        Returns:
+        ----------
+        numpy.ndarray of POPULATION_DTYPE
+        """
+        return np.concatenate((Map.export_population(self), CohortMap.export_population(self)))
+
+    def count_animals(self, species):
+        """This method counts the animals of one species in every livable cell, single animals
+        and cohorts together.
+
+        Parameters:
+        ----------
+            species: str
+
+        Returns:
+        ----------
+        numpy.ndarray with one count per livable cell, in the order of livable_locs.
+        """
+        return Map.count_animals(self, species) + CohortMap.count_animals(self, species)
+
+    def populated_cells(self):
+        """This method returns the landscape objects which can hold single animals."""
+        return Map.populated_cells(self)
+
+    def combined(self, getter):
+        """This method joins the values of the single animals and of the cohorts returned by
+        the getter of the same name of Map and CohortMap.
+
+        Returns:
+        ----------
+        numpy.ndarray
+        """
+        return np.concatenate([np.asarray(getattr(Map, getter)(self), dtype=float),
+                               getattr(CohortMap, getter)(self)])
+
+    def get_pop_age_herb(self):
+        """This method returns the ages of all herbivores as an array."""
+        return self.combined('get_pop_age_herb')
+
+    def get_pop_age_carn(self):
+        """This method returns the ages of all carnivores as an array."""
+        return self.combined('get_pop_age_carn')
+
+    def get_pop_weight_herb(self):
+        """This method returns the weights of all herbivores as an array."""
+        return self.combined('get_pop_weight_herb')
+
+    def get_pop_weight_carn(self):
+        """This method returns the weights of all carnivores as an array."""
+        return self.combined('get_pop_weight_carn')
+
+    def get_pop_fitness_herb(self):
+        """This method returns the fitness of all herbivores as an array."""
+        return self.combined('get_pop_fitness_herb')
+
+    def get_pop_fitness_carn(self):
+        """This method returns the fitness of all carnivores as an array."""
+        return self.combined('get_pop_fitness_carn')
@@ -0,0 +1,266 @@
+"""
+This is the island generator model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import numpy as np
+from biosim.map import Map
+
+
+class IslandGenerator:
+    """The IslandGenerator creates random islands and populations of arbitrary size for load
+    and stress tests. All output is deterministic for a given seed.
+
+    :Example:
+        .. code-block:: python
+
+            generator = IslandGenerator(seed=42)
+            island_map = generator.island_map(200, 300, land_fraction=0.4,
+                                              lowland=0.5, highland=0.3, desert=0.2)
+            ini_pop = generator.population(island_map, herbivore_density=50,
+                                           carnivore_density=5)
+            sim = BioSim(island_map, ini_pop, seed=1, vis_years=0)
+
+    .. note::
+
+        - The outermost rows and columns are always Water, as required by Map.
+        - Rows and columns in the arrays returned by population_arrays() are counted from 1,
+          like 'loc' in the ini_pop lists.
+    """
+
+    # Landscape letters in the order of their codes in the generated grids.
+    landscape_letters = Map.landscape_letters
+    # Codes of the species in population_arrays().
+    species_codes = {'Herbivore': 0, 'Carnivore': 1}
+
+    def __init__(self, seed=None):
+        """Constructor for IslandGenerator class.
+
+        Parameters:
+        ------------
+            seed: int
+                Seed for the random number generator.
+        """
+        self.rng = np.random.default_rng(seed)
+
+    def smooth_noise(self, rows, cols, resolution):
+        """This method returns random values in [0, 1) on a coarse grid of
+        `resolution` x `resolution` nodes, interpolated bilinearly to rows x cols.
+
+        Parameters:
+        ------------
+            rows: int
+            cols: int
+            resolution: int
+
+        Returns:
+        ----------
+            numpy.ndarray of shape (rows, cols)
+        """
+        coarse = self.rng.random((resolution + 1, resolution + 1))
+        y = np.linspace(0, resolution, rows)
+        x = np.linspace(0, resolution, cols)
+        y0 = np.minimum(y.astype(int), resolution - 1)
+        x0 = np.minimum(x.astype(int), resolution - 1)
+        dy = (y - y0)[:, None]
+        dx = (x - x0)[None, :]
+        top = coarse[y0][:, x0] * (1 - dx) + coarse[y0][:, x0 + 1] * dx
+        bottom = coarse[y0 + 1][:, x0] * (1 - dx) + coarse[y0 + 1][:, x0 + 1] * dx
+        return top * (1 - dy) + bottom * dy
+
+    def landscape_codes(self, rows, cols, land_fraction=0.6, lowland=0.6, highland=0.3,
+                        desert=0.1, coast_complexity=0.5):
+        """This method creates the landscape of a random island as a grid of codes, 0 for Water,
+        1 for Lowland, 2 for Highland and 3 for Desert.
+
+        Parameters:
+        ------------
+            rows: int
+            cols: int
+            land_fraction: float
+                Share of the inner cells (all but the Water edge) which are land.
+            lowland: float
+            highland: float
+            desert: float
+                Relative shares of the land types, they are normalised to sum to 1.
+            coast_complexity: float
+                0 gives a single round island, 1 gives a ragged coast with many small islands.
+
+        Returns:
+        ----------
+            numpy.ndarray of dtype uint8 and shape (rows, cols)
+
+        Raises:
+        ----------
+        ValueError if the size, the land fraction or the land type shares are invalid.
+        """
+        if rows < 3 or cols < 3:
+            raise ValueError("An island needs at least 3 rows and 3 columns.")
+        if not 0 <= land_fraction <= 1:
+            raise ValueError("The land fraction must be between 0 and 1.")
+        shares = np.array([lowland, highland, desert], dtype=float)
+        if np.any(shares < 0) or shares.sum() <= 0:
+            raise ValueError("The land type shares must be non-negative and not all zero.")
+        if not 0 <= coast_complexity <= 1:
+            raise ValueError("The coast complexity must be between 0 and 1.")
+
+        codes = np.zeros((rows, cols), dtype=np.uint8)
+        inner_rows, inner_cols = rows - 2, cols - 2
+
+        # Land height: radial fall-off towards the coast plus noise, the finer and stronger the
+        # noise the more complex the coast line.
+        y = np.linspace(-1, 1, inner_rows)[:, None]
+        x = np.linspace(-1, 1, inner_cols)[None, :]
+        height = 1 - np.sqrt(x ** 2 + y ** 2) / np.sqrt(2)
+        resolution = 2 + int(coast_complexity * max(inner_rows, inner_cols) / 3)
+        height = (1 - coast_complexity) * height + \
+            coast_complexity * self.smooth_noise(inner_rows, inner_cols, resolution)
+        height += 1e-6 * self.rng.random((inner_rows, inner_cols))  # break ties
+
+        n_land = int(round(land_fraction * inner_rows * inner_cols))
+        land = np.zeros(inner_rows * inner_cols, dtype=bool)
+        if n_land > 0:
+            land[np.argsort(height, axis=None)[-n_land:]] = True
+        land = land.reshape(inner_rows, inner_cols)
+
+        # Land types follow a second, smooth noise field so that they form regions.
+        kind = self.smooth_noise(inner_rows, inner_cols, max(2, resolution // 2))
+        kind += 1e-6 * self.rng.random((inner_rows, inner_cols))
+        rank = np.argsort(np.argsort(kind[land]))
+        bounds = np.round(np.cumsum(shares / shares.sum()) * n_land).astype(int)
+        inner = np.zeros((inner_rows, inner_cols), dtype=np.uint8)
+        inner[land] = 1 + np.searchsorted(bounds, rank, side='right')
+        codes[1:-1, 1:-1] = inner
+        return codes
+
+    def island_map(self, rows, cols, **kwargs):
+        """This method creates a random island as a multi-line string accepted by Map. The keyword
+        arguments are passed on to landscape_codes().
+
+        Parameters:
+        ------------
+            rows: int
+            cols: int
+
+        Returns:
+        ----------
+            str
+        """
+        return self.codes_to_map(self.landscape_codes(rows, cols, **kwargs))
+
+    @classmethod
+    def codes_to_map(cls, codes):
+        """This method converts a grid of landscape codes into a multi-line map string.
+
+        Parameters:
+        ------------
+            codes: numpy.ndarray
+
+        Returns:
+        ----------
+            str
+        """
+        letters = np.frombuffer(cls.landscape_letters.encode('ascii'), dtype=np.uint8)
+        rows = letters[np.asarray(codes)]
+        newline = np.full((rows.shape[0], 1), ord('\n'), dtype=np.uint8)
+        return np.hstack((rows, newline)).tobytes().decode('ascii')[:-1]
+
+    @staticmethod
+    def map_to_codes(island_map):
+        """This method converts a multi-line map string into a grid of landscape codes, see
+        Map.parse_map().
+
+        Parameters:
+        ------------
+            island_map: str
+
+        Returns:
+        ----------
+            numpy.ndarray of dtype uint8
+        """
+        return Map.parse_map(island_map)
+
+    def population_arrays(self, island_map, herbivore_density=10.0, carnivore_density=0.0,
+                          age=5, weight=20.0, exact=False):
+        """This method places animals on the livable cells of the island.
+
+        Parameters:
+        ------------
+            island_map: str
+            herbivore_density: float
+            carnivore_density: float
+                Mean number of animals per livable cell.
+            age: int or tuple
+                Age of all animals, or (low, high) for ages drawn uniformly from low to high.
+            weight: float or tuple
+                Weight of all animals, or (low, high) for weights drawn uniformly.
+            exact: boolean
+                If True, exactly round(density * number of livable cells) animals are placed,
+                otherwise the number of animals per cell is Poisson distributed.
+
+        Returns:
+        ----------
+            dict of numpy arrays 'row', 'col', 'species', 'age' and 'weight', one entry per animal.
+        """
+        codes = self.map_to_codes(island_map)
+        livable_rows, livable_cols = np.nonzero(codes)
+        n_cells = len(livable_rows)
+
+        columns = {'row': [], 'col': [], 'species': []}
+        for species, density in (('Herbivore', herbivore_density),
+                                 ('Carnivore', carnivore_density)):
+            if density < 0:
+                raise ValueError("The density of animals must be non-negative.")
+            if n_cells == 0:
+                counts = np.zeros(0, dtype=int)
+            elif exact:
+                total = int(round(density * n_cells))
+                counts = self.rng.multinomial(total, np.full(n_cells, 1 / n_cells))
+            else:
+                counts = self.rng.poisson(density, n_cells)
+            columns['row'].append(np.repeat(livable_rows + 1, counts))
+            columns['col'].append(np.repeat(livable_cols + 1, counts))
+            columns['species'].append(np.full(counts.sum(), self.species_codes[species],
+                                              dtype=np.uint8))
+
+        population = {key: np.concatenate(value) for key, value in columns.items()}
+        n_animals = len(population['species'])
+        if isinstance(age, tuple):
+            population['age'] = self.rng.integers(age[0], age[1], n_animals, endpoint=True)
+        else:
+            population['age'] = np.full(n_animals, age, dtype=int)
+        if isinstance(weight, tuple):
+            population['weight'] = self.rng.uniform(weight[0], weight[1], n_animals)
+        else:
+            population['weight'] = np.full(n_animals, weight, dtype=float)
+        return population
+
+    def population(self, island_map, **kwargs):
+        """This method places animals on the livable cells of the island and returns them in the
+        ini_pop format of BioSim. The keyword arguments are passed on to population_arrays().
+
+        Parameters:
+        ------------
+            island_map: str
+
+        Returns:
+        ----------
+            List of dictionaries with 'loc' and 'pop'.
+        """
+        arrays = self.population_arrays(island_map, **kwargs)
+        species_names = {code: name for name, code in self.species_codes.items()}
+        order = np.lexsort((arrays['col'], arrays['row']))
+        ini_pop = []
+        by_loc = {}
+        for index in order:
+            loc = (int(arrays['row'][index]), int(arrays['col'][index]))
+            if loc not in by_loc:
+                by_loc[loc] = []
+                ini_pop.append({'loc': loc, 'pop': by_loc[loc]})
+            by_loc[loc].append({'species': species_names[int(arrays['species'][index])],
+                                'age': int(arrays['age'][index]),
+                                'weight': float(arrays['weight'][index])})
+        return ini_pop
@@ -0,0 +1,531 @@
+"""
+This is the job server model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import itertools
+import json
+import multiprocessing
+import os
+import pickle
+import queue
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from biosim.map import Map
+from biosim.simulation import BioSim
+
+# Number of arguments of every schedule action, see BioSim.add_schedule().
+SCHEDULE_ARGUMENTS = {'add_population': 1, 'set_animal_parameters': 2,
+                      'set_landscape_parameters': 2}
+
+# Queue of the per-year totals sent by the worker processes, and the parameters of all animals
+# and landscapes when the worker started. Both are set by init_worker().
+_progress = None
+_default_parameters = None
+
+
+def init_worker(progress):
+    """This function prepares a worker process of the JobServer."""
+    global _progress, _default_parameters
+    _progress = progress
+    _default_parameters = Map.parameter_state()
+
+
+def set_job_parameters(spec):
+    """This function sets the parameters of a job, after resetting those of earlier jobs run
+    by the same worker.
+    """
+    Map.restore_parameters(_default_parameters)
+    classes = dict(**Map.animal_classes, **Map.landscape_classes)
+    for name, params in {**(spec.get('animal_parameters') or {}),
+                         **(spec.get('landscape_parameters') or {})}.items():
+        Map.check_dict_type(params)
+        classes[name].set_parameters(params)
+
+
+def tuple_locs(population):
+    """This function returns a population list with the JSON lists of the positions turned
+    into tuples.
+    """
+    return [dict(entry, loc=tuple(entry['loc'])) for entry in population]
+
+
+def run_chunk(job_id, spec, checkpoint, num_years):
+    """This function simulates up to num_years further years of a job in a worker process,
+    starting from its checkpoint if there is one, and writes a new checkpoint. The checkpoint
+    keeps the simulation, the state of the random module and the parameters in effect, which
+    may differ from those of the job after scheduled changes.
+
+    Parameters:
+    ------------
+        job_id: int
+        spec: dict
+            The job, see JobServer.submit().
+        checkpoint: str
+            File name of the checkpoint.
+        num_years: int
+
+    Returns:
+    ----------
+    tuple with the number of years done and the list of (year, totals) of this chunk.
+    """
+    if os.path.exists(checkpoint):
+        with open(checkpoint, 'rb') as file:
+            sim, random_state, parameters = pickle.load(file)
+        random.setstate(random_state)
+        Map.restore_parameters(parameters)
+    else:
+        set_job_parameters(spec)
+        sim = BioSim(spec['island_map'], spec['ini_pop'], spec['seed'], vis_years=0,
+                     engine=spec.get('engine', 'individual'),
+                     engine_options=spec.get('engine_options'))
+        sim.add_schedule(spec.get('schedule') or [])
+    records = []
+    for snapshot in sim.iter_years(min(num_years, spec['num_years'] - sim.year_num)):
+        record = (snapshot.year, dict(snapshot.totals))
+        _progress.put((job_id,) + record)
+        records.append(record)
+
+    temporary = checkpoint + '.tmp'
+    with open(temporary, 'wb') as file:
+        pickle.dump((sim, random.getstate(), Map.parameter_state()), file,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, checkpoint)
+    return sim.year_num, records
+
+
+class Job:
+    """The Job keeps the state and the per-year totals of one simulation of a JobServer."""
+
+    def __init__(self, job_id, spec):
+        """Constructor for Job class.
+
+        Parameters:
+        ------------
+            job_id: int
+            spec: dict
+        """
+        self.id = job_id
+        self.spec = spec
+        self.status = 'queued'
+        self.error = None
+        self.crashes = 0
+        self.cancel_requested = False
+        self.records = []
+        self.condition = threading.Condition()
+
+    @property
+    def finished(self):
+        """True when the job is done, cancelled or failed."""
+        return self.status in ('done', 'cancelled', 'failed')
+
+    def record(self, year, totals):
+        """This method adds the totals of the next year, repeated years are ignored."""
+        with self.condition:
+            if year == len(self.records):
+                self.records.append(dict(year=year, **totals))
+                self.condition.notify_all()
+
+    def set_status(self, status, error=None):
+        """This method changes the status of the job."""
+        with self.condition:
+            self.status = status
+            self.error = error
+            self.condition.notify_all()
+
+    def describe(self):
+        """This method returns the state of the job.
+
+        Returns:
+        ----------
+        dict
+        """
+        return {'id': self.id, 'status': self.status, 'years_done': len(self.records),
+                'num_years': self.spec['num_years'], 'crashes': self.crashes,
+                'error': self.error}
+
+
+class JobServer:
+    """The JobServer runs simulation jobs on a pool of worker processes and serves them over
+    HTTP on localhost.
+
+    :Example:
+        .. code-block:: python
+
+            with JobServer('../results/jobs') as server:
+                host, port = server.start(port=8000)
+                server.serve_until_interrupted()
+
+        .. code-block:: text
+
+            POST   /jobs                  submit a job, returns {"id": ...}
+            GET    /jobs                  state of all jobs
+            GET    /jobs/<id>             state of a job
+            GET    /jobs/<id>/statistics  per-year totals as JSON lines, streamed until the
+                                          job ends, ?since=<year> skips earlier years
+            DELETE /jobs/<id>             cancel a job
+
+    .. note::
+
+        - A job is a JSON object with 'island_map', 'ini_pop', 'seed' and 'num_years' and
+          optionally 'animal_parameters', 'landscape_parameters', 'engine',
+          'engine_options' and 'schedule', see BioSim and ResultCache.simulate(). It
+          simulates num_years years as BioSim.iter_years().
+        - At most `workers` jobs run at the same time, the others wait in submission order.
+          A running job is simulated in chunks of `checkpoint_years` years and every chunk
+          ends with a checkpoint, the pickled simulation, the state of the random module and
+          the parameters in effect, so the totals do not depend on `checkpoint_years`.
+        - When a worker process dies, the pool is restarted and the running jobs continue
+          from their last checkpoint. The repeated years give the same totals, so clients
+          see no difference. A job which crashed more than `max_crashes` times fails.
+        - Cancelling a running job takes effect at the end of its chunk.
+    """
+
+    def __init__(self, directory, workers=None, checkpoint_years=10, max_crashes=3):
+        """Constructor for JobServer class.
+
+        Parameters:
+        ------------
+            directory: str
+                Directory of the checkpoints.
+            workers: int
+                Number of worker processes, None for the number of CPUs.
+            checkpoint_years: int
+                Years simulated between two checkpoints.
+            max_crashes: int
+        """
+        if checkpoint_years < 1:
+            raise ValueError("checkpoint_years must be positive.")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.workers = workers or os.cpu_count() or 1
+        self.checkpoint_years = checkpoint_years
+        self.max_crashes = max_crashes
+        self.jobs = {}
+        self.pending = []
+        self.active = set()
+        self.ids = itertools.count(1)
+        self.events = queue.Queue()
+        self.progress = multiprocessing.Queue()
+        self.pool = self.new_pool()
+        self.http = None
+        self.threads = [threading.Thread(target=self.schedule, daemon=True),
+                        threading.Thread(target=self.read_progress, daemon=True)]
+        for thread in self.threads:
+            thread.start()
+
+    def new_pool(self):
+        """Return a new pool of worker processes."""
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                   initargs=(self.progress,))
+
+    def checkpoint_path(self, job):
+        """Return the file name of the checkpoint of a job."""
+        return os.path.join(self.directory, f'job_{job.id}.pkl')
+
+    def submit(self, spec):
+        """This method queues a job.
+
+        Parameters:
+        ------------
+            spec: dict
+                The job, see the class notes.
+
+        Returns:
+        ----------
+        int with the id of the job.
+
+        Raises:
+        ----------
+        ValueError if a required key is missing, num_years is negative or a schedule item
+        has an unknown action or the wrong number of arguments.
+        """
+        missing = {'island_map', 'ini_pop', 'seed', 'num_years'} - set(spec)
+        if missing:
+            raise ValueError(f"The job misses {', '.join(sorted(missing))}.")
+        if spec['num_years'] < 0:
+            raise ValueError("num_years must not be negative.")
+        for item in spec.get('schedule') or []:
+            if not isinstance(item, (list, tuple)) or len(item) < 2 or \
+                    SCHEDULE_ARGUMENTS.get(item[1]) != len(item) - 2:
+                raise ValueError(f"Invalid schedule item {item!r}.")
+        schedule = [(year, action, tuple_locs(arguments[0])) if action == 'add_population'
+                    else (year, action, *arguments)
+                    for year, action, *arguments in spec.get('schedule') or []]
+        spec = dict(spec, ini_pop=tuple_locs(spec['ini_pop']), schedule=schedule)
+        job = Job(next(self.ids), spec)
+        self.jobs[job.id] = job
+        self.events.put(('submit', job))
+        return job.id
+
+    def cancel(self, job_id):
+        """This method cancels a job.
+
+        Raises:
+        ----------
+        KeyError for an unknown job.
+        """
+        self.events.put(('cancel', self.jobs[job_id]))
+
+    def wait(self, job_id, timeout=None):
+        """This method waits until a job ended.
+
+        Returns:
+        ----------
+        dict with the state of the job, see Job.describe().
+        """
+        job = self.jobs[job_id]
+        with job.condition:
+            job.condition.wait_for(lambda: job.finished, timeout)
+        return job.describe()
+
+    def statistics(self, job_id, since=0):
+        """This method yields the totals of every year of a job, waiting for new years until
+        the job ended.
+
+        Parameters:
+        ------------
+            job_id: int
+            since: int
+                First year yielded.
+
+        Returns:
+        ----------
+        iterator of dict with the year and the number of animals per species.
+        """
+        job = self.jobs[job_id]
+        index = since
+        while True:
+            with job.condition:
+                job.condition.wait_for(lambda: index < len(job.records) or job.finished)
+                records = job.records[index:]
+                finished = job.finished
+            yield from records
+            index += len(records)
+            if finished and not records:
+                return
+
+    def schedule(self):
+        """This method handles the events of the server, run by the scheduler thread."""
+        while True:
+            event, job, *args = self.events.get()
+            if event == 'stop':
+                return
+            if event == 'submit':
+                self.pending.append(job)
+            elif event == 'cancel' and not job.finished:
+                job.cancel_requested = True
+                if job in self.pending:
+                    self.pending.remove(job)
+                    job.set_status('cancelled')
+            elif event == 'chunk':
+                self.chunk_done(job, *args)
+            while self.pending and len(self.active) < self.workers:
+                job = self.pending.pop(0)
+                self.active.add(job)
+                job.set_status('running')
+                self.run_next(job)
+
+    def restart_pool(self, pool):
+        """This method replaces a broken pool, unless it was replaced already."""
+        if pool is self.pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = self.new_pool()
+
+    def run_next(self, job):
+        """This method submits the next chunk of a job to the pool."""
+        pool = self.pool
+        try:
+            future = pool.submit(run_chunk, job.id, job.spec, self.checkpoint_path(job),
+                                 self.checkpoint_years)
+        except BrokenProcessPool:
+            self.restart_pool(pool)
+            self.run_next(job)
+            return
+        future.add_done_callback(lambda done: self.events.put(('chunk', job, done, pool)))
+
+    def chunk_done(self, job, future, pool):
+        """This method continues, ends or restarts a job after a chunk."""
+        try:
+            years_done, records = future.result()
+        except BrokenProcessPool:
+            self.restart_pool(pool)
+            job.crashes += 1
+            if job.crashes > self.max_crashes:
+                self.end(job, 'failed', 'worker process crashed')
+            elif job.cancel_requested:
+                self.end(job, 'cancelled')
+            else:
+                self.run_next(job)
+            return
+        except Exception as error:
+            self.end(job, 'failed', f'{type(error).__name__}: {error}')
+            return
+
+        for year, totals in records:
+            job.record(year, totals)
+        if job.cancel_requested:
+            self.end(job, 'cancelled')
+        elif years_done >= job.spec['num_years']:
+            self.end(job, 'done')
+        else:
+            self.run_next(job)
+
+    def end(self, job, status, error=None):
+        """This method ends a running job and removes its checkpoint."""
+        self.active.discard(job)
+        if os.path.exists(self.checkpoint_path(job)):
+            os.remove(self.checkpoint_path(job))
+        job.set_status(status, error)
+
+    def read_progress(self):
+        """This method passes the totals sent by the workers to the jobs, run by the progress
+        thread.
+        """
+        while True:
+            message = self.progress.get()
+            if message is None:
+                return
+            job_id, year, totals = message
+            self.jobs[job_id].record(year, totals)
+
+    def start(self, host='127.0.0.1', port=0):
+        """This method starts serving HTTP requests in a thread.
+
+        Parameters:
+        ------------
+            host: str
+                Address to listen on, only local addresses are allowed.
+            port: int
+                Port, 0 for any free port.
+
+        Returns:
+        ----------
+        tuple with the host and the port.
+
+        Raises:
+        ----------
+        ValueError for an address which is not local.
+        """
+        if host not in ('127.0.0.1', 'localhost', '::1'):
+            raise ValueError("The job server only listens on localhost.")
+        self.http = ThreadingHTTPServer((host, port), JobRequestHandler)
+        self.http.daemon_threads = True
+        self.http.job_server = self
+        thread = threading.Thread(target=self.http.serve_forever, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+        return self.http.server_address[:2]
+
+    def serve_until_interrupted(self):
+        """This method blocks until Ctrl-C is pressed."""
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+    def shutdown(self):
+        """This method stops the HTTP server, the threads and the worker processes. Running
+        jobs are not finished.
+        """
+        if self.http is not None:
+            self.http.shutdown()
+            self.http.server_close()
+        self.events.put(('stop', None))
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.progress.put(None)
+        for thread in self.threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """The JobRequestHandler answers the HTTP requests of a JobServer, see JobServer."""
+
+    def send_json(self, status, body):
+        """This method sends a JSON answer."""
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def find_job(self, parts):
+        """Return the job of the path parts, or None after sending 404."""
+        server = self.server.job_server
+        try:
+            return server.jobs[int(parts[1])]
+        except (ValueError, KeyError):
+            self.send_json(404, {'error': 'unknown job'})
+            return None
+
+    def do_POST(self):
+        if urlparse(self.path).path.strip('/') != 'jobs':
+            self.send_json(404, {'error': 'unknown path'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            spec = json.loads(self.rfile.read(length))
+            job_id = self.server.job_server.submit(spec)
+        except (ValueError, TypeError, KeyError) as error:
+            self.send_json(400, {'error': str(error)})
+            return
+        self.send_json(201, {'id': job_id})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip('/').split('/')
+        server = self.server.job_server
+        if parts == ['jobs']:
+            self.send_json(200, [job.describe() for job in list(server.jobs.values())])
+            return
+        if parts[0] != 'jobs' or len(parts) not in (2, 3) or \
+                (len(parts) == 3 and parts[2] != 'statistics'):
+            self.send_json(404, {'error': 'unknown path'})
+            return
+        job = self.find_job(parts)
+        if job is None:
+            return
+        if len(parts) == 2:
+            self.send_json(200, job.describe())
+            return
+
+        try:
+            since = int(parse_qs(url.query).get('since', ['0'])[0])
+        except ValueError as error:
+            self.send_json(400, {'error': str(error)})
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        for record in server.statistics(job.id, since):
+            self.wfile.write(json.dumps(record).encode('utf-8') + b'\n')
+            self.wfile.flush()
+        self.close_connection = True
+
+    def do_DELETE(self):
+        parts = urlparse(self.path).path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] != 'jobs':
+            self.send_json(404, {'error': 'unknown path'})
+            return
+        job = self.find_job(parts)
+        if job is not None:
+            self.server.job_server.cancel(job.id)
+            self.send_json(202, job.describe())
+
+    def log_message(self, format, *args):
+        """Requests are not logged."""
@@ -8,6 +8,9 @@ __author__ = "Navneet Sharma and Sushant Kumar Srivastava"
 __email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
 
 import random
+from biosim.event_log import BIRTH, DEATH, KILL, MOVE
+from biosim.quantiles import QuantileSketch
+from biosim.moments import accumulate, add_animal, NO_MOMENTS
 
 
 class Landscape:
@@ -18,6 +21,10 @@ class Landscape:
 
     """
     parameters = {}
+    event_log = None  # EventLog of the cell, see Map.attach_event_log()
+    event_cell = -1  # position of the cell in the EventLog
+    sketch_size = None  # size of the quantile sketches, None if not sketched, see Map
+    track_moments = False  # True if animal_die() updates `moments`, see Map.track_moments()
 
     def __init__(self):
         """Constructor for the landscape cells."""
@@ -129,6 +136,7 @@ class Landscape:
         self.initial_population['Carnivore'].sort(key=lambda h: h.fitness, reverse=True)
 
         self.initial_population['Herbivore'].sort(key=lambda h: h.fitness)
+        log = self.event_log
 
         for carnivore in self.initial_population['Carnivore']:
             carn_capacity = carnivore.parameters['F']
@@ -142,6 +150,10 @@ class Landscape:
                 elif carnivore.kill_prob(herbivore.fitness):
                     food_to_eat = carn_capacity - food_intake
 
+                    if log is not None:
+                        log.add(KILL, self.event_cell, herbivore.id, carnivore.id,
+                                herbivore.weight)
+
                     if herbivore.weight <= food_to_eat:
                         food_intake += herbivore.weight
                         self.initial_population['Herbivore'].remove(herbivore)
@@ -157,6 +169,7 @@ class Landscape:
         """This method extend a newborn animal population for each specie by adding their
         offspring.
         """
+        log = self.event_log
 
         for specie_type, animals in self.initial_population.items():
             newborns = []
@@ -164,7 +177,11 @@ class Landscape:
                 if animal.birth_prob(len(animals)):
                     newborn = type(animal)()
                     if animal.weight_decrease_on_birth(newborn):
+                        newborn.parent_id = animal.id
                         newborns.append(newborn)
+                        if log is not None:
+                            log.add(BIRTH, self.event_cell, newborn.id, animal.id,
+                                    newborn.weight)
             self.initial_population[specie_type].extend(newborns)
 
     def reset_animals(self):
@@ -183,6 +200,7 @@ class Landscape:
         ------------
         neighbours : dict
         """
+        log = self.event_log
 
         for migrating_specie, animals in self.initial_population.items():
 
@@ -199,6 +217,9 @@ class Landscape:
                             continue
                         else:
                             dest_cell.after_migration_population[migrating_specie].append(animal)
+                            if log is not None:
+                                log.add(MOVE, self.event_cell, animal.id, dest_cell.event_cell,
+                                        animal.weight)
                     else:
                         not_migrated_animal.append(animal)
                 self.initial_population[migrating_specie] = not_migrated_animal
@@ -229,15 +250,61 @@ class Landscape:
 
     def animal_die(self):
         """This method only keeps the animal which can survive for next year on the basis
-         of die probability.
+         of die probability. With `track_moments`, the running moments of the weight and
+         fitness of the survivors are updated on the way, see moments.add_animal(). With a
+         `sketch_size`, the ages, weights and fitness of the survivors are collected on the way
+         and summarized in quantile sketches, see update_sketches().
          """
+        log = self.event_log
+        track_moments = self.track_moments
+        sketch_size = self.sketch_size
+        if sketch_size is not None:
+            self.sketches = {}
 
         for specie_type in self.initial_population.keys():
             living_animal = []
+            moments = NO_MOMENTS
+            ages, weights, fitness = [], [], []
             for animal in self.initial_population[specie_type]:
                 if not animal.die_prob():
                     living_animal.append(animal)
+                    if track_moments:
+                        moments = add_animal(moments, animal)
+                    if sketch_size is not None:
+                        ages.append(animal.age)
+                        weights.append(animal.weight)
+                        fitness.append(animal.fitness)
+                elif log is not None:
+                    log.add(DEATH, self.event_cell, animal.id, -1, animal.weight)
             self.initial_population[specie_type] = living_animal
+            if track_moments:
+                self.moments[specie_type] = moments
+            if sketch_size is not None:
+                self.sketches[specie_type] = {
+                    'age': QuantileSketch(ages, size=sketch_size),
+                    'weight': QuantileSketch(weights, size=sketch_size),
+                    'fitness': QuantileSketch(fitness, size=sketch_size)}
+
+    def update_moments(self):
+        """This method computes the moments of the animals in a pass of their own, when the
+        tracking starts or animals are added, see Map.refresh_summaries().
+        """
+        self.moments = {specie_type: accumulate(animals)
+                        for specie_type, animals in self.initial_population.items()}
+
+    def update_sketches(self):
+        """This method summarizes the ages, weights and fitness of the animals of each
+        species in quantile sketches, which Map.quantile_sketch() merges, in a pass of their
+        own when the tracking starts or animals are added. In the yearly cycle, animal_die()
+        makes the sketches from the survivors.
+        """
+        size = self.sketch_size
+        self.sketches = {}
+        for specie_type, animals in self.initial_population.items():
+            self.sketches[specie_type] = {
+                'age': QuantileSketch([animal.age for animal in animals], size=size),
+                'weight': QuantileSketch([animal.weight for animal in animals], size=size),
+                'fitness': QuantileSketch([animal.fitness for animal in animals], size=size)}
 
 
 class Lowland(Landscape):
@@ -255,6 +322,11 @@ class Lowland(Landscape):
         super().__init__()
         self.fodder = self.parameters['f_max']
 
+    def fodder_grow(self):
+        """This method restores the amount of fodder to 'f_max' for the new year.
+        """
+        self.fodder = self.parameters['f_max']
+
     def fodder_grow_and_feeding(self):
         """This method increases the amount of fodder growth from the previous year to now and then
          calls the methods 'feed_herbivore()' and 'feed_carnivore()', respectively, in order to
@@ -272,7 +344,7 @@ class Lowland(Landscape):
             'f': The remainder available amount of fodder from previous year.
         """
 
-        self.fodder = self.parameters['f_max']
+        self.fodder_grow()
         self.feed_herbivore()
         self.feed_carnivore()
 
@@ -290,6 +362,11 @@ class Highland(Landscape):
         super().__init__()
         self.fodder = self.parameters['f_max']
 
+    def fodder_grow(self):
+        """This method restores the amount of fodder to 'f_max' for the new year.
+        """
+        self.fodder = self.parameters['f_max']
+
     def fodder_grow_and_feeding(self):
         """This method increases the amount of fodder growth from the previous year to now and then
          calls the methods 'feed_herbivore()' and 'feed_carnivore()', respectively, in order to
@@ -306,7 +383,7 @@ class Highland(Landscape):
             'f_max': The maximum possible amount of fodder in the landscape;
             'f': The remainder available amount of fodder from previous year.
         """
-        self.fodder = self.parameters['f_max']
+        self.fodder_grow()
         self.feed_herbivore()
         self.feed_carnivore()
 
@@ -322,13 +399,19 @@ class Desert(Landscape):
 
         super().__init__()
 
+    def fodder_grow(self):
+        """This method sets the amount of fodder for the new year, which is always zero
+        in the desert.
+        """
+        self.fodder = 0
+
     def fodder_grow_and_feeding(self):
         """This method increases the amount of fodder growth,
         although, for desert landscape cells, there is no fodder
         growth, then fodder is always equal to zero.
         """
 
-        self.fodder = 0
+        self.fodder_grow()
         self.feed_herbivore()
         self.feed_carnivore()
 
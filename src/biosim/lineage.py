@@ -0,0 +1,160 @@
+"""
+This is the lineage model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+from array import array
+import numpy as np
+from biosim.event_log import BIRTH, DEATH, KILL, FOUND
+
+
+class LineageStore:
+    """The LineageStore keeps the identifier, parent, birth year and death year of every animal
+    in growable integer arrays, so parent-offspring relations can be queried after the animals
+    are gone. It gets the events of the map like an EventLog.
+
+    :Example:
+        .. code-block:: python
+
+            lineage = LineageStore()
+            sim.attach_event_log(lineage)
+            sim.simulate(100)
+            lineage.descendants(founder_id)
+            lineage.surviving_lineages()
+
+    .. note::
+
+        - The animals on the map when the store is attached, and animals added later, are
+          founders, their parent is 0.
+        - Use EventSinks to keep a lineage and write an EventLog at the same time.
+    """
+
+    def __init__(self):
+        """Constructor for LineageStore class."""
+        self.ids = array('q')
+        self.parents = array('q')
+        self.birth_years = array('l')  # year of the birth, or of the founding
+        self.dead_ids = array('q')
+        self.death_years = array('l')
+        self.year = 0  # year of the events, set by BioSim
+
+    def start(self, columns):
+        """This method is called by Map.attach_event_log(), the store does not need the
+        positions of the events."""
+
+    def add(self, event, cell, animal, partner, weight):
+        """This method records births, founders and deaths, see EventLog.add(). Kills are
+        deaths, moves are not recorded.
+        """
+        if event == BIRTH or event == FOUND:
+            self.ids.append(animal)
+            self.parents.append(partner if event == BIRTH else 0)
+            self.birth_years.append(self.year)
+        elif event == DEATH or event == KILL:
+            self.dead_ids.append(animal)
+            self.death_years.append(self.year)
+
+    def flush(self):
+        """The store is kept in memory, nothing is written."""
+
+    def close(self):
+        """The store is kept in memory, nothing is closed."""
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        """Bytes used by the arrays of the store."""
+        return sum(values.itemsize * len(values) for values in
+                   (self.ids, self.parents, self.birth_years, self.dead_ids, self.death_years))
+
+    def arrays(self):
+        """This method copies the records into numpy arrays, ordered by identifier.
+
+        Returns:
+        ----------
+        tuple of numpy.ndarray with the identifiers, parents, birth years and death years, -1
+        for animals which are alive.
+        """
+        ids = np.array(self.ids, dtype=np.int64)
+        order = np.argsort(ids, kind='stable')
+        ids = ids[order]
+        parents = np.array(self.parents, dtype=np.int64)[order]
+        births = np.array(self.birth_years, dtype=np.int64)[order]
+        deaths = np.full(len(ids), -1, dtype=np.int64)
+        index, known = self.index_of(ids, np.array(self.dead_ids, dtype=np.int64))
+        deaths[index[known]] = np.array(self.death_years, dtype=np.int64)[known]
+        return ids, parents, births, deaths
+
+    @staticmethod
+    def index_of(ids, values):
+        """This method finds values in the sorted identifiers.
+
+        Returns:
+        ----------
+        tuple of numpy.ndarray with the indices and a mask of the values which were found.
+        """
+        index = np.minimum(np.searchsorted(ids, values), max(len(ids) - 1, 0))
+        known = ids[index] == values if len(ids) else np.zeros(len(values), dtype=bool)
+        return index, known
+
+    def founders(self):
+        """This method finds the founder of the lineage of every animal.
+
+        Returns:
+        ----------
+        tuple of numpy.ndarray with the identifiers, ordered, and their founders.
+        """
+        ids, parents, _, _ = self.arrays()
+        index, known = self.index_of(ids, parents)
+        # Pointer jumping: every pass doubles the number of generations looked through.
+        roots = np.where(known, index, np.arange(len(ids)))
+        while True:
+            next_roots = roots[roots]
+            if np.array_equal(next_roots, roots):
+                return ids, ids[roots]
+            roots = next_roots
+
+    def descendants(self, animal):
+        """This method lists the children, grandchildren and further descendants of an
+        animal, alive or dead.
+
+        Parameters:
+        ------------
+            animal: int
+                Identifier of the animal.
+
+        Returns:
+        ----------
+        numpy.ndarray with the ordered identifiers.
+        """
+        ids, parents, _, _ = self.arrays()
+        found = []
+        generation = np.array([animal], dtype=np.int64)
+        while len(generation):
+            generation = ids[np.isin(parents, generation)]
+            found.append(generation)
+        return np.sort(np.concatenate(found))
+
+    def surviving_lineages(self):
+        """This method counts, for every recorded year, the founders which have living
+        descendants, or are alive themselves, at the end of the year.
+
+        Returns:
+        ----------
+        dict with the number of lineages per year.
+        """
+        if len(self.ids) == 0:
+            return {}
+        ids, founders = self.founders()
+        _, _, births, deaths = self.arrays()
+        last_year = max(births.max(), deaths.max(), self.year)
+        lineages = {}
+        for year in range(int(births.min()), int(last_year) + 1):
+            alive = (births <= year) & ((deaths == -1) | (deaths > year))
+            lineages[year] = len(np.unique(founders[alive]))
+        return lineages
@@ -8,9 +8,66 @@ January 2023.
 __author__ = "Navneet Sharma and Sushant Kumar Srivastava"
 __email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
 
+import sys
 import textwrap
+import time
+from collections.abc import Mapping
+import numpy as np
 from biosim.landscape import Lowland, Highland, Desert, Water
-from biosim.fauna import Herbivore, Carnivore
+from biosim.fauna import Fauna, Herbivore, Carnivore
+from biosim.topology import SharedTopology
+from biosim.event_log import FOUND
+from biosim.quantiles import QuantileSketch, SKETCH_PROPERTIES
+from biosim.moments import cell_summary, combine
+
+# Columns of a population as structured array, see Map.add_population_arrays(). Positions are
+# 1-based as the 'loc' of a population list and species are indices into Map.species_names.
+POPULATION_DTYPE = np.dtype([('row', np.int64), ('col', np.int64), ('species', np.uint8),
+                             ('age', np.int64), ('weight', np.float64),
+                             ('fitness', np.float64)])
+
+
+class CellsView(Mapping):
+    """Read-only mapping from every (row, column) position of a Map to its landscape cell.
+
+    The Map only stores its livable cells. Every Water position is answered with the one Water
+    cell shared by the whole map, so the view behaves like a dict of all cells without
+    instantiating them. Water positions which were given animals by add_population() have
+    their own Water cell. The super-individual and cohort engines keep no cell objects, their
+    livable positions raise a RuntimeError.
+    """
+
+    def __init__(self, island_map):
+        """Constructor for CellsView class.
+
+        Parameters:
+        ------------
+            island_map: Map
+        """
+        self.island_map = island_map
+
+    def __getitem__(self, loc):
+        try:
+            row, col = loc
+        except (TypeError, ValueError):
+            raise KeyError(loc)
+        rows, cols = self.island_map.landscape_grid.shape
+        if not (0 <= row < rows and 0 <= col < cols):
+            raise KeyError(loc)
+        index = int(self.island_map.livable_index[row, col])
+        if index < 0:
+            return self.island_map.water_animals.get((row, col), self.island_map.water_cell)
+        if not self.island_map.livable_list:
+            raise RuntimeError('Landscape cells of livable positions need an engine which '
+                               'keeps cell objects, not ' + type(self.island_map).__name__ + '.')
+        return self.island_map.livable_list[index]
+
+    def __iter__(self):
+        rows, cols = self.island_map.landscape_grid.shape
+        return ((i, j) for i in range(rows) for j in range(cols))
+
+    def __len__(self):
+        return self.island_map.landscape_grid.size
 
 
 class Map:
@@ -28,6 +85,8 @@ class Map:
 
         - Only H, L, D and W cell representation are accepted.
         - All map rows need to be the same length.
+        - Only livable cells are stored as objects. cells_dict is a CellsView which returns one
+          shared Water cell for all Water positions.
     """
 
     # Dict consisting of landscape classes used for migration.
@@ -40,20 +99,89 @@ class Map:
     # Dict consisting of animal classes used for adding population
     animal_classes = {'Carnivore': Carnivore, 'Herbivore': Herbivore
                       }
+    # Species in the order of their codes in population arrays
+    species_names = ('Herbivore', 'Carnivore')
     # Dict consisting of landscape classes in which animal can live
     livable_cells = {'H': Highland, 'L': Lowland, 'D': Desert}
+    # Landscape letters in the order of their codes in landscape_grid, 0 is Water.
+    landscape_letters = 'WLHD'
+    # Code used in the lookup table for characters which are not landscape letters.
+    invalid_code = 255
+    # True if the landscape cells hold single animals, and keep their quantile sketches and
+    # moments.
+    animals_in_cells = True
 
     def __init__(self, island_map):
-        """Constructor for Map class"""
+        """Constructor for Map class, island_map is the map string or a SharedTopology"""
+        self.topology = None  # SharedTopology the arrays are read from, see share_topology()
+        if isinstance(island_map, SharedTopology):
+            self.topology = island_map
         self.island_map = island_map  # save island_map_str as property
-        self.cell_list = self.geo_list()  # storing the island_map str converted to list
-        self.check_invalid_map()  # checking for all types of invalid map given as input.
+        if self.topology is None:
+            self.landscape_grid = self.parse_map(island_map)  # uint8 landscape code per cell
+            self.check_invalid_map()  # checking for all types of invalid map given as input.
+        else:
+            self.landscape_grid = self.topology.arrays['landscape_grid']
         self.herb_pop_matrix = [[0 for _ in self.unique_columns()] for _ in
                                 self.unique_rows()]  # Herbivore population matrix
         self.carn_pop_matrix = [[0 for _ in self.unique_columns()] for _ in
                                 self.unique_rows()]  # Carnivore population matrix
-        self.cells_dict = self.create_cells()  # storing the dict with coordinates and cells
-        self.neighbours_dict = self.create_neighbours_dict()  # storing the dict with neighbours
+        self.water_cell = Water()  # shared by all Water positions, it never holds animals
+        self.water_animals = {}  # Water cells created because animals were placed on them
+        self.livable_locs = self.shared('livable_locs', lambda: np.argwhere(
+            self.landscape_grid != 0))  # (row, col) of livable cells
+        self.livable_index = self.shared('livable_index', self.create_livable_index)  # -1 Water
+        self.livable_dict = self.create_cells()  # storing the dict with livable coordinates
+        self.livable_list = list(self.livable_dict.values())  # livable cells in index order
+        self.cells_dict = CellsView(self)  # lookup of every coordinate, Water implicitly
+        self.neighbour_table = self.shared('neighbour_table',
+                                           self.create_neighbour_table)  # index of neighbours
+        self.neighbours_dict = self.create_livable_neighbours()  # neighbour cells of livable loc
+        self.profiler = None  # PhaseProfiler timing the yearly cycle, None if not profiled
+        self.event_log = None  # EventLog of the animals, see attach_event_log()
+        self.sketch_size = None  # size of the quantile sketches, see track_quantiles()
+        self.moments_tracked = False  # True if the cells keep moments, see track_moments()
+
+    def __getstate__(self):
+        """The pickled map keeps the identifier counter of the animals, so animals created
+        after unpickling in another process get new identifiers."""
+        state = self.__dict__.copy()
+        state['last_animal_id'] = Fauna.last_id
+        return state
+
+    def __setstate__(self, state):
+        Fauna.last_id = max(Fauna.last_id, state.pop('last_animal_id', 0))
+        self.__dict__.update(state)
+
+    def shared(self, key, create):
+        """This method returns an array of the shared topology, or creates it without one.
+
+        Parameters:
+        ------------
+            key: str
+            create: callable
+
+        Returns:
+        ----------
+        numpy.ndarray
+        """
+        if self.topology is None:
+            return create()
+        return self.topology.arrays[key]
+
+    def share_topology(self):
+        """This method copies the immutable arrays of the map into shared memory, see
+        SharedTopology. Worker processes pass the result instead of the map string.
+
+        Returns:
+        ----------
+        SharedTopology
+        """
+        return SharedTopology.create({'landscape_grid': self.landscape_grid,
+                                      'livable_locs': self.livable_locs,
+                                      'livable_index': self.livable_index,
+                                      'neighbour_table': self.neighbour_table},
+                                     self.landscape_letters)
 
     def geo_list(self):
         """This method converts island_map str into list with each element corresponding to
@@ -66,47 +194,88 @@ class Map:
         cells_list = textwrap.dedent(str(self.island_map)).splitlines()
         return [list(row.strip()) for row in cells_list]
 
-    def check_invalid_map(self):
-        """This method check for various invalid map types given as str.
+    @property
+    def cell_list(self):
+        """List of rows with the landscape letter of each cell, see geo_list()."""
+        return self.geo_list()
 
-        Checks for Invalid line lengths.
-        Checks for Invalid character.
-        Checks for Invalid Edges : has to be water surrounding the map.
+    @classmethod
+    def parse_map(cls, island_map):
+        """This method converts the island_map str into a grid of landscape codes in one pass,
+        0 for Water, 1 for Lowland, 2 for Highland and 3 for Desert. Characters which are not
+        landscape letters get the code 255, see check_invalid_map().
+
+        Parameters:
+        ------------
+            island_map: str
+
+        Returns:
+        ----------
+        numpy.ndarray of dtype uint8 with one row per map line.
 
         Raises:
         ----------
-        ValueError if conditions are met.
+        ValueError if the map is empty or the rows are not of equal length.
         """
+        # Stripping every row also removes any common indentation of the map string.
+        rows = [row.strip() for row in str(island_map).splitlines()]
+        if len(rows) == 0 or len(rows[0]) == 0:
+            raise ValueError("The given Map is not Valid,The map is empty.")
+
+        lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        bad_rows = np.flatnonzero(lengths != lengths[0])
+        if bad_rows.size > 0:
+            raise ValueError("The given Map is not Valid,The row length is not equal at rows :"
+                             + ', '.join(str(row + 1) for row in bad_rows))
+
+        lookup = np.full(256, cls.invalid_code, dtype=np.uint8)
+        for code, letter in enumerate(cls.landscape_letters):
+            lookup[ord(letter)] = code
+        # Characters outside ASCII become '?', which keeps one byte per cell.
+        raw = np.frombuffer(''.join(rows).encode('ascii', errors='replace'), dtype=np.uint8)
+        return lookup[raw].reshape(len(rows), lengths[0])
 
-        rows, cols = len(self.cell_list), len(self.cell_list[0])
-        for i in range(rows):
+    @staticmethod
+    def format_positions(positions):
+        """This method formats (row, column) indices as 1-based 'row,col' positions.
 
-            if len(self.cell_list[i]) != cols:
-                raise ValueError("The given Map is not Valid,The row length is not equal.")
+        Parameters:
+        ------------
+            positions: numpy.ndarray
+                Array of shape (n, 2) as returned by numpy.argwhere().
 
-            for k in range(len(self.cell_list[i])):
-                if self.cell_list[i][k] not in self.landscape_classes.keys():
-                    raise ValueError(
-                        "Invalid Character in the Map at pos:" + str(i + 1) + ',' + str(k + 1))
+        Returns:
+        ----------
+        str
+        """
+        return '; '.join(f'{row + 1},{col + 1}' for row, col in positions)
 
-            if self.cell_list[i][0] != 'W':
-                raise ValueError(
-                    "The given Map is not Valid,The edges of Map has to be Water at pos :" + str(
-                        i + 1) + ',' + str(1))
+    def check_invalid_map(self):
+        """This method check for various invalid map types given as str.
+
+        Checks for Invalid line lengths (in parse_map()).
+        Checks for Invalid character.
+        Checks for Invalid Edges : has to be water surrounding the map.
 
-            if self.cell_list[i][cols - 1] != 'W':
-                raise ValueError(
-                    "The given Map is not Valid,The edges of Map has to be Water at pos :" + str(
-                        i + 1) + ',' + str(cols))
+        All invalid positions are reported at once.
 
-            if i == 0 or i == rows - 1:
-                cell_l = (self.cell_list[i][:cols])
-                for j in range(len(cell_l)):
-                    if cell_l[j] != 'W':
-                        raise ValueError(
-                            "The given Map is not Valid,The edges of Map has to be Water at pos :"
-                            + str(
-                                i + 1) + ',' + str(j + 1))
+        Raises:
+        ----------
+        ValueError if conditions are met.
+        """
+        grid = self.landscape_grid
+        invalid = grid == self.invalid_code
+        if invalid.any():
+            raise ValueError("Invalid Character in the Map at pos:" +
+                             self.format_positions(np.argwhere(invalid)))
+
+        edge = np.zeros(grid.shape, dtype=bool)
+        edge[[0, -1], :] = grid[[0, -1], :] != 0
+        edge[:, [0, -1]] |= grid[:, [0, -1]] != 0
+        if edge[[0, -1], :].any() or edge[:, [0, -1]].any():
+            not_water = np.argwhere(edge)
+            raise ValueError("The given Map is not Valid,The edges of Map has to be Water at pos :"
+                             + self.format_positions(not_water))
 
     @staticmethod
     def check_dict_type(ar):
@@ -133,19 +302,83 @@ class Map:
         combined_dict = dict(**self.animal_classes, **self.landscape_classes)
         combined_dict[key].set_parameters(params)
 
+    @classmethod
+    def parameter_state(cls):
+        """This method copies the parameters of all animals and landscapes, which are kept on
+        their classes and shared by all maps of the process.
+
+        Returns:
+        ----------
+        dict with a dict of parameters per species and landscape letter.
+        """
+        classes = dict(**cls.animal_classes, **cls.landscape_classes)
+        return {name: dict(klass.parameters) for name, klass in classes.items()}
+
+    @classmethod
+    def restore_parameters(cls, state):
+        """This method sets the parameters of all animals and landscapes to a copy made by
+        parameter_state().
+
+        Parameters:
+        ------------
+            state: dict
+        """
+        classes = dict(**cls.animal_classes, **cls.landscape_classes)
+        for name, params in state.items():
+            classes[name].parameters.clear()
+            classes[name].parameters.update(params)
+
+    def create_livable_index(self):
+        """This method creates a grid with the index of each livable cell in livable_locs and
+        -1 for Water.
+
+        Returns:
+        ----------
+        numpy.ndarray of dtype int32
+        """
+        livable_index = np.full(self.landscape_grid.shape, -1, dtype=np.int32)
+        livable_index[self.livable_locs[:, 0], self.livable_locs[:, 1]] = \
+            np.arange(len(self.livable_locs), dtype=np.int32)
+        return livable_index
+
     def create_cells(self):
-        """This method creates a dictionary with the coordinates on
-        keys and landscape objects on values.
+        """This method creates a dictionary with the coordinates of the livable cells on
+        keys and landscape objects on values. Water cells are not created, see CellsView.
 
         Returns:
         ----------
         dict
         """
-        pos = [(i, j) for i in range(len(self.cell_list))
-               for j in range(len(self.cell_list[0]))]
-        geo = [self.landscape_classes[geo]() for k in range(len(self.cell_list))
-               for geo in self.cell_list[k]]
-        return dict(zip(pos, geo))
+        classes = [self.landscape_classes[letter] for letter in self.landscape_letters]
+        codes = self.landscape_grid[self.livable_locs[:, 0], self.livable_locs[:, 1]]
+        return {(i, j): classes[code]()
+                for (i, j), code in zip(self.livable_locs.tolist(), codes.tolist())}
+
+    def create_neighbour_table(self):
+        """This method finds the west, north, south and east neighbours of every livable cell.
+
+        Returns:
+        ----------
+        numpy.ndarray of shape (number of livable cells, 4) with the index of the neighbour in
+        livable_locs, or -1 if the neighbour is Water.
+        """
+        rows, cols = self.livable_locs[:, 0], self.livable_locs[:, 1]
+        return np.stack([self.livable_index[rows, cols - 1], self.livable_index[rows - 1, cols],
+                         self.livable_index[rows + 1, cols], self.livable_index[rows, cols + 1]],
+                        axis=1)
+
+    def create_livable_neighbours(self):
+        """This method creates a dictionary with the coordinates of the livable cells on keys
+        and the list of the neighbour cells (west, north, south, east) on values. Water
+        neighbours are the shared Water cell.
+
+        Returns:
+        ----------
+        dict
+        """
+        cells = self.livable_list + [self.water_cell]  # index -1 picks the Water cell
+        return {loc: [cells[index] for index in neighbours]
+                for loc, neighbours in zip(self.livable_dict, self.neighbour_table.tolist())}
 
     def find_cell_object(self):
 
@@ -166,7 +399,7 @@ class Map:
         return dict(zip(loc, loc_object)), dict(zip(m_loc, migrate_loc_object))
 
     def livable_cell_calculate(self):
-        """This method creates a dictionary with only the coordinates
+        """This method returns the dictionary with only the coordinates
         that are livable and store the coordinates on keys and
         landscape objects on values.
 
@@ -174,8 +407,7 @@ class Map:
         ----------
             dict
         """
-        livable_cells, _ = self.find_cell_object()
-        return livable_cells
+        return self.livable_dict
 
     def migrate_cell_calculate(self):
         """This method creates a dictionary with only the coordinates
@@ -191,8 +423,9 @@ class Map:
 
     def create_neighbours_dict(self):
         """This method localizes the neighbour cells (north, south,
-        west and east), checks if they are livable and returns a
-        location of landscape objects.
+        west and east) of every cell, Water included, and returns a
+        location of landscape objects. The Map itself only keeps the
+        neighbours of livable cells, see create_livable_neighbours().
 
         Returns:
         ----------
@@ -200,16 +433,79 @@ class Map:
         """
         own_loc = []
         neighbours = []
+        migrate_cells = self.migrate_cell_calculate()
         for loc, _ in self.cells_dict.items():
             own_loc.append(loc)
             neighbour_pos = [(loc[0], loc[1] - 1), (loc[0] - 1, loc[1]),
                              (loc[0] + 1, loc[1]), (loc[0], loc[1] + 1)]
-            neighbours_loc = [self.migrate_cell_calculate()[loc] for loc in neighbour_pos if
-                              loc in self.migrate_cell_calculate().keys()]
+            neighbours_loc = [migrate_cells[loc] for loc in neighbour_pos if
+                              loc in migrate_cells]
             neighbours.append(neighbours_loc)
 
         return dict(zip(own_loc, neighbours))
 
+    @classmethod
+    def population_arrays(cls, given_population):
+        """This method turns a population list into the columns of add_population_arrays().
+
+        Parameter:
+        ----------
+            given_population: list
+
+        Returns:
+        ----------
+        tuple with the positions, species codes, ages and weights as numpy.ndarray.
+
+        Raises:
+        ----------
+        KeyError for an unknown species.
+        """
+        codes = {name: code for code, name in enumerate(cls.species_names)}
+        sizes = [len(population['pop']) for population in given_population]
+        locs = np.repeat(np.array([population['loc'] for population in given_population],
+                                  dtype=np.int64).reshape(-1, 2), sizes, axis=0)
+        individuals = [individual for population in given_population
+                       for individual in population['pop']]
+        species = np.fromiter((codes[individual['species']] for individual in individuals),
+                              dtype=np.uint8, count=len(individuals))
+        ages = np.array([individual['age'] for individual in individuals])
+        weights = np.array([individual['weight'] for individual in individuals])
+        return locs, species, ages, weights
+
+    @classmethod
+    def population_columns(cls, locs, species=None, ages=None, weights=None):
+        """This method checks the arguments of add_population_arrays() and returns them as
+        columns.
+
+        Returns:
+        ----------
+        tuple with the 0-based rows and columns, species codes, ages and weights.
+
+        Raises:
+        ----------
+        KeyError for an unknown species name, ValueError for columns of different lengths,
+        unknown species codes or negative weights.
+        """
+        locs = np.asarray(locs)
+        if locs.dtype.names is not None:
+            rows, cols = locs['row'], locs['col']
+            species, ages, weights = locs['species'], locs['age'], locs['weight']
+        else:
+            locs = locs.reshape(-1, 2)
+            rows, cols = locs[:, 0], locs[:, 1]
+        species, ages, weights = np.asarray(species), np.asarray(ages), np.asarray(weights)
+        if species.dtype.kind in 'USO':
+            codes = {name: code for code, name in enumerate(cls.species_names)}
+            names, species = np.unique(species, return_inverse=True)
+            species = np.array([codes[name] for name in names.tolist()], dtype=np.uint8)[species]
+        if not len(rows) == len(species) == len(ages) == len(weights):
+            raise ValueError("The population columns must have the same length.")
+        if np.any(species >= len(cls.species_names)) or np.any(species < 0):
+            raise ValueError("Unknown species code in the population.")
+        if np.any(weights < 0):
+            raise ValueError("Negative weight is not allowed to enter!!")
+        return rows.astype(np.int64) - 1, cols.astype(np.int64) - 1, species, ages, weights
+
     def add_population(self, given_population):
         """This method creates the population objects inside the
         cells.
@@ -218,15 +514,81 @@ class Map:
         ----------
             given_pop: list
         """
-        for population in given_population:
+        self.add_population_arrays(*self.population_arrays(given_population))
+
+    def add_population_arrays(self, locs, species=None, ages=None, weights=None):
+        """This method adds many animals at once. The columns are checked with vectorized
+        tests before any animal is added, and the animals of each cell are created in one
+        go.
+
+        Parameter:
+        ----------
+            locs: numpy.ndarray
+                1-based (row, column) position of every animal, shape (n, 2), or a structured
+                array with the fields of POPULATION_DTYPE, e.g. from export_population(),
+                in which case the other arguments are ignored.
+            species: numpy.ndarray
+                Code (index into species_names) or name of the species of every animal.
+            ages: numpy.ndarray
+            weights: numpy.ndarray
 
-            location = (int(population['loc'][0]) - 1, int(population['loc'][1]) - 1)
-            loc_object = self.cells_dict[location]
-            for population_individual in population['pop']:
-                type_animal = population_individual['species']
-                age_weight = (population_individual['age'], population_individual['weight'])
-                pop_object = self.animal_classes[type_animal](*age_weight)
-                loc_object.initial_population[type(pop_object).__name__].append(pop_object)
+        Raises:
+        ----------
+        KeyError if a position is outside the map, see population_columns() for the other
+        errors.
+        """
+        rows, cols, species, ages, weights = self.population_columns(locs, species, ages,
+                                                                     weights)
+        if len(rows) == 0:
+            return
+        shape = self.landscape_grid.shape
+        outside = (rows < 0) | (rows >= shape[0]) | (cols < 0) | (cols >= shape[1])
+        if outside.any():
+            first = np.argmax(outside)
+            raise KeyError((int(rows[first]), int(cols[first])))
+
+        # Stable grouping by species and cell keeps the order of the animals within a cell,
+        # the animals of each species are then created in one go.
+        keys = species.astype(np.int64) * (shape[0] * shape[1]) + rows * shape[1] + cols
+        order = np.argsort(keys, kind='stable')
+        keys, species = keys[order], species[order]
+        ages, weights = ages[order].tolist(), weights[order].tolist()
+        animals = []
+        for code, name in enumerate(self.species_names):
+            start, end = np.searchsorted(species, [code, code + 1]).tolist()
+            animals += self.animal_classes[name].from_arrays(ages[start:end], weights[start:end])
+
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(keys)].tolist()
+        firsts = order[starts]
+        receiving = {}
+        for start, end, row, col, code in zip(starts.tolist(), ends, rows[firsts].tolist(),
+                                              cols[firsts].tolist(), species[starts].tolist()):
+            loc_object = self.livable_dict.get((row, col))
+            if loc_object is None:
+                loc_object = self.water_animals.setdefault((row, col), Water())
+            loc_object.initial_population[self.species_names[code]] += animals[start:end]
+            receiving[row, col] = loc_object
+            if self.event_log is not None:
+                self.log_founders(row * shape[1] + col, animals[start:end])
+        self.refresh_summaries(receiving.values())
+
+    def refresh_summaries(self, cells):
+        """This method updates the quantile sketches and the moments of cells which were
+        given animals, so they do not wait for the next death pass. Water cells, which have
+        no death pass, get their sketches and moments this way only.
+
+        Parameters:
+        ------------
+            cells: iterable of Landscape
+        """
+        for cell in cells:
+            if self.sketch_size is not None:
+                cell.sketch_size = self.sketch_size
+                cell.update_sketches()
+            if self.moments_tracked:
+                cell.track_moments = True
+                cell.update_moments()
 
     def yearly_cycle(self):
         """This method calls, in order, the methods that compound
@@ -239,7 +601,13 @@ class Map:
             5. Animal's aging;
             6. Animal's weight loss;
             7. Animal's death.
+
+        If a profiler is attached, the cycle is run by profiled_yearly_cycle() instead.
         """
+        if self.profiler is not None:
+            self.profiled_yearly_cycle()
+            return
+
         for loc, loc_object in self.livable_cell_calculate().items():
             loc_object.add_newborn()
             loc_object.fodder_grow_and_feeding()
@@ -250,6 +618,351 @@ class Map:
             loc_object.weight_decrease()
             loc_object.animal_die()
 
+    def profiled_yearly_cycle(self):
+        """This method runs the same yearly cycle as yearly_cycle(), but measures the wall time
+        of each phase and adds it to the attached profiler.
+        """
+        timer = time.perf_counter
+        phases = ('birth', 'grazing', 'predation', 'migration', 'aging', 'weight_loss', 'death')
+        elapsed = dict.fromkeys(phases, 0.0)
+        start = timer()
+        cells = self.livable_cell_calculate()
+
+        for loc, loc_object in cells.items():
+            t0 = timer()
+            loc_object.add_newborn()
+            t1 = timer()
+            loc_object.fodder_grow()
+            loc_object.feed_herbivore()
+            t2 = timer()
+            loc_object.feed_carnivore()
+            t3 = timer()
+            loc_object.animal_migrate(self.neighbours_dict[loc])
+            t4 = timer()
+            elapsed['birth'] += t1 - t0
+            elapsed['grazing'] += t2 - t1
+            elapsed['predation'] += t3 - t2
+            elapsed['migration'] += t4 - t3
+
+        for loc, loc_object in cells.items():
+            t0 = timer()
+            loc_object.add_migrated_population()
+            t1 = timer()
+            loc_object.age_increase()
+            t2 = timer()
+            loc_object.weight_decrease()
+            t3 = timer()
+            loc_object.animal_die()
+            t4 = timer()
+            elapsed['migration'] += t1 - t0
+            elapsed['aging'] += t2 - t1
+            elapsed['weight_loss'] += t3 - t2
+            elapsed['death'] += t4 - t3
+
+        for phase in phases:
+            self.profiler.add(phase, elapsed[phase], count=len(cells), start=start)
+
+    def attach_event_log(self, event_log):
+        """This method lets all livable cells write their births, deaths, kills and moves to
+        an EventLog, or another object with its start() and add() methods, e.g. a
+        LineageStore. The animals on the map and those added later are logged as founders.
+        Maps with a log can not be pickled.
+
+        Parameters:
+        ------------
+            event_log: EventLog
+                None to stop logging.
+        """
+        columns = self.landscape_grid.shape[1]
+        if event_log is not None:
+            event_log.start(columns)
+        for (row, col), cell in zip(self.livable_locs.tolist(), self.livable_list):
+            cell.event_log = event_log
+            cell.event_cell = row * columns + col
+        self.event_log = event_log
+        if event_log is not None:
+            locations = self.livable_locs.tolist() + [list(loc) for loc in self.water_animals]
+            for (row, col), cell in zip(locations, self.populated_cells()):
+                for group in (cell.initial_population, cell.after_migration_population):
+                    for animals in group.values():
+                        self.log_founders(row * columns + col, animals)
+
+    def log_founders(self, cell, animals):
+        """This method logs animals of one cell, which were not born on the island, as
+        founders.
+
+        Parameters:
+        ------------
+            cell: int
+                Position of the cell in the EventLog.
+            animals: list
+        """
+        for animal in animals:
+            self.event_log.add(FOUND, cell, animal.id, -1, animal.weight)
+
+    def track_quantiles(self, size):
+        """This method lets every cell keep quantile sketches of its animals, which are
+        updated in the yearly cycle, see Landscape.update_sketches(). Engines without single
+        animals make the sketches from their value arrays instead.
+
+        Parameters:
+        ------------
+            size: int
+                Size of the sketches, None to stop.
+        """
+        self.sketch_size = size
+        if not self.animals_in_cells:
+            return
+        for cell in self.populated_cells():
+            cell.sketch_size = size
+            if size is not None:
+                cell.update_sketches()
+
+    def quantile_sketch(self, species, prop):
+        """This method merges the sketches of all cells into one sketch of the island. Without
+        track_quantiles() the sketch is made from the values of all animals.
+
+        Parameters:
+        ------------
+            species: str
+            prop: str
+                'age', 'weight' or 'fitness'.
+
+        Returns:
+        ----------
+        QuantileSketch
+
+        Raises:
+        ----------
+        KeyError for an unknown property.
+        """
+        if prop not in SKETCH_PROPERTIES:
+            raise KeyError('Unknown property: ' + str(prop))
+        if self.sketch_size is None or not self.animals_in_cells:
+            return self.values_sketch(species, prop)
+        return QuantileSketch.merge((cell.sketches[species][prop]
+                                     for cell in self.populated_cells()), self.sketch_size)
+
+    def track_moments(self, enabled=True):
+        """This method lets every cell keep the count, mean and variance of the weight and
+        fitness of its animals, updated in the death pass of the yearly cycle.
+
+        Parameters:
+        ------------
+            enabled: boolean
+
+        Raises:
+        ----------
+        RuntimeError if the engine does not keep single animals.
+        """
+        if enabled and not self.animals_in_cells:
+            raise RuntimeError('Moments per cell need the individual engine.')
+        self.moments_tracked = enabled
+        for cell in self.populated_cells():
+            cell.track_moments = enabled
+            if enabled:
+                cell.update_moments()
+
+    def raw_moments(self, species, cells):
+        """This method stacks the running moments of cells into an array."""
+        if not self.moments_tracked:
+            raise RuntimeError('Moments are not tracked, see track_moments().')
+        return np.array([cell.moments[species] for cell in cells], dtype=float).reshape(-1, 5)
+
+    def cell_moments(self, species):
+        """This method returns the moments of every livable cell.
+
+        Parameters:
+        ------------
+            species: str
+
+        Returns:
+        ----------
+        dict with the numpy.ndarray 'count' and one per MOMENT_KEYS, in the order of
+        livable_locs, see moments.cell_summary().
+        """
+        return cell_summary(self.raw_moments(species, self.livable_list))
+
+    def island_moments(self, species):
+        """This method merges the moments of all cells.
+
+        Parameters:
+        ------------
+            species: str
+
+        Returns:
+        ----------
+        dict with the 'count' and the MOMENT_KEYS of the island, see moments.combine().
+        """
+        return combine(self.raw_moments(species, self.populated_cells()))
+
+    def values_sketch(self, species, prop):
+        """This method makes a sketch from the values of all animals of a species.
+
+        Returns:
+        ----------
+        QuantileSketch
+        """
+        getter = 'get_pop_{}_{}'.format(prop, 'herb' if species == 'Herbivore' else 'carn')
+        values = getattr(self, getter)()
+        if self.sketch_size is None:
+            return QuantileSketch(values, size=max(len(values), 1))
+        return QuantileSketch(values, size=self.sketch_size)
+
+    def populated_cells(self):
+        """This method returns all cells which can hold animals, the livable cells and the Water
+        cells which were given animals by add_population().
+
+        Returns:
+        ----------
+        list
+        """
+        return self.livable_list + list(self.water_animals.values())
+
+    def to_population(self):
+        """This method lists the animals of the island in the format of add_population(), with
+        1-based positions.
+
+        Returns:
+        ----------
+        List of dictionaries with 'loc' and 'pop'.
+        """
+        locations = [tuple(loc) for loc in self.livable_locs.tolist()] + \
+            list(self.water_animals)
+        population = []
+        for loc, cell in zip(locations, self.populated_cells()):
+            pop = [{'species': species, 'age': animal.age, 'weight': animal.weight}
+                   for species in self.animal_classes
+                   for group in (cell.initial_population, cell.after_migration_population)
+                   for animal in group[species]]
+            if pop:
+                population.append({'loc': (loc[0] + 1, loc[1] + 1), 'pop': pop})
+        return population
+
+    @staticmethod
+    def structured_population(rows, cols, species, ages, weights, fitness):
+        """This method puts population columns into a structured array of POPULATION_DTYPE.
+
+        Parameters:
+        ------------
+            rows: numpy.ndarray
+                1-based rows.
+            cols: numpy.ndarray
+                1-based columns.
+            species: numpy.ndarray
+                Species codes, see species_names.
+            ages: numpy.ndarray
+            weights: numpy.ndarray
+            fitness: numpy.ndarray
+
+        Returns:
+        ----------
+        numpy.ndarray of POPULATION_DTYPE
+        """
+        records = np.empty(len(ages), dtype=POPULATION_DTYPE)
+        records['row'], records['col'], records['species'] = rows, cols, species
+        records['age'], records['weight'], records['fitness'] = ages, weights, fitness
+        return records
+
+    @classmethod
+    def population_list(cls, records):
+        """This method turns a structured population array into a population list, one entry
+        per position in the order of the positions.
+
+        Parameters:
+        ------------
+            records: numpy.ndarray of POPULATION_DTYPE
+
+        Returns:
+        ----------
+        List of dictionaries with 'loc' and 'pop'.
+        """
+        if len(records) == 0:
+            return []
+        records = records[np.lexsort((records['col'], records['row']))]
+        rows, cols = records['row'].tolist(), records['col'].tolist()
+        species = [cls.species_names[code] for code in records['species'].tolist()]
+        ages, weights = records['age'].tolist(), records['weight'].tolist()
+        starts = np.flatnonzero(np.r_[True, (np.diff(records['row']) != 0) |
+                                      (np.diff(records['col']) != 0)]).tolist()
+        population = []
+        for start, end in zip(starts, starts[1:] + [len(records)]):
+            pop = [{'species': name, 'age': age, 'weight': weight} for name, age, weight in
+                   zip(species[start:end], ages[start:end], weights[start:end])]
+            population.append({'loc': (rows[start], cols[start]), 'pop': pop})
+        return population
+
+    def export_population(self):
+        """This method lists every animal of the island with its position, species, age,
+        weight and fitness. The array can be given to add_population_arrays().
+
+        Returns:
+        ----------
+        numpy.ndarray of POPULATION_DTYPE, ordered by cell and, within a cell, by species.
+        """
+        locations = self.livable_locs.tolist() + [list(loc) for loc in self.water_animals]
+        rows, cols, species, ages, weights, fitness = [], [], [], [], [], []
+        for (row, col), cell in zip(locations, self.populated_cells()):
+            for code, name in enumerate(self.species_names):
+                animals = cell.initial_population[name] + cell.after_migration_population[name]
+                if animals:
+                    rows += [row + 1] * len(animals)
+                    cols += [col + 1] * len(animals)
+                    species += [code] * len(animals)
+                    ages += [animal.age for animal in animals]
+                    weights += [animal.weight for animal in animals]
+                    fitness += [animal.fitness for animal in animals]
+        return self.structured_population(rows, cols, species, ages, weights, fitness)
+
+    def count_animals(self, species):
+        """This method counts the animals of one species in every livable cell, including the
+        animals which migrated to the cell this year.
+
+        Parameters:
+        ----------
+            species: str
+
+        Returns:
+        ----------
+        numpy.ndarray with one count per livable cell, in the order of livable_locs.
+        """
+        return np.fromiter((len(cell.initial_population[species]) +
+                            len(cell.after_migration_population[species])
+                            for cell in self.livable_list),
+                           dtype=np.int64, count=len(self.livable_list))
+
+    def count_matrix(self, species):
+        """This method places the animal counts of count_animals() on the map grid, Water
+        cells count zero.
+
+        Parameters:
+        ----------
+            species: str
+
+        Returns:
+        ----------
+        numpy.ndarray of the shape of the map.
+        """
+        matrix = np.zeros(self.landscape_grid.shape, dtype=np.int64)
+        matrix[self.livable_locs[:, 0], self.livable_locs[:, 1]] = self.count_animals(species)
+        for loc, cell in self.water_animals.items():
+            matrix[loc] = len(cell.initial_population[species])
+        return matrix
+
+    def count_total(self, species):
+        """This method counts all animals of one species on the island.
+
+        Parameters:
+        ----------
+            species: str
+
+        Returns:
+        ----------
+        int
+        """
+        return int(self.count_animals(species).sum()) + \
+            sum(len(cell.initial_population[species]) for cell in self.water_animals.values())
+
     def calculate_animal_count(self):
         """This method calculates the distribution of the Herbivore and Carnivore
         and stores into dict along with row and column no.
@@ -258,19 +971,11 @@ class Map:
         ----------
         Dict
         """
-
-        pop = {'Row_no': [], 'Col_no': [], 'Herbivore': [],
-               'Carnivore': []}
-        for loc, loc_object in self.cells_dict.items():
-            pop['Row_no'].append(loc[0])
-            pop['Col_no'].append(loc[1])
-            pop['Herbivore'].append(
-                len(loc_object.initial_population['Herbivore']) +
-                len(loc_object.after_migration_population['Herbivore']))
-            pop['Carnivore'].append(
-                len(loc_object.initial_population['Carnivore']) +
-                len(loc_object.after_migration_population['Carnivore']))
-        return pop
+        rows, cols = np.divmod(np.arange(self.landscape_grid.size),
+                               self.landscape_grid.shape[1])
+        return {'Row_no': rows.tolist(), 'Col_no': cols.tolist(),
+                'Herbivore': self.count_matrix('Herbivore').ravel().tolist(),
+                'Carnivore': self.count_matrix('Carnivore').ravel().tolist()}
 
     def get_pop_tot_num_herb(self):
         """This method calculates the total no of herbivores on an island.
@@ -280,8 +985,7 @@ class Map:
         int
         """
 
-        pop = self.calculate_animal_count()
-        return sum(pop["Herbivore"])
+        return self.count_total('Herbivore')
 
     def get_pop_tot_num_carn(self):
         """This method calculates the total no of carnivores on an island.
@@ -291,8 +995,7 @@ class Map:
         int
         """
 
-        pop = self.calculate_animal_count()
-        return sum(pop["Carnivore"])
+        return self.count_total('Carnivore')
 
     def get_pop_tot_num(self):
         """This method calculates the total no of animals on an island.
@@ -302,8 +1005,51 @@ class Map:
         int
         """
 
-        pop = self.calculate_animal_count()
-        return sum(pop["Carnivore"]) + sum(pop["Herbivore"])
+        return self.get_pop_tot_num_herb() + self.get_pop_tot_num_carn()
+
+    @staticmethod
+    def cell_nbytes(cell):
+        """This method estimates the memory of one landscape cell without its animals.
+
+        Parameters:
+        ----------
+            cell: Landscape
+
+        Returns:
+        ----------
+        int : bytes
+        """
+        nbytes = sys.getsizeof(cell) + sys.getsizeof(cell.__dict__)
+        for population in (cell.initial_population, cell.after_migration_population):
+            nbytes += sys.getsizeof(population)
+            nbytes += sum(sys.getsizeof(animals) for animals in population.values())
+        return nbytes
+
+    def memory_report(self):
+        """This method estimates the memory used to store the cells of the map, without the
+        animals. Water cells only take their entry in the landscape and index grids.
+
+        Returns:
+        ----------
+        dict with the number of livable and Water cells, the bytes of the livable cell objects,
+        of the lookup dictionaries and of the grids and index arrays, and the total bytes per
+        livable cell.
+        """
+        n_livable = len(self.livable_list)
+        cell_bytes = sum(self.cell_nbytes(cell) for cell in self.livable_list)
+        lookup_bytes = sys.getsizeof(self.livable_dict) + sys.getsizeof(self.livable_list) + \
+            sys.getsizeof(self.neighbours_dict) + \
+            sum(sys.getsizeof(loc) + sys.getsizeof(neighbours)
+                for loc, neighbours in self.neighbours_dict.items())
+        array_bytes = self.landscape_grid.nbytes + self.livable_index.nbytes + \
+            self.livable_locs.nbytes + self.neighbour_table.nbytes
+        total = cell_bytes + lookup_bytes + array_bytes
+        return {'livable_cells': n_livable,
+                'water_cells': self.landscape_grid.size - n_livable,
+                'cell_bytes': cell_bytes,
+                'lookup_bytes': lookup_bytes,
+                'array_bytes': array_bytes,
+                'bytes_per_livable_cell': total / n_livable if n_livable else 0.0}
 
     def unique_rows(self):
         """Return unique row values.
@@ -313,7 +1059,7 @@ class Map:
         list : Row coordinate values
 
         """
-        return list(set([loc[0] for loc in self.create_cells()]))
+        return list(range(self.landscape_grid.shape[0]))
 
     def unique_columns(self):
         """Return unique column values.
@@ -323,7 +1069,7 @@ class Map:
         list : column coordinate values
 
         """
-        return list(set([loc[1] for loc in self.create_cells()]))
+        return list(range(self.landscape_grid.shape[1]))
 
     def get_pop_matrix_herb(self):
         """Update the population matrices of herbivore for heatmap.
@@ -343,12 +1089,7 @@ class Map:
         List of list
 
         """
-        pos = 0
-        for row in (self.unique_rows()):
-            for col in (self.unique_columns()):
-                self.herb_pop_matrix[row][col] = self.calculate_animal_count()['Herbivore'][pos]
-                pos += 1
-
+        self.herb_pop_matrix = self.count_matrix('Herbivore').tolist()
         return self.herb_pop_matrix
 
     def get_pop_matrix_carn(self):
@@ -369,12 +1110,7 @@ class Map:
         List of list
 
         """
-        pos = 0
-        for row in (self.unique_rows()):
-            for col in (self.unique_columns()):
-                self.carn_pop_matrix[row][col] = self.calculate_animal_count()['Carnivore'][pos]
-                pos += 1
-
+        self.carn_pop_matrix = self.count_matrix('Carnivore').tolist()
         return self.carn_pop_matrix
 
     def get_pop_age_herb(self):
@@ -387,7 +1123,7 @@ class Map:
 
         """
         herb_age = []
-        for loc, loc_object in self.cells_dict.items():
+        for loc_object in self.populated_cells():
             for animal in loc_object.initial_population['Herbivore']:
                 herb_age.append(animal.age)
         return herb_age
@@ -401,7 +1137,7 @@ class Map:
 
         """
         carn_age = []
-        for loc, loc_object in self.cells_dict.items():
+        for loc_object in self.populated_cells():
             for animal in loc_object.initial_population['Carnivore']:
                 carn_age.append(animal.age)
         return carn_age
@@ -415,7 +1151,7 @@ class Map:
 
         """
         herb_weight = []
-        for loc, loc_object in self.cells_dict.items():
+        for loc_object in self.populated_cells():
             for animal in loc_object.initial_population['Herbivore']:
                 herb_weight.append(animal.weight)
         return herb_weight
@@ -429,7 +1165,7 @@ class Map:
 
         """
         carn_weight = []
-        for loc, loc_object in self.cells_dict.items():
+        for loc_object in self.populated_cells():
             for animal in loc_object.initial_population['Carnivore']:
                 carn_weight.append(animal.weight)
         return carn_weight
@@ -443,7 +1179,7 @@ class Map:
 
         """
         herb_fitness = []
-        for loc, loc_object in self.cells_dict.items():
+        for loc_object in self.populated_cells():
             for animal in loc_object.initial_population['Herbivore']:
                 animal.calculate_fitness()
                 herb_fitness.append(animal.fitness)
@@ -458,7 +1194,7 @@ class Map:
 
         """
         carn_fitness = []
-        for loc, loc_object in self.cells_dict.items():
+        for loc_object in self.populated_cells():
             for animal in loc_object.initial_population['Carnivore']:
                 animal.calculate_fitness()
                 carn_fitness.append(animal.fitness)
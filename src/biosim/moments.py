@@ -0,0 +1,109 @@
+"""
+This is the moments model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import numpy as np
+
+# Summary statistics of the animals of a species, see cell_summary() and combine().
+MOMENT_KEYS = ('weight_mean', 'weight_var', 'fitness_mean', 'fitness_var')
+
+
+# Running moments of no animals, see add_animal().
+NO_MOMENTS = (0, 0.0, 0.0, 0.0, 0.0)
+
+
+def add_animal(moments, animal):
+    """This function adds one animal to running moments with Welford's update.
+
+    Parameters:
+    ------------
+        moments: tuple
+            Count, mean and sum of squared deviations of the weights and of the fitness.
+        animal: Fauna
+
+    Returns:
+    ----------
+    tuple with the updated moments.
+    """
+    count, mean_w, m2_w, mean_f, m2_f = moments
+    count += 1
+    delta = animal.weight - mean_w
+    mean_w += delta / count
+    m2_w += delta * (animal.weight - mean_w)
+    delta = animal.fitness - mean_f
+    mean_f += delta / count
+    m2_f += delta * (animal.fitness - mean_f)
+    return count, mean_w, m2_w, mean_f, m2_f
+
+
+def accumulate(animals):
+    """This function computes the running moments of animals, as the death pass of
+    Landscape.animal_die() does for the survivors, see add_animal().
+
+    Parameters:
+    ------------
+        animals: list
+
+    Returns:
+    ----------
+    tuple with the count, the mean and the sum of squared deviations of the weights and of
+    the fitness.
+    """
+    moments = NO_MOMENTS
+    for animal in animals:
+        moments = add_animal(moments, animal)
+    return moments
+
+
+def cell_summary(raw):
+    """This function turns the running moments of many cells into means and variances.
+
+    Parameters:
+    ------------
+        raw: numpy.ndarray
+            One row per cell as returned by accumulate().
+
+    Returns:
+    ----------
+    dict with the numpy.ndarray 'count' and one per MOMENT_KEYS, nan in empty cells.
+    """
+    raw = np.asarray(raw, dtype=float).reshape(-1, 5)
+    count = raw[:, 0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        summary = {'count': count.astype(np.int64),
+                   'weight_mean': np.where(count > 0, raw[:, 1], np.nan),
+                   'weight_var': raw[:, 2] / count,
+                   'fitness_mean': np.where(count > 0, raw[:, 3], np.nan),
+                   'fitness_var': raw[:, 4] / count}
+    return summary
+
+
+def combine(raw):
+    """This function merges the running moments of many cells with the pairwise formula of
+    Chan et al.
+
+    Parameters:
+    ------------
+        raw: numpy.ndarray
+            One row per cell as returned by accumulate().
+
+    Returns:
+    ----------
+    dict with the 'count' and the MOMENT_KEYS of all cells together, nan if they are empty.
+    """
+    raw = np.asarray(raw, dtype=float).reshape(-1, 5)
+    count = raw[:, 0]
+    total = count.sum()
+    if total == 0:
+        return dict({'count': 0}, **dict.fromkeys(MOMENT_KEYS, float('nan')))
+    moments = {'count': int(total)}
+    for name, mean, m2 in (('weight', raw[:, 1], raw[:, 2]), ('fitness', raw[:, 3], raw[:, 4])):
+        grand_mean = (count * mean).sum() / total
+        moments[name + '_mean'] = float(grand_mean)
+        moments[name + '_var'] = float((m2.sum() + (count * (mean - grand_mean) ** 2).sum())
+                                       / total)
+    return moments
@@ -0,0 +1,126 @@
+"""
+This is the profiler model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import json
+import os
+import time
+
+
+class PhaseProfiler:
+    """The PhaseProfiler accumulates the wall time and the number of calls for every phase of the
+    yearly cycle. It is attached to the Map and the BioSim object, which only time the phases if a
+    profiler is attached.
+
+    :Example:
+        .. code-block:: python
+
+            sim = BioSim(island_map, ini_pop, seed=1, vis_years=0, profile=True)
+            sim.simulate(50)
+            sim.profile_report()['grazing']['time']
+
+    .. note::
+
+        - Phases of the yearly cycle are summed over all cells of the island.
+        - With `trace=True` one trace event is kept per phase and year, which can be exported
+          in the Chrome trace-event format and opened in chrome://tracing or Perfetto.
+    """
+
+    phases = ('birth', 'grazing', 'predation', 'migration', 'aging', 'weight_loss', 'death',
+              'statistics', 'rendering')
+
+    def __init__(self, trace=False):
+        """Constructor for PhaseProfiler class.
+
+        Parameters:
+        ------------
+            trace: boolean
+                True if trace events shall be recorded for export_chrome_trace().
+        """
+        self.trace = trace
+        self.year = 0
+        self.origin = time.perf_counter()
+        self.time = {}
+        self.count = {}
+        self.trace_events = []
+        self.reset()
+
+    def reset(self):
+        """This method clears all accumulated timings and trace events."""
+        self.time = {phase: 0.0 for phase in self.phases}
+        self.count = {phase: 0 for phase in self.phases}
+        self.trace_events = []
+
+    def add(self, phase, elapsed, count=1, start=None):
+        """This method adds the time spent in one phase.
+
+        Parameters:
+        ------------
+            phase: str
+            elapsed: float
+                Wall time in seconds.
+            count: int
+                Number of calls the time was accumulated over.
+            start: float
+                time.perf_counter() value at the start of the phase, used for trace events.
+        """
+        if phase not in self.time:
+            raise ValueError("Unknown phase: " + str(phase))
+        self.time[phase] += elapsed
+        self.count[phase] += count
+
+        if self.trace:
+            if start is None:
+                start = time.perf_counter() - elapsed
+            self.trace_events.append({'name': phase, 'cat': 'biosim', 'ph': 'X',
+                                      'ts': (start - self.origin) * 1e6, 'dur': elapsed * 1e6,
+                                      'pid': os.getpid(), 'tid': self.phases.index(phase),
+                                      'args': {'year': self.year, 'count': count}})
+
+    def report(self):
+        """This method returns the accumulated timings as a dictionary.
+
+        :Example:
+            .. code-block:: python
+
+                {'birth': {'time': 0.12, 'count': 500, 'mean': 0.00024, 'share': 0.08},
+                 ...}
+
+        Returns:
+        ----------
+            dict with time (s), count, mean time per call (s) and share of total time per phase.
+        """
+        total = sum(self.time.values())
+        report = {}
+        for phase in self.phases:
+            elapsed, count = self.time[phase], self.count[phase]
+            report[phase] = {'time': elapsed,
+                             'count': count,
+                             'mean': elapsed / count if count else 0.0,
+                             'share': elapsed / total if total else 0.0}
+        return report
+
+    def export_chrome_trace(self, file_name):
+        """This method writes the recorded trace events as Chrome trace-event JSON.
+
+        Parameters:
+        ------------
+            file_name: str
+
+        Raises:
+        ----------
+        RuntimeError if the profiler was created without trace=True.
+        """
+        if not self.trace:
+            raise RuntimeError("Trace events are only recorded with trace=True.")
+
+        pid = os.getpid()
+        metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                     'args': {'name': phase}} for tid, phase in enumerate(self.phases)]
+        with open(file_name, 'w') as fh:
+            json.dump({'traceEvents': metadata + self.trace_events,
+                       'displayTimeUnit': 'ms'}, fh)
@@ -0,0 +1,115 @@
+"""
+This is the quantile sketch model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import numpy as np
+
+# Properties of the animals which are sketched, see Landscape.update_sketches().
+SKETCH_PROPERTIES = ('age', 'weight', 'fitness')
+# Quantiles reported every year by the StatisticsRecorder.
+REPORTED_QUANTILES = (0.05, 0.5, 0.95)
+# Number of weighted values kept by a sketch.
+DEFAULT_SKETCH_SIZE = 200
+
+
+class QuantileSketch:
+    """The QuantileSketch summarizes many values by at most `size` weighted values, so the
+    sketches kept per cell and year stay small. Sketches of several cells are merged into one
+    sketch of the island.
+
+    .. note::
+
+        - A sketch with at most `size` values is exact. Every compression moves the rank of a
+          quantile by at most count / size, so a merge of compressed cell sketches is off by
+          at most 2 / size of the animals, 1 % with the default size.
+        - Quantiles follow numpy's 'inverted_cdf' method: the smallest value with at least
+          the share q of the weight at or below it.
+        - A sketch is made from all its values at once, it does not take values one by one.
+          Sketching a cell therefore needs the values of all its animals for a moment, the
+          memory is only bounded after the compression.
+    """
+
+    def __init__(self, values=(), weights=None, size=DEFAULT_SKETCH_SIZE):
+        """Constructor for QuantileSketch class.
+
+        Parameters:
+        ------------
+            values: sequence of float
+            weights: sequence of float
+                Number of animals every value stands for, 1 for each if None.
+            size: int
+                Number of weighted values kept.
+        """
+        self.size = size
+        self.values = np.asarray(values, dtype=float)
+        if weights is None:
+            self.weights = np.ones(len(self.values))
+        else:
+            self.weights = np.asarray(weights, dtype=float)
+        if len(self.values) > size:
+            self.compress()
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def count(self):
+        """Number of values summarized by the sketch."""
+        return float(self.weights.sum())
+
+    def compress(self):
+        """This method replaces the values by `size` values of equal weight, at the midpoints
+        of equal shares of the cumulative weight.
+        """
+        order = np.argsort(self.values, kind='stable')
+        values, cumulative = self.values[order], np.cumsum(self.weights[order])
+        total = cumulative[-1]
+        targets = (np.arange(self.size) + 0.5) * (total / self.size)
+        index = np.minimum(np.searchsorted(cumulative, targets), len(values) - 1)
+        self.values = values[index]
+        self.weights = np.full(self.size, total / self.size)
+
+    @classmethod
+    def merge(cls, sketches, size=DEFAULT_SKETCH_SIZE):
+        """This method merges sketches into one sketch.
+
+        Parameters:
+        ------------
+            sketches: iterable of QuantileSketch
+            size: int
+
+        Returns:
+        ----------
+        QuantileSketch
+        """
+        sketches = [sketch for sketch in sketches if len(sketch)]
+        if not sketches:
+            return cls(size=size)
+        return cls(np.concatenate([sketch.values for sketch in sketches]),
+                   np.concatenate([sketch.weights for sketch in sketches]), size)
+
+    def quantile(self, q):
+        """This method estimates quantiles of the summarized values.
+
+        Parameters:
+        ------------
+            q: float or sequence of float
+                Quantiles between 0 and 1.
+
+        Returns:
+        ----------
+        float or numpy.ndarray, nan if the sketch is empty.
+        """
+        q = np.asarray(q, dtype=float)
+        if len(self.values) == 0:
+            return np.full(q.shape, np.nan) if q.ndim else float('nan')
+        order = np.argsort(self.values, kind='stable')
+        values, cumulative = self.values[order], np.cumsum(self.weights[order])
+        # The tolerance keeps the exact ranks of unit weights from the float sums.
+        index = np.searchsorted(cumulative, q * cumulative[-1] - 1e-9 * cumulative[-1])
+        result = values[np.minimum(index, len(values) - 1)]
+        return result if q.ndim else float(result)
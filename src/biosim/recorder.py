@@ -0,0 +1,131 @@
+"""
+This is the statistics recorder model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import numpy as np
+from biosim.quantiles import REPORTED_QUANTILES, SKETCH_PROPERTIES
+from biosim.moments import MOMENT_KEYS
+
+
+class StatisticsRecorder:
+    """The StatisticsRecorder keeps the number of animals of every species after every
+    simulated year. BioSim fills it in simulate(), see BioSim.statistics.
+
+    :Example:
+        .. code-block:: python
+
+            sim.simulate(100)
+            totals = sim.statistics.as_arrays()
+            plt.plot(totals['year'], totals['Herbivore'])
+
+    With track_quantiles(), the recorder also keeps the quantiles REPORTED_QUANTILES of the
+    age, weight and fitness of every species, see quantile_arrays(), and with track_moments()
+    the mean and variance of weight and fitness, see moment_arrays().
+    """
+
+    species = ('Herbivore', 'Carnivore')
+
+    def __init__(self):
+        """Constructor for StatisticsRecorder class."""
+        self.years = []
+        self.totals = {species: [] for species in self.species}
+        self.quantiles = None  # per species and property, one row of quantiles per year
+        self.moments = None  # per species and MOMENT_KEYS, one value per year
+
+    def __len__(self):
+        return len(self.years)
+
+    def record(self, year, island):
+        """This method adds the number of animals of every species on the island.
+
+        Parameters:
+        ------------
+            year: int
+            island: Map
+        """
+        self.years.append(year)
+        for species in self.species:
+            self.totals[species].append(island.count_total(species))
+        if self.quantiles is not None:
+            for species in self.species:
+                for prop, rows in self.quantiles[species].items():
+                    rows.append(island.quantile_sketch(species, prop).quantile(
+                        REPORTED_QUANTILES))
+        if self.moments is not None:
+            for species in self.species:
+                moments = island.island_moments(species)
+                for key, values in self.moments[species].items():
+                    values.append(moments[key])
+
+    def track_quantiles(self):
+        """This method starts recording quantiles, the years recorded before get nan."""
+        if self.quantiles is None:
+            missing = [np.full(len(REPORTED_QUANTILES), np.nan)] * len(self.years)
+            self.quantiles = {species: {prop: list(missing) for prop in SKETCH_PROPERTIES}
+                              for species in self.species}
+
+    def track_moments(self):
+        """This method starts recording moments, the years recorded before get nan."""
+        if self.moments is None:
+            self.moments = {species: {key: [np.nan] * len(self.years) for key in MOMENT_KEYS}
+                            for species in self.species}
+
+    def fill(self, years):
+        """This method repeats the last recorded totals for further years.
+
+        Parameters:
+        ------------
+            years: iterable of int
+        """
+        years = list(years)
+        self.years.extend(years)
+        for totals in self.totals.values():
+            totals.extend(totals[-1:] * len(years))
+        for tracked in (self.quantiles, self.moments):
+            if tracked is not None:
+                for rows in tracked.values():
+                    for values in rows.values():
+                        values.extend(values[-1:] * len(years))
+
+    def as_arrays(self):
+        """This method returns the recorded years and totals.
+
+        Returns:
+        ----------
+        dict with the numpy.ndarray 'year' and one numpy.ndarray per species.
+        """
+        arrays = {'year': np.array(self.years, dtype=np.int64)}
+        for species, totals in self.totals.items():
+            arrays[species] = np.array(totals, dtype=np.int64)
+        return arrays
+
+    def quantile_arrays(self):
+        """This method returns the recorded quantiles.
+
+        Returns:
+        ----------
+        dict with, per species and property, a numpy.ndarray with one row per year and one
+        column per quantile of REPORTED_QUANTILES, or None if quantiles are not tracked.
+        """
+        if self.quantiles is None:
+            return None
+        return {species: {prop: np.array(rows, dtype=float).reshape(-1, len(REPORTED_QUANTILES))
+                          for prop, rows in props.items()}
+                for species, props in self.quantiles.items()}
+
+    def moment_arrays(self):
+        """This method returns the recorded moments.
+
+        Returns:
+        ----------
+        dict with, per species, one numpy.ndarray per MOMENT_KEYS with one value per year, or
+        None if moments are not tracked.
+        """
+        if self.moments is None:
+            return None
+        return {species: {key: np.array(values, dtype=float) for key, values in keys.items()}
+                for species, keys in self.moments.items()}
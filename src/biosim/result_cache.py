@@ -0,0 +1,206 @@
+"""
+This is the result cache model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import glob
+import hashlib
+import json
+import os
+import pickle
+import random
+import time
+from biosim import __version__
+from biosim.map import Map
+from biosim.simulation import BioSim
+
+
+def json_default(value):
+    """This function converts the numpy values of a scenario for json.dumps()."""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return repr(value)
+
+
+class ResultCache:
+    """The ResultCache keeps finished headless simulations on disk, keyed by a hash of their
+    inputs, so an identical run is loaded instead of simulated.
+
+    :Example:
+        .. code-block:: python
+
+            cache = ResultCache('../results/cache', max_bytes=2 ** 30)
+            sim = cache.simulate(island_map, ini_pop, seed=1, num_years=200)
+            totals = sim.statistics.as_arrays()
+
+    .. note::
+
+        - The key covers the map, the initial population, the seed, the engine and its
+          options, the schedule, the current parameters of all animals and landscapes and the
+          package version. The number of years is not part of the key, a run of more years resumes
+          from the longest cached run of fewer years.
+        - Every entry is the pickled simulation, including its statistics, and the state of
+          the random module, so a resumed run continues like an uninterrupted one.
+        - The parameters given to simulate() and the scheduled parameter changes only
+          apply to the run, the parameters of the animals and landscapes are restored when
+          simulate() returns. A cache hit leaves the random module alone.
+        - When the cache grows above `max_bytes`, the least recently used entries are removed.
+          Loading an entry counts as a use.
+    """
+
+    def __init__(self, directory, max_bytes=2 ** 30):
+        """Constructor for ResultCache class.
+
+        Parameters:
+        ------------
+            directory: str
+            max_bytes: int
+                Size limit of all entries together.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.resumed = 0
+        self.misses = 0
+
+    @staticmethod
+    def scenario_key(island_map, ini_pop, seed, engine='individual', engine_options=None,
+                     schedule=None):
+        """This method hashes the inputs of a simulation, see the class notes.
+
+        Returns:
+        ----------
+        str
+        """
+        classes = dict(**Map.animal_classes, **Map.landscape_classes)
+        scenario = {'map': str(island_map), 'ini_pop': ini_pop, 'seed': seed, 'engine': engine,
+                    'engine_options': engine_options or {}, 'version': __version__,
+                    'parameters': {name: cls.parameters for name, cls in classes.items()}}
+        if schedule:
+            scenario['schedule'] = schedule
+        text = json.dumps(scenario, sort_keys=True, default=json_default)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def entry_path(self, key, years):
+        """Return the file name of the entry of a key after a number of years."""
+        return os.path.join(self.directory, f'{key}_{years:08d}.pkl')
+
+    def cached_years(self, key):
+        """This method lists the numbers of years cached for a key.
+
+        Returns:
+        ----------
+        list of int
+        """
+        return sorted(int(os.path.basename(path)[len(key) + 1:-4])
+                      for path in glob.glob(os.path.join(self.directory, key + '_*.pkl')))
+
+    def load(self, key, years, resume=False):
+        """This method loads a cached simulation.
+
+        Parameters:
+        ------------
+            key: str
+            years: int
+            resume: boolean
+                True if the simulation shall continue, then the state of the random module
+                and the parameter changes of the simulation are restored as well.
+
+        Returns:
+        ----------
+        BioSim
+        """
+        path = self.entry_path(key, years)
+        with open(path, 'rb') as file:
+            entry = pickle.load(file)
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+        if resume:
+            random.setstate(entry['random_state'])
+            entry['sim'].apply_parameter_overrides()
+        return entry['sim']
+
+    def store(self, key, years, sim):
+        """This method writes a simulation to the cache and removes the least recently used
+        entries if the cache is too large.
+        """
+        path = self.entry_path(key, years)
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as file:
+            pickle.dump({'sim': sim, 'random_state': random.getstate()}, file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """This method removes the least recently used entries until the cache fits into
+        max_bytes. The entry `keep` is never removed.
+        """
+        entries = sorted((os.stat(path).st_mtime_ns, os.path.getsize(path), path)
+                         for path in glob.glob(os.path.join(self.directory, '*.pkl')))
+        size = sum(entry[1] for entry in entries)
+        for _, nbytes, path in entries:
+            if size <= self.max_bytes:
+                break
+            if path != keep:
+                os.remove(path)
+                size -= nbytes
+
+    def simulate(self, island_map, ini_pop, seed, num_years, animal_parameters=None,
+                 landscape_parameters=None, engine='individual', engine_options=None,
+                 schedule=None):
+        """This method returns a headless simulation of num_years years, loaded from the cache,
+        resumed from a shorter cached run or simulated from the start.
+
+        Parameters:
+        ------------
+            island_map: str
+            ini_pop: list
+            seed: int
+            num_years: int
+            animal_parameters: dict
+                Parameters per species, set before the run as BioSim.set_animal_parameters().
+            landscape_parameters: dict
+                Parameters per landscape letter, set as BioSim.set_landscape_parameters().
+            engine: str
+            engine_options: dict
+            schedule: list
+                Actions applied at given years, see BioSim.add_schedule().
+
+        Returns:
+        ----------
+        BioSim
+        """
+        defaults = Map.parameter_state()
+        try:
+            for name, params in {**(animal_parameters or {}),
+                                 **(landscape_parameters or {})}.items():
+                Map.check_dict_type(params)
+                dict(**Map.animal_classes, **Map.landscape_classes)[name].set_parameters(params)
+            key = self.scenario_key(island_map, ini_pop, seed, engine, engine_options, schedule)
+            years = self.cached_years(key)
+            if num_years in years:
+                self.hits += 1
+                return self.load(key, num_years)
+
+            shorter = [cached for cached in years if cached < num_years]
+            if shorter:
+                self.resumed += 1
+                sim = self.load(key, shorter[-1], resume=True)
+                # simulate(n) runs the years year_num to year_num + n, and the cold run the
+                # years 0 to num_years, so the resumed call is one year shorter.
+                sim.simulate(num_years - shorter[-1] - 1)
+                sim.last_year = num_years
+            else:
+                self.misses += 1
+                sim = BioSim(island_map, ini_pop, seed, vis_years=0, engine=engine,
+                             engine_options=engine_options)
+                sim.simulate(num_years, schedule=schedule)
+            self.store(key, num_years, sim)
+            return sim
+        finally:
+            Map.restore_parameters(defaults)
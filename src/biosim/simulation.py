@@ -10,9 +10,20 @@ __email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
 import random
 import os
 import glob
+import time
+import multiprocessing
+import numpy as np
 from biosim.map import Map
 import subprocess
-from biosim.visualization import Visualization
+from biosim.frame_writer import FrameWriter
+from biosim.profiler import PhaseProfiler
+from biosim.recorder import StatisticsRecorder
+from biosim.quantiles import DEFAULT_SKETCH_SIZE
+from biosim.snapshot import take_snapshot, DEFAULT_HIST_SPECS
+from biosim.super_individual import SuperIndividualMap
+from biosim.cohort import CohortMap
+from biosim.hybrid import HybridMap
+from biosim.ensemble import EnsembleMap
 
 """
 Template for BioSim class.
@@ -31,6 +42,39 @@ _DEFAULT_GRAPHICS_NAME = 'dv'
 _DEFAULT_IMG_FORMAT = 'png'
 _DEFAULT_MOVIE_FORMAT = 'mp4'  # alternatives: mp4, gif
 
+# Island models selectable with the `engine` argument of BioSim. All but 'individual' take the
+# seed and the `engine_options` as keyword arguments.
+_ENGINES = {'individual': Map, 'super': SuperIndividualMap, 'cohort': CohortMap,
+            'hybrid': HybridMap, 'ensemble': EnsembleMap}
+
+# Methods of BioSim which a schedule can call, see BioSim.add_schedule().
+_SCHEDULE_ACTIONS = ('add_population', 'set_animal_parameters', 'set_landscape_parameters')
+
+# The warm simulation and the branch and collect functions of BioSim.fork(). Forked workers
+# inherit them with the memory of the parent, so they are never pickled.
+_fork_state = None
+
+
+def _set_fork_state(sim, num_years, branch, collect):
+    """This function stores the fork state in a worker process."""
+    global _fork_state
+    _fork_state = (sim, num_years, branch, collect)
+
+
+def _run_fork(index, seed):
+    """This function continues the inherited warm simulation as child `index` on a worker
+    process, which is used for this one child only.
+    """
+    sim, num_years, branch, collect = _fork_state
+    sim.reseed(seed)
+    sim.plot_bool = False
+    sim.frame_writer = None
+    sim.attach_event_log(None)
+    if branch is not None:
+        branch(sim, index)
+    sim.simulate(num_years)
+    return collect(sim)
+
 
 # The material in this file is licensed under the BSD 3-clause license
 # https://opensource.org/licenses/BSD-3-Clause
@@ -44,13 +88,16 @@ class BioSim:
 
     def __init__(self, island_map, ini_pop, seed,
                  vis_years=1, ymax_animals=None, cmax_animals=None, hist_specs=None,
-                 img_years=None, img_dir=None, img_base=None, img_fmt=None, plot_graph=True):
+                 img_years=None, img_dir=None, img_base=None, img_fmt=None, plot_graph=True,
+                 img_workers=None, img_queue_depth=8, profile=False, profile_trace=False,
+                 engine='individual', engine_options=None):
 
         """
         Parameters
         ----------
-        island_map : str
-            Multi-line string specifying island geography
+        island_map : str or SharedTopology
+            Multi-line string specifying island geography, or the shared arrays of a parsed
+            map (see Map.share_topology())
         ini_pop : list
             List of dictionaries specifying initial population
         seed : int
@@ -74,6 +121,23 @@ class BioSim:
         plot_graph : boolean
             True if plot is required.
             False if plot is not required
+        img_workers : int
+            Number of worker processes encoding the figures (if None, figures are saved on the
+            simulation process)
+        img_queue_depth : int
+            Maximum number of rendered figures waiting for the workers
+        profile : boolean
+            True if the wall time of each phase of the yearly cycle shall be measured
+        profile_trace : boolean
+            True if the profiler shall also keep trace events for export_profile_trace()
+        engine : str
+            Island model, 'individual' tracks every animal, 'super' groups equal animals into
+            super-individuals (see SuperIndividualMap), 'cohort' keeps age and weight
+            histograms per cell (see CohortMap), 'hybrid' uses single animals in sparse and
+            histograms in dense cells (see HybridMap), 'ensemble' runs many cohort replicates
+            at once (see EnsembleMap)
+        engine_options : dict
+            Keyword arguments for the island model, e.g. {'tolerance': 0.02} for 'super'
 
         Notes
         -----
@@ -105,9 +169,23 @@ class BioSim:
           where `img_number` are consecutive image numbers starting from 0.
 
         - `img_dir` and `img_base` must either be both None or both strings.
+        - With `img_workers`, the rendered figures are compressed and written by a FrameWriter
+          pool. All figures of a `simulate` call are written when the call returns, the pool
+          is stopped by `close()` or at the end of a ``with`` block.
+        - Without `profile`, no timing is done at all, see `profile_report()`.
+        - The number of animals per species after every simulated year is kept in
+          `statistics`, see StatisticsRecorder.
+        - With the engines other than 'individual', the population getters return numpy arrays
+          instead of lists.
+        - `simulate(schedule=...)` adds populations or changes parameters at given years
+          within one call, see `add_schedule()`.
+        - `switch_engine()` carries the population over to another engine between two
+          `simulate` calls, e.g. to fast-forward with 'cohort' and continue with 'individual'.
         """
         self.island_map = island_map
-        self.map = Map(island_map)
+        self.seed = seed
+        self.engine = engine
+        self.map = self.create_map(engine, seed, engine_options)
         self.map.add_population(ini_pop)
         random.seed(seed)
         self.last_year = 0
@@ -123,6 +201,20 @@ class BioSim:
         self.hist_specs = hist_specs
         self.vis_years = vis_years
         self.visualize = None
+        self.frame_writer = None
+        self.img_workers = img_workers
+        self.img_queue_depth = img_queue_depth
+        self.profiler = None
+        self.statistics = StatisticsRecorder()
+        self.stop_reason = None  # why the last simulate() call stopped early, see StopCondition
+        self.stop_year = None
+        self.schedule = []  # (year, action, *arguments) items not applied yet, sorted by year
+        self.parameter_overrides = {}  # parameters set through BioSim, per species or letter
+        self.event_log = None  # EventLog of births, deaths, kills and moves, see attach_event_log
+
+        if profile or profile_trace:
+            self.profiler = PhaseProfiler(trace=profile_trace)
+            self.map.profiler = self.profiler
 
         if vis_years == 0:
             self.plot_bool = False
@@ -158,6 +250,124 @@ class BioSim:
 
         self.remove_files()
 
+    def create_map(self, engine, seed, engine_options=None):
+        """
+        Create the island model of an engine.
+
+        Parameters
+        ----------
+        engine : str
+            Name of the engine, see `_ENGINES`
+        seed : int
+            Seed of the engine's random number generator, unused by 'individual'
+        engine_options : dict
+            Keyword arguments for the island model
+
+        Raises
+        ------
+        ValueError
+            If the engine is unknown.
+        """
+        if engine not in _ENGINES:
+            raise ValueError('Unknown engine: ' + str(engine))
+        if engine == 'individual':
+            return Map(self.island_map)
+        return _ENGINES[engine](self.island_map, seed=seed, **(engine_options or {}))
+
+    def switch_engine(self, engine, engine_options=None):
+        """
+        Continue the simulation with another engine.
+
+        The animals of the current engine are handed over with add_population(), so a
+        'cohort' run is sampled into single animals on the way. The simulated years and the
+        profiler are kept.
+
+        Parameters
+        ----------
+        engine : str
+            Name of the new engine
+        engine_options : dict
+            Keyword arguments for the new island model
+        """
+        population = self.map.to_population()
+        seed = None if self.seed is None else [self.seed, self.year_num]
+        island = self.create_map(engine, seed, engine_options)
+        island.add_population(population)
+        island.profiler = self.profiler
+        island.attach_event_log(self.event_log)
+        island.track_quantiles(self.map.sketch_size)
+        if self.map.moments_tracked:
+            island.track_moments()
+        self.map = island
+        self.engine = engine
+
+    def reseed(self, seed):
+        """
+        Restart the random number generators of the simulation and of its engine.
+
+        Parameters
+        ----------
+        seed : int
+        """
+        self.seed = seed
+        random.seed(seed)
+        if hasattr(self.map, 'rng'):
+            self.map.rng = np.random.default_rng(seed)
+
+    def fork(self, num_children, num_years, seeds=None, branch=None, collect=None,
+             workers=None):
+        """
+        Continue the current state of the simulation in several independent children.
+
+        Every child is a process forked from this one, so the state after a common burn-in
+        is shared copy-on-write and never serialized. This simulation is not changed.
+
+        Parameters
+        ----------
+        num_children : int
+            Number of children
+        num_years : int
+            Number of years every child simulates
+        seeds : list
+            Seed of every child, by default derived from the seed and the current year
+        branch : callable
+            Called as branch(sim, index) in every child before it simulates, e.g. to add
+            carnivores after a herbivore-only burn-in
+        collect : callable
+            Called as collect(sim) in every child after it simulated, its picklable return
+            value is the result of the child; by default the number of animals per species
+        workers : int
+            Number of children run at the same time, by default the number of CPUs
+
+        Returns
+        -------
+        list
+            Result of every child, in the order of the children
+
+        Raises
+        ------
+        RuntimeError
+            If the platform cannot fork processes.
+        """
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError('BioSim.fork() needs a platform which can fork processes.')
+        if seeds is None:
+            sequence = np.random.SeedSequence([self.seed or 0, self.year_num])
+            seeds = [int(child.generate_state(1)[0]) for child in sequence.spawn(num_children)]
+        if len(seeds) != num_children:
+            raise ValueError('One seed per child is needed.')
+        if collect is None:
+            collect = BioSim.num_animals_per_species.fget
+
+        if self.event_log is not None:
+            self.event_log.flush()  # the children must not write the buffered events again
+        workers = min(workers or os.cpu_count() or 1, num_children)
+        context = multiprocessing.get_context('fork')
+        with context.Pool(workers, initializer=_set_fork_state,
+                          initargs=(self, num_years, branch, collect),
+                          maxtasksperchild=1) as pool:
+            return pool.starmap(_run_fork, enumerate(seeds), chunksize=1)
+
     def set_animal_parameters(self, species, params):
         """
         Set parameters for animal species.
@@ -175,6 +385,7 @@ class BioSim:
             If invalid parameter values are passed.
         """
         self.map.set_parameters(species, params)
+        self.parameter_overrides.setdefault(species, {}).update(params)
 
     def set_landscape_parameters(self, landscape, params):
         """
@@ -193,8 +404,59 @@ class BioSim:
             If invalid parameter values are passed.
         """
         self.map.set_parameters(landscape, params)
+        self.parameter_overrides.setdefault(landscape, {}).update(params)
+
+    def apply_parameter_overrides(self):
+        """
+        Set the parameters given to this simulation again.
+
+        Parameters live on the animal and landscape classes and are shared by the process.
+        The simulation remembers those set through it, also by its schedule, and a copy
+        which continues in another process, e.g. from a pickle, calls this method first.
+        """
+        for name, params in self.parameter_overrides.items():
+            self.map.set_parameters(name, params)
+
+    def add_schedule(self, schedule):
+        """
+        Add items to the schedule applied by simulate() and iter_years().
+
+        Parameters
+        ----------
+        schedule : list
+            Tuples (year, action, *arguments), where action is 'add_population',
+            'set_animal_parameters' or 'set_landscape_parameters' and the arguments are those
+            of the BioSim method. The action is called just before the given year is
+            simulated, items of the same year in the given order.
 
-    def simulate(self, num_years):
+        Raises
+        ------
+        ValueError
+            If an action is unknown or its year was already simulated.
+
+        :Example:
+            .. code-block:: python
+
+                sim.simulate(200, schedule=[(50, 'set_landscape_parameters', 'L', {'f_max': 700}),
+                                            (101, 'add_population', ini_carns)])
+        """
+        items = [tuple(item) for item in schedule]
+        for year, action, *_ in items:
+            if action not in _SCHEDULE_ACTIONS:
+                raise ValueError(f'Unknown schedule action {action!r}')
+            if year < self.year_num:
+                raise ValueError(f'Year {year} of {action!r} was already simulated')
+        self.schedule = sorted(self.schedule + items, key=lambda item: item[0])
+
+    def apply_schedule(self):
+        """
+        Apply the scheduled actions of the current year.
+        """
+        while self.schedule and self.schedule[0][0] <= self.year_num:
+            _, action, *arguments = self.schedule.pop(0)
+            getattr(self, action)(*arguments)
+
+    def simulate(self, num_years, stop=None, fill=False, schedule=None):
         """
         Run simulation while visualizing the result.
 
@@ -202,18 +464,43 @@ class BioSim:
         ----------
         num_years : int
             Number of years to simulate
+        stop : StopCondition or list
+            Conditions checked after every year, the simulation ends at the first year one of
+            them is met, see `stop_reason` and `stop_year`
+        fill : boolean
+            True if the statistics of the years left out after a stop shall repeat the totals
+            of the stop year, the simulation then counts as run to the end
+        schedule : list
+            Actions applied at given years, see `add_schedule()`
         .. note:: Image files will be numbered consecutively.
         """
+        if stop is None:
+            stop = []
+        elif not isinstance(stop, (list, tuple)):
+            stop = [stop]
+        self.stop_reason = None
+        self.stop_year = None
+        if schedule is not None:
+            self.add_schedule(schedule)
+
+        if self.plot_bool and self.img_workers is not None and self.frame_writer is None:
+            self.frame_writer = FrameWriter(workers=self.img_workers,
+                                            max_queue=self.img_queue_depth)
+            if self.visualize is not None:
+                self.visualize.frame_writer = self.frame_writer
 
         if self.plot_bool and self.visualize is None:
-            self.visualize = Visualization(self.island_map, cmax=self.cmax_animals,
+            # matplotlib is only loaded when the simulation is plotted, headless runs skip it.
+            from biosim.visualization import Visualization
+            self.visualize = Visualization(str(self.island_map), cmax=self.cmax_animals,
                                            ymax=self.ymax_animals,
                                            hist_specs=self.hist_specs,
                                            total_years=num_years,
                                            step_size=self.vis_years,
                                            pop_matrix_herb=self.map.get_pop_matrix_herb(),
                                            pop_matrix_carn=self.map.get_pop_matrix_carn(),
-                                           img_base=self.img_base, img_fmt=self.img_fmt)
+                                           img_base=self.img_base, img_fmt=self.img_fmt,
+                                           frame_writer=self.frame_writer)
         if self.plot_bool:
             self.visualize.draw_layout(self.final_year)
 
@@ -231,24 +518,162 @@ class BioSim:
             self.visualize.draw_layout(self.final_year)
 
         while self.year_num <= self.final_year:
+            if self.profiler is not None:
+                self.profiler.year = self.year_num
+            if self.event_log is not None:
+                self.event_log.year = self.year_num
+            if self.schedule:
+                self.apply_schedule()
             self.map.yearly_cycle()
+            self.statistics.record(self.year_num, self.map)
             if self.plot_bool and self.year_num % self.vis_years == 0:
-
-                self.visualize.update_plot(pop_herb=self.map.get_pop_tot_num_herb(),
-                                           pop_carn=self.map.get_pop_tot_num_carn(),
-                                           current_year=self.year_num,
-                                           pop_matrix_herb=self.map.get_pop_matrix_herb(),
-                                           pop_matrix_carn=self.map.get_pop_matrix_carn(),
-                                           weight_list=self.weight_animals_per_species(),
-                                           age_list=self.age_animals_per_species(),
-                                           fitness_list=self.fitness_animals_per_species())
+                t0 = time.perf_counter()
+                statistics = dict(pop_herb=self.map.get_pop_tot_num_herb(),
+                                  pop_carn=self.map.get_pop_tot_num_carn(),
+                                  pop_matrix_herb=self.map.get_pop_matrix_herb(),
+                                  pop_matrix_carn=self.map.get_pop_matrix_carn(),
+                                  weight_list=self.weight_animals_per_species(),
+                                  age_list=self.age_animals_per_species(),
+                                  fitness_list=self.fitness_animals_per_species())
+                if self.map.moments_tracked:
+                    statistics['moments'] = {species: self.map.island_moments(species)
+                                             for species in ('Herbivore', 'Carnivore')}
+                t1 = time.perf_counter()
+
+                self.visualize.update_plot(current_year=self.year_num, **statistics)
 
                 if self.img_base is not None:
                     if self.year_num % self.img_years == 0:
                         self.visualize.save_graphics(self.year_num)
 
+                if self.profiler is not None:
+                    t2 = time.perf_counter()
+                    self.profiler.add('statistics', t1 - t0, start=t0)
+                    self.profiler.add('rendering', t2 - t1, start=t1)
+
+            reason = self.stop_check(stop)
+            if reason is not None:
+                self.stop_reason, self.stop_year = reason, self.year_num
+                if fill:
+                    self.statistics.fill(range(self.year_num + 1, self.final_year + 1))
+                    self.year_num = self.final_year
+                else:
+                    self.last_year -= self.final_year - self.year_num
+                self.year_num += 1
+                break
+
             self.year_num += 1
 
+        if self.frame_writer is not None:
+            self.frame_writer.flush()
+        if self.event_log is not None:
+            self.event_log.flush()
+
+    def iter_years(self, num_years, every=1, matrices=False, histograms=False):
+        """
+        Generator which simulates one year per step and yields a read-only YearSnapshot
+        after every `every` years, without visualization.
+
+        Parameters
+        ----------
+        num_years : int
+            Number of years to simulate
+        every : int
+            Years between two snapshots
+        matrices : boolean
+            True if the snapshots shall hold the population matrices of both species
+        histograms : boolean
+            True if the snapshots shall hold the histogram counts of `hist_specs`
+
+        .. note:: Unlike simulate(), exactly `num_years` years are simulated. Scheduled
+                  actions are applied, see `add_schedule()`. The simulation is consistent
+                  after every step, so the consumer can stop the generator at any time and
+                  continue with simulate() or iter_years().
+
+        :Example:
+            .. code-block:: python
+
+                for snapshot in sim.iter_years(1000, every=10):
+                    if snapshot.totals['Carnivore'] == 0:
+                        break
+        """
+        if every < 1:
+            raise ValueError('every must be a positive number of years')
+        hist_specs = None
+        if histograms:
+            hist_specs = self.hist_specs if self.hist_specs is not None else DEFAULT_HIST_SPECS
+
+        for step in range(num_years):
+            if self.profiler is not None:
+                self.profiler.year = self.year_num
+            if self.event_log is not None:
+                self.event_log.year = self.year_num
+            if self.schedule:
+                self.apply_schedule()
+            self.map.yearly_cycle()
+            self.statistics.record(self.year_num, self.map)
+            self.last_year = self.year_num
+            self.year_num += 1
+            if (step + 1) % every == 0:
+                t0 = time.perf_counter()
+                snapshot = take_snapshot(self.map, self.last_year, matrices, hist_specs)
+                if self.profiler is not None:
+                    self.profiler.add('statistics', time.perf_counter() - t0, start=t0)
+                yield snapshot
+
+    def stop_check(self, conditions):
+        """
+        Reason of the first met stop condition, or None.
+
+        Parameters
+        ----------
+        conditions : list
+            StopCondition objects
+        """
+        for condition in conditions:
+            reason = condition.check(self.statistics)
+            if reason is not None:
+                return reason
+        return None
+
+    def profile_report(self):
+        """
+        Wall time and number of calls for each phase of the simulation.
+
+        Returns
+        -------
+        dict
+            Maps each phase ('birth', 'grazing', 'predation', 'migration', 'aging',
+            'weight_loss', 'death', 'statistics', 'rendering') to a dict with the keys
+            'time', 'count', 'mean' and 'share', see PhaseProfiler.report().
+
+        Raises
+        ------
+        RuntimeError
+            If the simulation was created without `profile`.
+        """
+        if self.profiler is None:
+            raise RuntimeError("Profiling is disabled, create BioSim with profile=True.")
+        return self.profiler.report()
+
+    def export_profile_trace(self, file_name):
+        """
+        Write the recorded phases as Chrome trace-event JSON.
+
+        Parameters
+        ----------
+        file_name : str
+            Name of the JSON file
+
+        Raises
+        ------
+        RuntimeError
+            If the simulation was created without `profile_trace`.
+        """
+        if self.profiler is None:
+            raise RuntimeError("Profiling is disabled, create BioSim with profile_trace=True.")
+        self.profiler.export_chrome_trace(file_name)
+
     def add_population(self, population):
         """
         Add a population to the island
@@ -260,6 +685,82 @@ class BioSim:
         """
         self.map.add_population(population)
 
+    def attach_event_log(self, event_log):
+        """
+        Log births, deaths, kills and moves of the animals
+
+        Parameters
+        ----------
+        event_log : EventLog
+            Log the events are written to, None to stop logging. The log is not closed by
+            the simulation.
+
+        Raises
+        ------
+        RuntimeError
+            If the engine does not keep single animals, see Map.attach_event_log().
+        """
+        if event_log is not None:
+            event_log.year = self.year_num
+        self.map.attach_event_log(event_log)
+        self.event_log = event_log
+
+    def track_quantiles(self, size=DEFAULT_SKETCH_SIZE):
+        """
+        Record the 5th, 50th and 95th percentiles of age, weight and fitness every year
+
+        The cells keep mergeable quantile sketches of their animals, made in the death pass
+        of the yearly cycle, and the percentiles of the island are estimated from the merged
+        sketches, see QuantileSketch.
+
+        Parameters
+        ----------
+        size : int
+            Number of weighted values per sketch, the ranks are off by at most 2 / size
+
+        :Example:
+            .. code-block:: python
+
+                sim.track_quantiles()
+                sim.simulate(100)
+                weights = sim.statistics.quantile_arrays()['Herbivore']['weight']
+                medians = weights[:, 1]
+        """
+        self.map.track_quantiles(size)
+        self.statistics.track_quantiles()
+
+    def track_moments(self):
+        """
+        Record the mean and variance of weight and fitness every year
+
+        The cells update running moments of their animals in the death pass of the yearly
+        cycle, without a pass of their own. The statistics record the moments of the
+        island, see StatisticsRecorder.moment_arrays(), the graphics show the means and
+        standard deviations over the weight and fitness histograms, and
+        `self.map.cell_moments(species)` gives them per cell.
+
+        Raises
+        ------
+        RuntimeError
+            If the engine does not keep single animals.
+        """
+        self.map.track_moments()
+        self.statistics.track_moments()
+
+    def export_population(self):
+        """
+        Every animal of the island with its position, species, age, weight and fitness
+
+        Returns
+        -------
+        numpy.ndarray
+            Structured array with the fields 'row', 'col' (1-based), 'species' (index into
+            Map.species_names), 'age', 'weight' and 'fitness', which can be given back to
+            Map.add_population_arrays(). The cohort engines draw whole animals from their
+            cohorts.
+        """
+        return self.map.export_population()
+
     @property
     def year(self):
         """Last year simulated."""
@@ -338,3 +839,30 @@ class BioSim:
             os.remove(f)
         for f in glob.glob(f"{fbase}*.mp4"):
             os.remove(f)
+
+    def close(self):
+        """
+        Write the remaining figures and stop the worker processes of the FrameWriter.
+
+        The simulation can go on afterwards, the next `simulate` call starts a new pool.
+
+        :Example:
+            .. code-block:: python
+
+                with BioSim(island_map, ini_pop, seed=1, img_dir='results', img_base='dv',
+                            img_workers=4) as sim:
+                    sim.simulate(100)
+        """
+        if self.frame_writer is not None:
+            try:
+                self.frame_writer.close()
+            finally:
+                self.frame_writer = None
+                if self.visualize is not None:
+                    self.visualize.frame_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
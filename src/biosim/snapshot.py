@@ -0,0 +1,96 @@
+"""
+This is the snapshot model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import copyreg
+from collections import namedtuple
+from types import MappingProxyType
+import numpy as np
+
+# State of the island after one year, see BioSim.iter_years(). `matrices` and `histograms` are
+# None unless they were requested.
+YearSnapshot = namedtuple('YearSnapshot', ['year', 'totals', 'matrices', 'histograms'])
+
+# Histograms of the Visualization when BioSim got no hist_specs.
+DEFAULT_HIST_SPECS = {'weight': {'max': 80, 'delta': 2},
+                      'fitness': {'max': 1.0, 'delta': 0.05},
+                      'age': {'max': 60, 'delta': 2}}
+
+# Map getters of the values of every histogram property, per species.
+_HISTOGRAM_GETTERS = {'weight': ('get_pop_weight_herb', 'get_pop_weight_carn'),
+                      'age': ('get_pop_age_herb', 'get_pop_age_carn'),
+                      'fitness': ('get_pop_fitness_herb', 'get_pop_fitness_carn')}
+
+
+def read_only(array):
+    """This function returns the array after making it read-only."""
+    array.flags.writeable = False
+    return array
+
+
+def read_only_dict(items):
+    """This function wraps a dict into a read-only view, after making its arrays read-only."""
+    for value in items.values():
+        if isinstance(value, np.ndarray):
+            read_only(value)
+    return MappingProxyType(items)
+
+
+# Snapshots are sent back from worker processes, see AsyncSimulation. The read-only dicts are
+# pickled as plain dicts and made read-only again when unpickled.
+copyreg.pickle(MappingProxyType, lambda proxy: (read_only_dict, (dict(proxy),)))
+
+
+def histogram_counts(island, hist_specs):
+    """This function counts the animals of both species per histogram bin, with the bins of
+    the Visualization.
+
+    Parameters:
+    ------------
+        island: Map
+        hist_specs: dict
+            Maximum and bin width per property, e.g. {'weight': {'max': 80, 'delta': 2}}.
+
+    Returns:
+    ----------
+    dict with, per property, the bin 'edges' and the counts per species.
+    """
+    histograms = {}
+    for prop, spec in hist_specs.items():
+        edges = np.arange(0, spec['max'] + spec['delta'] / 2, spec['delta'])
+        counts = {'edges': edges}
+        for species, getter in zip(('Herbivore', 'Carnivore'), _HISTOGRAM_GETTERS[prop]):
+            values = np.asarray(getattr(island, getter)(), dtype=float)
+            counts[species] = np.histogram(values, bins=edges)[0]
+        histograms[prop] = read_only_dict(counts)
+    return read_only_dict(histograms)
+
+
+def take_snapshot(island, year, matrices=False, hist_specs=None):
+    """This function describes the island in a read-only YearSnapshot.
+
+    Parameters:
+    ------------
+        island: Map
+        year: int
+        matrices: boolean
+            True for the population matrices of both species.
+        hist_specs: dict
+            Histograms to count, see histogram_counts(), None for no histograms.
+
+    Returns:
+    ----------
+    YearSnapshot
+    """
+    species = ('Herbivore', 'Carnivore')
+    totals = read_only_dict({name: island.count_total(name) for name in species})
+    if matrices:
+        matrices = read_only_dict({name: island.count_matrix(name) for name in species})
+    else:
+        matrices = None
+    histograms = None if hist_specs is None else histogram_counts(island, hist_specs)
+    return YearSnapshot(year, totals, matrices, histograms)
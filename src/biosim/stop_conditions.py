@@ -0,0 +1,112 @@
+"""
+This is the stop conditions model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import numpy as np
+
+
+class StopCondition:
+    """The StopCondition is the parent class of the conditions which end BioSim.simulate()
+    early. They look at the totals recorded in BioSim.statistics after every year.
+
+    :Example:
+        .. code-block:: python
+
+            sim.simulate(1000, stop=[Extinction('Carnivore'), SteadyState(window=50)])
+            print(sim.stop_reason, sim.stop_year)
+    """
+
+    def check(self, statistics):
+        """This method decides if the simulation stops after the last recorded year.
+
+        Parameters:
+        ------------
+            statistics: StatisticsRecorder
+
+        Returns:
+        ----------
+        str with the reason to stop, or None to continue.
+        """
+        raise NotImplementedError
+
+
+class Extinction(StopCondition):
+    """Stops when a species, or with species=None all animals, died out."""
+
+    def __init__(self, species=None):
+        """Constructor for Extinction class.
+
+        Parameters:
+        ------------
+            species: str
+        """
+        self.species = species
+
+    def check(self, statistics):
+        species = statistics.species if self.species is None else (self.species,)
+        if all(statistics.totals[name][-1] == 0 for name in species):
+            return 'extinction of ' + (self.species or 'all animals')
+        return None
+
+
+class Threshold(StopCondition):
+    """Stops when the number of animals of a species falls below `below` or rises above
+    `above`.
+    """
+
+    def __init__(self, species, below=None, above=None):
+        """Constructor for Threshold class.
+
+        Parameters:
+        ------------
+            species: str
+            below: int
+            above: int
+        """
+        if below is None and above is None:
+            raise ValueError("A threshold needs a lower or an upper bound.")
+        self.species = species
+        self.below = below
+        self.above = above
+
+    def check(self, statistics):
+        total = statistics.totals[self.species][-1]
+        if self.below is not None and total < self.below:
+            return f'{self.species} below {self.below}'
+        if self.above is not None and total > self.above:
+            return f'{self.species} above {self.above}'
+        return None
+
+
+class SteadyState(StopCondition):
+    """Stops when the totals of all species stayed within a band for `window` years, that is
+    when max - min <= tolerance * mean for every species over the last `window` years.
+    """
+
+    def __init__(self, window=50, tolerance=0.1):
+        """Constructor for SteadyState class.
+
+        Parameters:
+        ------------
+            window: int
+                Number of years compared.
+            tolerance: float
+                Width of the band relative to the mean.
+        """
+        if window < 2 or tolerance < 0:
+            raise ValueError("The steady state needs window >= 2 and tolerance >= 0.")
+        self.window = window
+        self.tolerance = tolerance
+
+    def check(self, statistics):
+        if len(statistics) < self.window:
+            return None
+        for species in statistics.species:
+            totals = np.array(statistics.totals[species][-self.window:])
+            if np.ptp(totals) > self.tolerance * totals.mean():
+                return None
+        return f'steady state over {self.window} years'
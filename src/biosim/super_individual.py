@@ -0,0 +1,655 @@
+"""
+This is the super-individual model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import math
+import time
+import numpy as np
+from biosim.map import Map
+
+
+def fitness_array(age, weight, params):
+    """This function calculates the fitness of many animals at once with the formula of
+    Fauna.calculate_fitness().
+
+    Parameters:
+    ------------
+        age: numpy.ndarray
+        weight: numpy.ndarray
+        params: dict
+            Parameters of the species.
+
+    Returns:
+    ----------
+        numpy.ndarray
+    """
+    with np.errstate(over='ignore'):
+        phi = 1.0 / (1 + np.exp(params['phi_age'] * (age - params['a_half']))) * \
+            1.0 / (1 + np.exp(-params['phi_weight'] * (weight - params['w_half'])))
+    return np.where(weight <= 0, 0.0, phi)
+
+
+def birth_weight_params(params):
+    """This function returns mu and sigma of the log-normal birth weight, as in
+    Fauna.weight_default().
+
+    Parameters:
+    ------------
+        params: dict
+
+    Returns:
+    ----------
+        tuple (mu, sigma)
+    """
+    mu = math.log(params['w_birth'] ** 2 / math.sqrt(params['w_birth'] ** 2 +
+                                                     params['sigma_birth']))
+    sigma = math.sqrt(math.log(1 + params['sigma_birth'] ** 2 / params['w_birth'] ** 2))
+    return mu, sigma
+
+
+class SuperIndividuals:
+    """SuperIndividuals holds the records of one species on the whole island. Every record stands
+    for `count` animals of the same cell, age and weight.
+    """
+
+    def __init__(self, cell=None, age=None, weight=None, count=None):
+        """Constructor for SuperIndividuals class.
+
+        Parameters:
+        ------------
+            cell: array_like
+                Livable cell index of each record.
+            age: array_like
+            weight: array_like
+            count: array_like
+                Multiplicity of each record.
+        """
+        self.cell = np.asarray([] if cell is None else cell, dtype=np.int64)
+        self.age = np.asarray([] if age is None else age, dtype=np.int64)
+        self.weight = np.asarray([] if weight is None else weight, dtype=float)
+        self.count = np.asarray([] if count is None else count, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.count)
+
+    @property
+    def total(self):
+        """Number of animals represented by all records."""
+        return int(self.count.sum())
+
+    def append(self, cell, age, weight, count):
+        """This method adds records.
+
+        Parameters:
+        ------------
+            cell: array_like
+            age: array_like
+            weight: array_like
+            count: array_like
+        """
+        self.cell = np.concatenate((self.cell, np.asarray(cell, dtype=np.int64)))
+        self.age = np.concatenate((self.age, np.asarray(age, dtype=np.int64)))
+        self.weight = np.concatenate((self.weight, np.asarray(weight, dtype=float)))
+        self.count = np.concatenate((self.count, np.asarray(count, dtype=np.int64)))
+
+    def keep(self, mask):
+        """This method keeps only the records selected by mask.
+
+        Parameters:
+        ------------
+            mask: numpy.ndarray
+                Boolean mask or index array.
+        """
+        self.cell = self.cell[mask]
+        self.age = self.age[mask]
+        self.weight = self.weight[mask]
+        self.count = self.count[mask]
+
+    def merge(self, tolerance):
+        """This method drops empty records and merges records of the same cell and age whose
+        weights lie in the same relative weight bin of width `tolerance`. The merged record gets
+        the count-weighted mean weight.
+
+        Parameters:
+        ------------
+            tolerance: float
+                Relative width of the weight bins, 0 only merges equal weights.
+        """
+        self.keep(self.count > 0)
+        if len(self) < 2:
+            return
+
+        if tolerance > 0:
+            with np.errstate(divide='ignore'):
+                weight_key = np.where(self.weight > 0,
+                                      np.floor(np.log(self.weight) / math.log1p(tolerance)),
+                                      -np.inf)
+        else:
+            weight_key = self.weight
+        order = np.lexsort((weight_key, self.age, self.cell))
+        cell, age, key = self.cell[order], self.age[order], weight_key[order]
+        new_group = np.ones(len(order), dtype=bool)
+        new_group[1:] = (cell[1:] != cell[:-1]) | (age[1:] != age[:-1]) | (key[1:] != key[:-1])
+        starts = np.flatnonzero(new_group)
+
+        count = np.add.reduceat(self.count[order], starts)
+        mass = np.add.reduceat(self.count[order] * self.weight[order], starts)
+        self.cell = cell[starts]
+        self.age = age[starts]
+        self.weight = mass / count
+        self.count = count
+
+
+class SuperIndividualMap(Map):
+    """The SuperIndividualMap simulates the island with super-individuals. Each record stands for
+    many animals of one species with the same cell, age and weight, and the yearly cycle draws
+    the number of animals which give birth, eat, get killed, migrate and die binomially from the
+    multiplicities. Memory and time depend on the number of records, not of animals.
+
+    :Example:
+        .. code-block:: python
+
+            sim = BioSim(island_map, ini_pop, seed=1, vis_years=0, engine='super',
+                         engine_options={'tolerance': 0.02})
+
+    .. note::
+
+        - Records split whenever their animals fare differently (some eat, some give birth,
+          some migrate) and are merged again after every year when they share cell and age and
+          their weights differ by less than the relative `tolerance`. Every record thus stands
+          for animals whose weights lie within a factor (1 + tolerance) of each other, which
+          bounds the error of the fitness used for all probabilities.
+        - The newborns of a record are split into up to ceil(1 / tolerance) records with their
+          own birth weights, so that smaller tolerances also resolve the birth weight spread.
+        - The carnivores of a record hunt in parties of `hunt_party` animals. A herbivore record
+          loses Binomial(n, 1 - (1 - p) ** hungry) animals to a party with `hungry` carnivores
+          which are not yet satiated. Parties of 1 follow the individual engine, larger parties
+          feed the first carnivores fully before the next ones and kill somewhat less, but cost
+          less time when carnivores are numerous.
+    """
+
+    species = ('Herbivore', 'Carnivore')
+    animals_in_cells = False  # quantile sketches are made from the value arrays
+
+    def __init__(self, island_map, seed=None, tolerance=0.05, hunt_party=1):
+        """Constructor for SuperIndividualMap class.
+
+        Parameters:
+        ------------
+            island_map: str
+            seed: int
+                Seed of the random number generator used by the engine.
+            tolerance: float
+                Accuracy knob, relative weight tolerance within one record.
+            hunt_party: int
+                Accuracy knob for predation, largest number of carnivores hunting together.
+        """
+        if not 0 <= tolerance < 1:
+            raise ValueError("The tolerance must be in [0, 1).")
+        if hunt_party < 1:
+            raise ValueError("The hunt_party must be at least 1.")
+        super().__init__(island_map)
+        self.tolerance = tolerance
+        self.hunt_party = int(hunt_party)
+        self.newborn_records = math.ceil(1 / tolerance) if tolerance > 0 else 1000
+        self.rng = np.random.default_rng(seed)
+        self.records = {species: SuperIndividuals() for species in self.species}
+        self.cell_codes = self.landscape_grid[self.livable_locs[:, 0], self.livable_locs[:, 1]]
+
+    def create_cells(self):
+        """The super-individual engine keeps no landscape objects, all animals are records.
+
+        Returns:
+        ----------
+        dict
+        """
+        return {}
+
+    def create_livable_neighbours(self):
+        """The super-individual engine uses neighbour_table instead of neighbour cells.
+
+        Returns:
+        ----------
+        dict
+        """
+        return {}
+
+    def add_records(self, species, rows, cols, ages, weights, counts=None):
+        """This method adds animals given by 0-based map positions as records.
+
+        Parameters:
+        ------------
+            species: str
+            rows: array_like
+            cols: array_like
+            ages: array_like
+            weights: array_like
+            counts: array_like
+                Multiplicity of each entry, 1 if None.
+
+        Raises:
+        ----------
+        ValueError if a position is not livable or an age or weight is negative.
+        """
+        rows, cols = np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+        ages, weights = np.asarray(ages, dtype=np.int64), np.asarray(weights, dtype=float)
+        counts = np.ones(len(rows), dtype=np.int64) if counts is None else np.asarray(counts)
+        shape = self.landscape_grid.shape
+        inside = (rows >= 0) & (rows < shape[0]) & (cols >= 0) & (cols < shape[1])
+        cells = np.full(len(rows), -1, dtype=np.int64)
+        cells[inside] = self.livable_index[rows[inside], cols[inside]]
+        if np.any(cells < 0):
+            bad = np.argwhere(cells < 0)[:, 0]
+            raise ValueError("Animals can only be placed on livable cells, not at pos :" +
+                             self.format_positions(np.stack((rows[bad], cols[bad]), axis=1)))
+        if np.any(weights < 0) or np.any(ages < 0):
+            raise ValueError("Negative weight or age is not allowed to enter!!")
+
+        self.records[species].append(cells, ages, weights, counts)
+        self.records[species].merge(self.tolerance)
+
+    def add_population_arrays(self, locs, species=None, ages=None, weights=None):
+        """This method adds the animals of population columns as records, see
+        Map.add_population_arrays() and add_records().
+        """
+        rows, cols, species, ages, weights = self.population_columns(locs, species, ages,
+                                                                     weights)
+        for code, name in enumerate(self.species_names):
+            chosen = species == code
+            if chosen.any():
+                self.add_records(name, rows[chosen], cols[chosen], ages[chosen],
+                                 weights[chosen])
+
+    def params(self, species):
+        """Return the current parameter dict of the species."""
+        return self.animal_classes[species].parameters
+
+    def fodder(self):
+        """This method returns the fodder available in every livable cell at the start of the
+        feeding.
+
+        Returns:
+        ----------
+        numpy.ndarray
+        """
+        fodder_by_code = np.array([self.landscape_classes[letter].parameters.get('f_max', 0.0)
+                                   for letter in self.landscape_letters])
+        return fodder_by_code[self.cell_codes]
+
+    def cell_totals(self, records):
+        """This method counts the animals of the records per livable cell.
+
+        Returns:
+        ----------
+        numpy.ndarray
+        """
+        return np.bincount(records.cell, weights=records.count,
+                           minlength=len(self.livable_locs)).astype(np.int64)
+
+    def give_birth(self):
+        """This method lets the animals give birth. The number of parents of each record is
+        Binomial(count, p) with the birth probability of Fauna.birth_prob().
+        """
+        for species in self.species:
+            records, params = self.records[species], self.params(species)
+            if len(records) == 0:
+                continue
+
+            n_cell = self.cell_totals(records)[records.cell]
+            fitness = fitness_array(records.age, records.weight, params)
+            prob = np.where(n_cell > 1,
+                            np.minimum(1, params['gamma'] * fitness * (n_cell - 1)), 0.0)
+            prob[records.weight < params['zeta'] * (params['w_birth'] + params['sigma_birth'])] = 0
+            births = self.rng.binomial(records.count, prob)
+            parents = np.flatnonzero(births)
+            if parents.size == 0:
+                continue
+
+            # Newborns of one record are spread over up to newborn_records sub-records.
+            n_sub = np.minimum(births[parents], self.newborn_records)
+            parent = np.repeat(parents, n_sub)
+            first = np.repeat(np.cumsum(n_sub) - n_sub, n_sub)
+            position = np.arange(len(parent)) - first
+            sub_births = births[parent] // np.repeat(n_sub, n_sub) + \
+                (position < (births[parent] % np.repeat(n_sub, n_sub)))
+            mu, sigma = birth_weight_params(params)
+            child_weight = self.rng.lognormal(mu, sigma, len(parent))
+
+            born = records.weight[parent] >= params['xi'] * child_weight
+            parent, sub_births, child_weight = parent[born], sub_births[born], child_weight[born]
+            np.subtract.at(records.count, parent, sub_births)
+            records.append(records.cell[parent], records.age[parent],
+                           records.weight[parent] - params['xi'] * child_weight, sub_births)
+            records.append(records.cell[parent], np.zeros(len(parent)), child_weight, sub_births)
+
+    def feed_herbivores(self):
+        """This method lets the herbivores eat in random order per cell. Every animal eats 'F'
+        as long as the fodder lasts, like Landscape.feed_herbivore().
+        """
+        records, params = self.records['Herbivore'], self.params('Herbivore')
+        if len(records) == 0:
+            return
+
+        can_eat = np.floor(self.fodder() / params['F']).astype(np.int64) \
+            if params['F'] > 0 else np.full(len(self.livable_locs), np.iinfo(np.int64).max)
+        permutation = self.rng.permutation(len(records))
+        order = permutation[np.argsort(records.cell[permutation], kind='stable')]
+        cell, count = records.cell[order], records.count[order]
+        cumulative = np.cumsum(count)
+        new_cell = np.ones(len(order), dtype=bool)
+        new_cell[1:] = cell[1:] != cell[:-1]
+        cell_start = np.maximum.accumulate(np.where(new_cell, cumulative - count, 0))
+        before = cumulative - count - cell_start
+
+        fed = np.zeros(len(records), dtype=np.int64)
+        fed[order] = np.clip(can_eat[cell] - before, 0, count)
+        gain = params['beta'] * params['F']
+        all_fed = (fed == records.count) & (fed > 0)
+        part_fed = np.flatnonzero((fed > 0) & (fed < records.count))
+
+        records.weight[all_fed] += gain
+        records.count[part_fed] -= fed[part_fed]
+        records.append(records.cell[part_fed], records.age[part_fed],
+                       records.weight[part_fed] + gain, fed[part_fed])
+
+    def feed_carnivores(self):
+        """This method lets the carnivores prey on the herbivores of their cell, like
+        Landscape.feed_carnivore(). The carnivore records hunt in order of descending fitness,
+        in parties of at most `hunt_party` animals, and try the herbivore records in order of
+        ascending fitness.
+        """
+        carns, herbs = self.records['Carnivore'], self.records['Herbivore']
+        if len(carns) == 0 or len(herbs) == 0:
+            return
+        carns.keep(carns.count > 0)
+        c_params, h_params = self.params('Carnivore'), self.params('Herbivore')
+        appetite, delta_phi_max = c_params['F'], c_params['DeltaPhiMax']
+        if appetite <= 0:
+            # Carnivores without appetite stop hunting before their first kill.
+            return
+
+        c_fitness = fitness_array(carns.age, carns.weight, c_params)
+        h_fitness = fitness_array(herbs.age, herbs.weight, h_params)
+        c_order = np.lexsort((-c_fitness, carns.cell))
+        h_order = np.lexsort((h_fitness, herbs.cell))
+        c_bounds = np.searchsorted(carns.cell[c_order], np.arange(len(self.livable_locs) + 1))
+        h_bounds = np.searchsorted(herbs.cell[h_order], np.arange(len(self.livable_locs) + 1))
+        hunting = np.flatnonzero((np.diff(c_bounds) > 0) & (np.diff(h_bounds) > 0))
+
+        h_count = herbs.count.copy()
+        eaten = np.zeros(len(carns))
+        for cell in hunting.tolist():
+            prey = h_order[h_bounds[cell]:h_bounds[cell + 1]]
+            prey_fitness = h_fitness[prey]
+            fitness_list, weight_list = prey_fitness.tolist(), herbs.weight[prey].tolist()
+            prey_count = h_count[prey].tolist()
+            for carn in c_order[c_bounds[cell]:c_bounds[cell + 1]].tolist():
+                fit = float(c_fitness[carn])
+                # Only herbivores with lower fitness can be caught, the prey is sorted by fitness
+                # and the hunters by descending fitness.
+                catchable = int(prey_fitness.searchsorted(fit))
+                if catchable == 0:
+                    break
+                n_left = int(carns.count[carn])
+                while n_left > 0:
+                    party = min(n_left, self.hunt_party)
+                    n_left -= party
+                    eaten[carn] += self.hunt(party, fit, fitness_list[:catchable],
+                                             weight_list[:catchable], prey_count, appetite,
+                                             delta_phi_max)
+            h_count[prey] = prey_count
+
+        herbs.count = h_count
+        self.share_food(eaten, appetite, c_params['beta'])
+
+    def hunt(self, hungry, fitness, prey_fitness, prey_weight, prey_count, appetite,
+             delta_phi_max):
+        """This method lets a party of equal carnivores hunt the herbivore records of their cell.
+        Every herbivore is attacked by all carnivores still hungry, and the carnivores eat one
+        after the other until each has had 'F', so that a kill only feeds what its carnivore can
+        still eat. The appetite 'F' has to be positive, see feed_carnivores().
+
+        Parameters:
+        ------------
+            hungry: int
+                Number of carnivores in the party.
+            fitness: float
+            prey_fitness: list
+            prey_weight: list
+                Fitness and weight of the catchable herbivore records.
+            prey_count: list
+                Number of animals in the herbivore records, reduced by the kills.
+            appetite: float
+            delta_phi_max: float
+
+        Returns:
+        ----------
+            float, the food eaten by the party.
+        """
+        eaten, current = 0.0, appetite  # current: what the first hungry carnivore still eats
+        for herb, weight in enumerate(prey_weight):
+            if hungry == 0:
+                break
+            if prey_count[herb] == 0:
+                continue
+            p_kill = min(1.0, (fitness - prey_fitness[herb]) / delta_phi_max)
+            kills = int(self.rng.binomial(prey_count[herb], 1 - (1 - p_kill) ** hungry))
+            if weight <= 0:
+                # Herbivores without weight are killed, but feed and satiate no carnivore.
+                prey_count[herb] -= kills
+                continue
+            first = math.ceil(current / weight)
+            if kills < first:
+                eaten += kills * weight
+                current -= kills * weight
+            else:
+                per_carnivore = math.ceil(appetite / weight)
+                left = kills - first
+                hungry -= 1
+                satiated = min(left // per_carnivore, hungry)
+                hungry -= satiated
+                left -= satiated * per_carnivore
+                eaten += current + satiated * appetite
+                if hungry == 0:
+                    kills -= left
+                else:
+                    eaten += left * weight
+                    current = appetite - left * weight
+            prey_count[herb] -= kills
+        return eaten
+
+    def share_food(self, eaten, appetite, beta):
+        """This method splits the food eaten by each carnivore record into portions of 'F' for
+        as many of its animals as possible and the rest for one more. Records whose animals eat
+        differently are split.
+
+        Parameters:
+        ------------
+            eaten: numpy.ndarray
+                Food eaten by each record.
+            appetite: float
+            beta: float
+        """
+        carns = self.records['Carnivore']
+        full = np.minimum(np.floor(eaten / appetite).astype(np.int64), carns.count)
+        rest = eaten - full * appetite
+        fed = np.flatnonzero(full)
+        partial = np.flatnonzero((full < carns.count) & (rest > 0))
+
+        carns.count[fed] -= full[fed]
+        carns.count[partial] -= 1
+        carns.append(carns.cell[fed], carns.age[fed], carns.weight[fed] + beta * appetite,
+                     full[fed])
+        carns.append(carns.cell[partial], carns.age[partial],
+                     carns.weight[partial] + beta * rest[partial], np.ones(len(partial)))
+
+    def migrate(self):
+        """This method moves Binomial(count, mu * fitness) animals of every record to a random
+        neighbour each. Animals drawn towards Water stay where they are.
+        """
+        for species in self.species:
+            records, params = self.records[species], self.params(species)
+            if len(records) == 0:
+                continue
+
+            fitness = fitness_array(records.age, records.weight, params)
+            movers = self.rng.binomial(records.count, np.clip(params['mu'] * fitness, 0, 1))
+            source = np.flatnonzero(movers)
+            left = movers[source]
+            moved = []
+            for direction in range(4):
+                if direction < 3:
+                    to_direction = self.rng.binomial(left, 1 / (4 - direction))
+                else:
+                    to_direction = left
+                left = left - to_direction
+                destination = self.neighbour_table[records.cell[source], direction]
+                go = (destination >= 0) & (to_direction > 0)
+                moved.append((source[go], destination[go], to_direction[go]))
+
+            for index, destination, number in moved:
+                np.subtract.at(records.count, index, number)
+                records.append(destination, records.age[index], records.weight[index], number)
+
+    def age_animals(self):
+        """This method ages all animals by one year."""
+        for species in self.species:
+            records = self.records[species]
+            records.age = records.age + 1
+
+    def lose_weight(self):
+        """This method reduces the weight of all animals by the factor 'eta'."""
+        for species in self.species:
+            records = self.records[species]
+            records.weight = records.weight * (1 - self.params(species)['eta'])
+
+    def die(self):
+        """This method removes Binomial(count, omega * (1 - fitness)) animals of every record,
+        or all animals of records with fitness 0.
+        """
+        for species in self.species:
+            records, params = self.records[species], self.params(species)
+            if len(records) == 0:
+                continue
+            fitness = fitness_array(records.age, records.weight, params)
+            prob = np.where(fitness == 0, 1.0, np.clip(params['omega'] * (1 - fitness), 0, 1))
+            records.count = records.count - self.rng.binomial(records.count, prob)
+            records.merge(self.tolerance)
+
+    def cycle_steps(self):
+        """Return the phases of the yearly cycle as (phase name, method) pairs."""
+        return (('birth', self.give_birth),
+                ('grazing', self.feed_herbivores),
+                ('predation', self.feed_carnivores),
+                ('migration', self.migrate),
+                ('aging', self.age_animals),
+                ('weight_loss', self.lose_weight),
+                ('death', self.die))
+
+    def yearly_cycle(self):
+        """This method runs the phases of the yearly cycle on all records, see
+        Map.yearly_cycle() for the order.
+        """
+        if self.profiler is not None:
+            self.profiled_yearly_cycle()
+            return
+        for _, step in self.cycle_steps():
+            step()
+
+    def profiled_yearly_cycle(self):
+        """This method runs the yearly cycle and adds the time of each phase to the profiler."""
+        for phase, step in self.cycle_steps():
+            start = time.perf_counter()
+            step()
+            self.profiler.add(phase, time.perf_counter() - start, start=start)
+
+    def count_animals(self, species):
+        """This method counts the animals of one species in every livable cell.
+
+        Parameters:
+        ----------
+            species: str
+
+        Returns:
+        ----------
+        numpy.ndarray with one count per livable cell, in the order of livable_locs.
+        """
+        return self.cell_totals(self.records[species])
+
+    def populated_cells(self):
+        """The super-individual engine keeps no landscape objects."""
+        return []
+
+    def export_population(self):
+        """This method repeats every record by its multiplicity, see Map.export_population().
+
+        Returns:
+        ----------
+        numpy.ndarray of POPULATION_DTYPE, ordered by species.
+        """
+        parts = []
+        for code, species in enumerate(self.species_names):
+            records = self.records[species]
+            locs = self.livable_locs[self.expand(species, records.cell)] + 1
+            ages = self.expand(species, records.age)
+            weights = self.expand(species, records.weight)
+            parts.append(self.structured_population(
+                locs[:, 0], locs[:, 1], code, ages, weights,
+                fitness_array(ages, weights, self.params(species))))
+        return np.concatenate(parts)
+
+    def attach_event_log(self, event_log):
+        """Events are logged per animal, which the super-individuals do not keep apart.
+
+        Raises:
+        ----------
+        RuntimeError unless event_log is None.
+        """
+        if event_log is not None:
+            raise RuntimeError('Event logs need the individual engine.')
+
+    def to_population(self):
+        """This method lists the animals of all records in the format of add_population(),
+        with 1-based positions.
+
+        Returns:
+        ----------
+        List of dictionaries with 'loc' and 'pop'.
+        """
+        return self.population_list(self.export_population())
+
+    def expand(self, species, values):
+        """This method repeats a value of every record by its multiplicity."""
+        return np.repeat(values, self.records[species].count)
+
+    def get_pop_age_herb(self):
+        """This method returns the ages of all herbivores as an array."""
+        return self.expand('Herbivore', self.records['Herbivore'].age)
+
+    def get_pop_age_carn(self):
+        """This method returns the ages of all carnivores as an array."""
+        return self.expand('Carnivore', self.records['Carnivore'].age)
+
+    def get_pop_weight_herb(self):
+        """This method returns the weights of all herbivores as an array."""
+        return self.expand('Herbivore', self.records['Herbivore'].weight)
+
+    def get_pop_weight_carn(self):
+        """This method returns the weights of all carnivores as an array."""
+        return self.expand('Carnivore', self.records['Carnivore'].weight)
+
+    def get_pop_fitness_herb(self):
+        """This method returns the fitness of all herbivores as an array."""
+        records = self.records['Herbivore']
+        return self.expand('Herbivore', fitness_array(records.age, records.weight,
+                                                      self.params('Herbivore')))
+
+    def get_pop_fitness_carn(self):
+        """This method returns the fitness of all carnivores as an array."""
+        records = self.records['Carnivore']
+        return self.expand('Carnivore', fitness_array(records.age, records.weight,
+                                                      self.params('Carnivore')))
@@ -0,0 +1,153 @@
+"""
+This is the shared topology model which functions with the Biosim package written for
+the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class SharedTopology:
+    """The SharedTopology keeps the immutable arrays of a Map in shared memory, so worker
+    processes can build their island from it without parsing the map string and without a
+    copy of the arrays.
+
+    :Example:
+        .. code-block:: python
+
+            def run_seed(topology, seed):
+                sim = BioSim(topology, ini_pop, seed=seed, vis_years=0)
+                sim.simulate(100)
+                return sim.num_animals_per_species
+
+            with Map(island_map).share_topology() as topology:
+                with ProcessPoolExecutor() as pool:
+                    results = list(pool.map(run_seed, [topology] * 64, range(64)))
+
+    .. note::
+
+        - The arrays are 'landscape_grid', 'livable_locs', 'livable_index' and
+          'neighbour_table'. The fodder is not shared, as the landscape parameters can change
+          while the workers run.
+        - Pickling a SharedTopology only pickles the names of the shared memory blocks, the
+          unpickled object attaches to them. The attached arrays are read-only.
+        - The process which shared the topology owns the memory and has to unlink() it, or
+          leave its with block, when no worker will attach any more. Before Python 3.13 the
+          workers have to be started by multiprocessing from the owner process.
+    """
+
+    def __init__(self, blocks, descriptor, owner):
+        """Constructor for SharedTopology class, use create() or attach() instead.
+
+        Parameters:
+        ------------
+            blocks: dict
+                SharedMemory block of every array.
+            descriptor: dict
+                Block name, shape and dtype of every array and the landscape letters.
+            owner: boolean
+                True in the process which created the blocks.
+        """
+        self.blocks = blocks
+        self.descriptor = descriptor
+        self.owner = owner
+        self.arrays = {}
+        for key, (_, shape, dtype) in descriptor['arrays'].items():
+            array = np.ndarray(shape, dtype=dtype, buffer=blocks[key].buf)
+            array.flags.writeable = False
+            self.arrays[key] = array
+
+    @classmethod
+    def create(cls, arrays, letters):
+        """This method copies arrays into new shared memory blocks.
+
+        Parameters:
+        ------------
+            arrays: dict
+                numpy.ndarray per array name.
+            letters: str
+                Landscape letter of every code in the landscape grid.
+
+        Returns:
+        ----------
+        SharedTopology
+        """
+        blocks, layout = {}, {}
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            blocks[key] = block
+            layout[key] = (block.name, array.shape, array.dtype.str)
+        return cls(blocks, {'arrays': layout, 'letters': letters}, owner=True)
+
+    @classmethod
+    def attach(cls, descriptor):
+        """This method attaches to the shared memory blocks of a descriptor.
+
+        Parameters:
+        ------------
+            descriptor: dict
+
+        Returns:
+        ----------
+        SharedTopology
+
+        Raises:
+        ----------
+        FileNotFoundError if the blocks were unlinked.
+        """
+        blocks = {}
+        for key, (name, _, _) in descriptor['arrays'].items():
+            try:
+                blocks[key] = shared_memory.SharedMemory(name=name, track=False)
+            except TypeError:
+                # Before Python 3.13 every block is tracked. Workers started by multiprocessing
+                # share the tracker of the owner, which unregisters the block on unlink().
+                blocks[key] = shared_memory.SharedMemory(name=name)
+        return cls(blocks, descriptor, owner=False)
+
+    def __reduce__(self):
+        return SharedTopology.attach, (self.descriptor,)
+
+    def __str__(self):
+        """Return the island map string of the landscape grid."""
+        letters = np.frombuffer(self.descriptor['letters'].encode('ascii'), dtype=np.uint8)
+        rows = letters[self.arrays['landscape_grid']]
+        return '\n'.join(row.tobytes().decode('ascii') for row in rows)
+
+    @property
+    def nbytes(self):
+        """Number of bytes of the shared arrays."""
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def close(self):
+        """This method releases the arrays and the blocks of this process. Maps built from the
+        topology have to be deleted first, as they use the arrays.
+        """
+        self.arrays = {}
+        for block in self.blocks.values():
+            block.close()
+
+    def unlink(self):
+        """This method removes the names of the shared memory blocks, only allowed for the
+        owner. The memory is freed when the last process closed its blocks.
+
+        Raises:
+        ----------
+        RuntimeError if the topology was attached, not created.
+        """
+        if not self.owner:
+            raise RuntimeError("Only the process which shared the topology can unlink it.")
+        for block in self.blocks.values():
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.owner:
+            self.unlink()
@@ -23,7 +23,7 @@ class Visualization:
     def __init__(self, island_map=None, cmax=None, ymax=None,
                  hist_specs=None, total_years=None,
                  pop_matrix_herb=None, pop_matrix_carn=None,
-                 img_base=None, img_fmt=None, step_size=1):
+                 img_base=None, img_fmt=None, step_size=1, frame_writer=None):
         """
         This is a constructor for the visualization class that initiates the graphs for simulation.
 
@@ -39,12 +39,15 @@ class Visualization:
         step_size : int
         cmax : dict
         island_map : str
+        frame_writer : FrameWriter
+            If given, the frames are encoded and written on its worker processes.
         """
         self.island_map = island_map
         self.img_base = img_base
         self.img_ctr = 0
         self.img_year = 1
         self.img_fmt = img_fmt
+        self.frame_writer = frame_writer
         self.total_years = None
         self.step_size = step_size
         self.y_herb = None
@@ -89,6 +92,7 @@ class Visualization:
         self.fitness_herb_list = None
         self.herb_hm_axis = None
         self.carn_hm_axis = None
+        self.moment_lines = None
         self.pop_matrix_herb = pop_matrix_herb
         self.pop_matrix_carn = pop_matrix_carn
 
@@ -318,7 +322,7 @@ class Visualization:
 
     def update_plot(self, pop_herb=0, pop_carn=0, current_year=0,
                     pop_matrix_herb=None, pop_matrix_carn=None, weight_list=None,
-                    age_list=None, fitness_list=None):
+                    age_list=None, fitness_list=None, moments=None):
         """
         This method is the one that is getting called for every year and updates the plotting values
         for each year with new data that gets updated with all the yearly seasons on the island.
@@ -333,6 +337,9 @@ class Visualization:
         weight_list : dict
         age_list : dict
         fitness_list : dict
+        moments : dict
+            Optional island moments per species, see Map.island_moments(), shown over the
+            weight and fitness histograms
         """
         self.fitness_herb_list = fitness_list['Herbivore']
         self.age_herb_list = age_list['Herbivore']
@@ -349,6 +356,8 @@ class Visualization:
 
         self.update_animal_count(pop_herb=pop_herb, pop_carn=pop_carn, current_year=current_year)
         self.update_frequency_graphs()
+        if moments is not None:
+            self.update_moment_overlays(moments)
         self.update_heatmap()
         self.fig.canvas.flush_events()
         plt.pause(1e-5)
@@ -414,6 +423,36 @@ class Visualization:
         y_max_weight = max(max(weight_hist_counts_herb), max(weight_hist_counts_carn))
         self.ax_weight.set_ylim([0, (y_max_weight * 1.2)])
 
+    def draw_moment_overlays(self):
+        """
+        This method draws, over the weight and fitness histograms, a dashed line at the mean and
+        two dotted lines one standard deviation away from it for each species.
+        """
+        self.moment_lines = {}
+        for species, color in (('Herbivore', 'b'), ('Carnivore', 'r')):
+            for prop, axis in (('weight', self.ax_weight), ('fitness', self.ax_fitness)):
+                self.moment_lines[species, prop] = [
+                    axis.axvline(0, color=color, linestyle=style, linewidth=1, visible=False)
+                    for style in ('--', ':', ':')]
+
+    def update_moment_overlays(self, moments):
+        """
+        This method moves the mean and standard deviation lines to the moments of the year.
+
+        Parameters
+        ----------
+        moments : dict
+            Island moments per species, see Map.island_moments()
+        """
+        if self.moment_lines is None:
+            self.draw_moment_overlays()
+        for (species, prop), lines in self.moment_lines.items():
+            mean = moments[species][prop + '_mean']
+            std = np.sqrt(moments[species][prop + '_var'])
+            for line, x in zip(lines, (mean, mean - std, mean + std)):
+                line.set_xdata([x, x])
+                line.set_visible(bool(np.isfinite(x)))
+
     def update_heatmap(self):
         """
         This method update the heatmaps for Herbivore and Carnivores after each year with the
@@ -441,8 +480,13 @@ class Visualization:
 
         if self.img_base is None or step % self.img_year != 0:
             return
-        plt.savefig('{base}_{num:05d}.{type}'.format(base=self.img_base,
+        file_name = '{base}_{num:05d}.{type}'.format(base=self.img_base,
                                                      num=self.img_ctr,
-                                                     type=self.img_fmt))
+                                                     type=self.img_fmt)
+        if self.frame_writer is None:
+            plt.savefig(file_name)
+        else:
+            self.fig.canvas.draw()
+            self.frame_writer.submit(file_name, self.fig.canvas.buffer_rgba(), self.img_fmt)
 
         self.img_ctr += 1
@@ -0,0 +1,40 @@
+"""
+This is the conftest file which keeps the fixtures shared by the tests of the engines of the
+Biosim package written for the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import pytest
+from biosim.map import Map
+
+
+def make_animals(species, number, age=5, weight=20.0):
+    """Return an ini_pop entry list with `number` equal animals."""
+    return [{'species': species, 'age': age, 'weight': weight} for _ in range(number)]
+
+
+@pytest.fixture
+def island_map():
+    """Return a 3 x 3 Lowland island, test modules needing other landscapes override it."""
+    return """\
+WWWWW
+WLLLW
+WLLLW
+WLLLW
+WWWWW"""
+
+
+@pytest.fixture
+def animals():
+    """Return the function making an ini_pop entry list with `number` equal animals."""
+    return make_animals
+
+
+@pytest.fixture
+def restore_parameters():
+    """Restore the animal and landscape parameters changed by a test."""
+    defaults = Map.parameter_state()
+    yield
+    Map.restore_parameters(defaults)
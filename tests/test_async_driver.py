@@ -0,0 +1,132 @@
+"""
+This is the Test Async Driver file which tests if all the functions in async_driver.py
+runs properly with the Biosim package written for the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from biosim.async_driver import AsyncSimulation
+from biosim.map import Map
+from biosim.simulation import BioSim
+
+
+@pytest.fixture
+def new_sim(island_map, animals):
+    """Return the function making a headless simulation with both species."""
+    def make(seed=1):
+        return BioSim(island_map, [{'loc': (2, 2), 'pop': animals('Herbivore', 50)},
+                                   {'loc': (3, 3), 'pop': animals('Carnivore', 5)}],
+                      seed=seed, vis_years=0)
+    return make
+
+
+async def collect(driver, num_years, **options):
+    """Return the snapshots of a run."""
+    return [snapshot async for snapshot in driver.run(num_years, **options)]
+
+
+class TestAsyncSimulation:
+
+    def test_run(self, new_sim):
+        """Test if the run yields the snapshots of iter_years."""
+        driver = AsyncSimulation(new_sim())
+        snapshots = asyncio.run(collect(driver, 10, every=2, batch=2))
+        assert [snapshot.year for snapshot in snapshots] == [1, 3, 5, 7, 9]
+        other = new_sim()
+        expected = [snapshot.totals for snapshot in other.iter_years(10, every=2)]
+        assert [snapshot.totals for snapshot in snapshots] == expected
+        assert driver.sim.year == 9
+
+    def test_invalid(self, new_sim):
+        """Test if a non-positive batch raises a ValueError."""
+        driver = AsyncSimulation(new_sim())
+        with pytest.raises(ValueError):
+            asyncio.run(collect(driver, 10, batch=0))
+
+    def test_cancel(self, new_sim):
+        """Test if cancel() ends the run without further snapshots."""
+        async def main(driver):
+            years = []
+            async for snapshot in driver.run(100, batch=3):
+                years.append(snapshot.year)
+                if snapshot.year == 4:
+                    driver.cancel()
+            return years
+
+        driver = AsyncSimulation(new_sim())
+        assert asyncio.run(main(driver)) == [0, 1, 2, 3, 4]
+        assert driver.sim.year == 5
+
+    def test_pause_resume(self, new_sim):
+        """Test if a paused driver waits for resume() while the loop keeps running."""
+        async def main(driver):
+            ticks = 0
+            async for snapshot in driver.run(4):
+                if snapshot.year == 1:
+                    driver.pause()
+                    asyncio.get_running_loop().call_later(0.05, driver.resume)
+                    while driver.paused:
+                        ticks += 1
+                        await asyncio.sleep(0.01)
+            return ticks
+
+        driver = AsyncSimulation(new_sim())
+        assert asyncio.run(main(driver)) > 0
+        assert driver.sim.year == 3
+
+    def test_task_cancelled(self, new_sim):
+        """Test if cancelling the task leaves the simulation after a whole batch."""
+        async def main(driver):
+            task = asyncio.create_task(collect(driver, 1000, batch=5))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        driver = AsyncSimulation(new_sim())
+        asyncio.run(main(driver))
+        assert len(driver.sim.statistics) % 5 == 0
+        assert driver.sim.year_num == len(driver.sim.statistics)
+
+    def test_process_executor(self, new_sim):
+        """Test if drivers in worker processes are reproducible and run concurrently."""
+        async def main(executor):
+            drivers = [AsyncSimulation(new_sim(seed=4), executor) for _ in range(2)]
+            runs = await asyncio.gather(*(collect(driver, 6, every=3) for driver in drivers))
+            return drivers, runs
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            drivers, runs = asyncio.run(main(executor))
+        assert runs[0] == runs[1]
+        assert [snapshot.year for snapshot in runs[0]] == [2, 5]
+        assert drivers[0].sim.year == 5
+        assert len(drivers[0].sim.statistics) == 6
+
+    def test_process_parameters(self, new_sim):
+        """Test if scheduled parameter changes stay with their driver when the batches of
+        several drivers share a worker process."""
+        schedule = [(3, 'set_landscape_parameters', 'L', {'f_max': 5.0})]
+        defaults = Map.parameter_state()
+
+        async def main(executor):
+            drivers = [AsyncSimulation(new_sim(seed=4), executor) for _ in range(2)]
+            drivers[0].sim.add_schedule(schedule)
+            return await asyncio.gather(*(collect(driver, 8, every=2) for driver in drivers))
+
+        try:
+            changed = new_sim(seed=4)
+            changed.add_schedule(schedule)
+            expected = [snapshot.totals for snapshot in changed.iter_years(8, every=2)]
+            Map.restore_parameters(defaults)
+            plain = [snapshot.totals for snapshot in new_sim(seed=4).iter_years(8, every=2)]
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                runs = asyncio.run(main(executor))
+        finally:
+            Map.restore_parameters(defaults)
+        assert expected != plain
+        assert [snapshot.totals for snapshot in runs[0]] == expected
+        assert [snapshot.totals for snapshot in runs[1]] == plain
@@ -0,0 +1,178 @@
+"""
+This is the Test Cohort file which tests if all the functions in cohort.py
+runs properly with the Biosim package written for the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import random
+import numpy as np
+import pytest
+from biosim.cohort import CohortMap
+from biosim.fauna import Carnivore, Herbivore
+from biosim.landscape import Lowland
+from biosim.map import Map
+from biosim.simulation import BioSim
+
+
+class TestCohort:
+
+    def test_population_matrix(self, island_map, animals):
+        """Test if the animals are counted at their positions."""
+        island = CohortMap(island_map, seed=1)
+        island.add_population([{'loc': (2, 4), 'pop': animals('Carnivore', 7)}])
+        assert island.get_pop_matrix_carn()[1][3] == 7
+        assert island.get_pop_tot_num_carn() == 7
+
+    def test_weight_split_keeps_weight(self, island_map, animals):
+        """Test if a weight between two bins keeps the number and total weight of animals."""
+        island = CohortMap(island_map, seed=1)
+        island.add_population([{'loc': (3, 3), 'pop': animals('Herbivore', 10, weight=20.7)}])
+        counts = island.counts['Herbivore']
+        assert counts.sum() == pytest.approx(10)
+        assert (counts.sum(axis=(0, 1)) * island.weights).sum() == pytest.approx(207)
+
+    def test_cells_view(self, island_map):
+        """Test if the cells of livable positions raise a clear error, Water still works."""
+        island = CohortMap(island_map, seed=1)
+        assert island.cells_dict[(0, 0)] is island.water_cell
+        with pytest.raises(RuntimeError):
+            island.cells_dict[(1, 1)]
+
+    def test_add_population_in_water(self, island_map, animals):
+        """Test if animals placed in Water are rejected."""
+        island = CohortMap(island_map, seed=1)
+        with pytest.raises(ValueError):
+            island.add_population([{'loc': (1, 1), 'pop': animals('Herbivore', 1)}])
+
+    @pytest.mark.parametrize('options', [{'max_age': 0}, {'weight_step': 0},
+                                         {'max_weight': 1.0}, {'fitness_classes': 0}])
+    def test_invalid_grid(self, island_map, options):
+        """Test if an invalid cohort grid raises a ValueError."""
+        with pytest.raises(ValueError):
+            CohortMap(island_map, seed=1, **options)
+
+    def test_grazing_limited_by_fodder(self, island_map, animals):
+        """Test if the herbivores of a cell eat no more than the fodder."""
+        island = CohortMap(island_map, seed=1)
+        island.add_population([{'loc': (3, 3), 'pop': animals('Herbivore', 200)}])
+        island.feed_herbivores()
+        params = Herbivore.parameters
+        gain = (island.get_pop_weight_herb().sum() - 200 * 20.0) / params['beta']
+        assert gain == pytest.approx(Lowland.parameters['f_max'])
+
+    @pytest.mark.parametrize('stochastic', [False, True])
+    def test_migration_keeps_animals(self, island_map, animals, stochastic):
+        """Test if migration moves animals only between livable cells."""
+        island = CohortMap(island_map, seed=1, stochastic=stochastic)
+        island.add_population([{'loc': (3, 3), 'pop': animals('Herbivore', 1000)}])
+        island.migrate()
+        matrix = np.array(island.get_pop_matrix_herb())
+        assert island.counts['Herbivore'].sum() == pytest.approx(1000)
+        assert 0 < matrix[2, 2] < 1000
+        assert matrix[[0, -1], :].sum() == 0 and matrix[:, [0, -1]].sum() == 0
+
+    def test_stochastic_counts_are_whole(self, island_map, animals):
+        """Test if the stochastic transitions keep whole animals in every cohort."""
+        island = CohortMap(island_map, seed=1, stochastic=True)
+        island.add_population([{'loc': (3, 3), 'pop': animals('Herbivore', 100) +
+                                animals('Carnivore', 10)}])
+        for _ in range(5):
+            island.yearly_cycle()
+        for species in island.species:
+            counts = island.counts[species]
+            assert np.array_equal(counts, np.round(counts))
+
+    def test_same_as_individual_engine(self, animals):
+        """Test if the number of herbivores follows the mean of the individual engine."""
+        island_map = "WWW\nWLW\nWWW"
+        ini_pop = [{'loc': (2, 2), 'pop': animals('Herbivore', 50)}]
+        totals = []
+        for seed in range(10):
+            random.seed(seed)
+            individual = Map(island_map)
+            individual.add_population(ini_pop)
+            for _ in range(20):
+                individual.yearly_cycle()
+            totals.append(individual.get_pop_tot_num_herb())
+        cohorts = CohortMap(island_map, seed=1)
+        cohorts.add_population(ini_pop)
+        for _ in range(20):
+            cohorts.yearly_cycle()
+        assert cohorts.get_pop_tot_num_herb() == pytest.approx(np.mean(totals), rel=0.1)
+
+    @pytest.mark.parametrize('stochastic', [False, True])
+    def test_no_appetite(self, island_map, animals, restore_parameters, stochastic):
+        """Test if carnivores with 'F' = 0 neither hunt nor vanish, like single animals."""
+        ini_pop = [{'loc': (3, 3), 'pop': animals('Herbivore', 50, weight=5.0) +
+                    animals('Carnivore', 5, weight=40.0)}]
+        Carnivore.set_parameters({'F': 0})
+        individual = Map(island_map)
+        individual.add_population(ini_pop)
+        individual.livable_dict[(2, 2)].feed_carnivore()
+        cohorts = CohortMap(island_map, seed=1, stochastic=stochastic)
+        cohorts.add_population(ini_pop)
+        cohorts.feed_carnivores()
+        assert cohorts.get_pop_tot_num_carn() == individual.get_pop_tot_num_carn() == 5
+        assert cohorts.get_pop_tot_num_herb() == individual.get_pop_tot_num_herb() == 50
+        cohorts.yearly_cycle()
+        assert np.isfinite(cohorts.island_counts('Carnivore').sum())
+        assert cohorts.get_pop_tot_num_carn() > 0
+
+    def test_to_population(self, island_map, animals):
+        """Test if sampling whole animals keeps their position, age and weight bin."""
+        island = CohortMap(island_map, seed=1)
+        island.add_population([{'loc': (2, 3), 'pop': animals('Herbivore', 4, age=7,
+                                                              weight=31.0)}])
+        population = island.to_population()
+        assert [entry['loc'] for entry in population] == [(2, 3)]
+        assert len(population[0]['pop']) == 4
+        assert {animal['age'] for animal in population[0]['pop']} == {7}
+        assert all(30.0 <= animal['weight'] <= 32.0 for animal in population[0]['pop'])
+
+    def test_fast_forward_and_switch(self, island_map, animals):
+        """Test if BioSim fast-forwards with cohorts and continues with single animals."""
+        ini_pop = [{'loc': (3, 3), 'pop': animals('Herbivore', 50) +
+                    animals('Carnivore', 10)}]
+        sim = BioSim(island_map, ini_pop, seed=2, vis_years=0, engine='cohort',
+                     engine_options={'stochastic': True})
+        sim.simulate(100)
+        counts = sim.num_animals_per_species
+        sim.switch_engine('individual')
+        assert sim.num_animals_per_species == counts
+        assert sim.engine == 'individual'
+        sim.simulate(2)
+        assert sim.year == 102
+        assert sim.num_animals > 0
+
+    def test_switch_keeps_individuals(self, island_map, animals):
+        """Test if switching from single animals to super-individuals keeps every animal."""
+        ini_pop = [{'loc': (3, 3), 'pop': animals('Herbivore', 30)}]
+        sim = BioSim(island_map, ini_pop, seed=2, vis_years=0)
+        sim.simulate(3)
+        weights = sorted(sim.weight_animals_per_species()['Herbivore'])
+        sim.switch_engine('super', {'tolerance': 0})
+        assert sorted(sim.weight_animals_per_species()['Herbivore']) == pytest.approx(weights)
+
+    def test_profiled_cycle(self, island_map, animals):
+        """Test if the phases of the cohort cycle are profiled."""
+        sim = BioSim(island_map, [{'loc': (3, 3), 'pop': animals('Herbivore', 10)}], seed=1,
+                     vis_years=0, engine='cohort', profile=True)
+        sim.simulate(2)
+        assert sim.profile_report()['grazing']['count'] == 3
+
+    @pytest.mark.parametrize('stochastic', [False, True])
+    def test_add_population_arrays(self, island_map, animals, stochastic):
+        """Test if the bulk path fills the same cohorts as the population list."""
+        population = [{'loc': (2, 2), 'pop': animals('Herbivore', 10, weight=13.3)},
+                      {'loc': (3, 3), 'pop': animals('Carnivore', 4, age=70, weight=7.0)}]
+        from_list = CohortMap(island_map, seed=3, stochastic=stochastic)
+        from_list.add_population(population)
+        from_arrays = CohortMap(island_map, seed=3, stochastic=stochastic)
+        from_arrays.add_population_arrays(*CohortMap.population_arrays(population))
+        for species in from_list.species:
+            assert np.array_equal(from_list.counts[species], from_arrays.counts[species])
+        with pytest.raises(ValueError):
+            from_arrays.add_population_arrays(np.array([[1, 1]]), np.array([0]), np.array([1]),
+                                              np.array([10.0]))
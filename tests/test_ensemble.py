@@ -0,0 +1,77 @@
+"""
+This is the Test Ensemble file which tests if all the functions in ensemble.py
+runs properly with the Biosim package written for the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import numpy as np
+import pytest
+from biosim.ensemble import EnsembleMap
+from biosim.simulation import BioSim
+
+GRID = {'max_age': 30, 'weight_step': 5.0}
+
+
+class TestEnsemble:
+
+    def test_replicate_axis(self, island_map, animals):
+        """Test if every replicate starts with the added population."""
+        island = EnsembleMap(island_map, seed=1, replicates=4, **GRID)
+        island.add_population([{'loc': (2, 2), 'pop': animals('Herbivore', 10)}])
+        assert island.counts['Herbivore'].shape[0] == 4
+        assert list(island.species_totals()['Herbivore']) == [10] * 4
+        assert island.get_pop_tot_num_herb() == 10
+
+    def test_invalid_replicates(self, island_map):
+        """Test if an ensemble without replicates raises a ValueError."""
+        with pytest.raises(ValueError):
+            EnsembleMap(island_map, seed=1, replicates=0)
+
+    def test_replicates_differ(self, island_map, animals):
+        """Test if the replicates are simulated independently."""
+        island = EnsembleMap(island_map, seed=1, replicates=20, **GRID)
+        island.add_population([{'loc': (2, 2), 'pop': animals('Herbivore', 30) +
+                                animals('Carnivore', 5)}])
+        for _ in range(5):
+            island.yearly_cycle()
+        series = island.time_series()
+        assert series['Herbivore'].shape == (5, 20)
+        assert len(np.unique(series['Herbivore'][-1])) > 1
+        counts = island.counts['Herbivore']
+        assert np.array_equal(counts, np.round(counts))
+
+    def test_getters_report_mean(self, island_map, animals):
+        """Test if the getters report the replicate mean."""
+        island = EnsembleMap(island_map, seed=2, replicates=10, **GRID)
+        island.add_population([{'loc': (2, 3), 'pop': animals('Herbivore', 40)}])
+        for _ in range(3):
+            island.yearly_cycle()
+        mean = island.species_totals()['Herbivore'].mean()
+        assert island.get_pop_tot_num_herb() == pytest.approx(mean, abs=len(island.livable_locs))
+        assert len(island.get_pop_age_herb()) == pytest.approx(mean, abs=10)
+
+    def test_biosim_engine(self, island_map, animals):
+        """Test if BioSim runs the ensemble reproducibly and records every year."""
+        ini_pop = [{'loc': (2, 2), 'pop': animals('Herbivore', 30)}]
+        series = []
+        for _ in range(2):
+            sim = BioSim(island_map, ini_pop, seed=3, vis_years=0, engine='ensemble',
+                         engine_options=dict(replicates=5, **GRID))
+            sim.simulate(4)
+            series.append(sim.map.time_series()['Herbivore'])
+        assert series[0].shape == (5, 5)
+        assert np.array_equal(series[0], series[1])
+
+    def test_no_appetite(self, island_map, animals, restore_parameters):
+        """Test if the ensemble runs with carnivores without appetite, 'F' = 0."""
+        ini_pop = [{'loc': (2, 2), 'pop': animals('Herbivore', 30, weight=5.0) +
+                    animals('Carnivore', 5, weight=40.0)}]
+        sim = BioSim(island_map, ini_pop, seed=3, vis_years=0, engine='ensemble',
+                     engine_options=dict(replicates=5, **GRID))
+        sim.set_animal_parameters('Carnivore', {'F': 0})
+        sim.simulate(3)
+        carnivores = sim.map.time_series()['Carnivore']
+        assert np.isfinite(carnivores).all()
+        assert (carnivores[0] > 0).all()
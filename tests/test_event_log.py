@@ -0,0 +1,119 @@
+"""
+This is the Test Event Log file which tests if all the functions in event_log.py and the
+event logging of the landscape cells run properly with the Biosim package written for the
+INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import pickle
+import numpy as np
+import pytest
+from biosim.event_log import (EventLog, read_events, cell_positions, BIRTH, DEATH, KILL, MOVE)
+from biosim.fauna import Fauna
+from biosim.map import Map
+from biosim.simulation import BioSim
+
+
+@pytest.fixture
+def population(animals):
+    """Return an ini_pop with both species."""
+    return [{'loc': (2, 2), 'pop': animals('Herbivore', 80)},
+            {'loc': (2, 2), 'pop': animals('Carnivore', 10)}]
+
+
+class TestEventLog:
+
+    def test_events_balance_population(self, island_map, tmp_path, population):
+        """Test if births, deaths and kills explain the change of the population."""
+        file_name = tmp_path / 'events.bin'
+        island = Map(island_map)
+        island.add_population(population)
+        before = island.count_total('Herbivore') + island.count_total('Carnivore')
+        with EventLog(file_name, buffer_size=7) as log:
+            island.attach_event_log(log)
+            for year in range(5):
+                log.year = year
+                island.yearly_cycle()
+        after = island.count_total('Herbivore') + island.count_total('Carnivore')
+        events = read_events(file_name)
+        counts = np.bincount(events['event'], minlength=4)
+        assert after == before + counts[BIRTH] - counts[DEATH] - counts[KILL]
+        assert counts[KILL] > 0 and counts[MOVE] > 0
+        assert len(events) == log.written
+        assert np.all(np.diff(events['year']) >= 0)
+
+    def test_positions(self, island_map, tmp_path, population):
+        """Test if moves go from a livable cell to a livable neighbour."""
+        file_name = tmp_path / 'events.bin'
+        sim = BioSim(island_map, population, seed=4, vis_years=0)
+        with EventLog(file_name) as log:
+            sim.attach_event_log(log)
+            sim.simulate(5)
+        events = read_events(file_name)
+        moves = events[events['event'] == MOVE]
+        rows, cols = cell_positions(file_name, moves['cell'])
+        to_rows, to_cols = cell_positions(file_name, moves['partner'])
+        livable = {(row + 1, col + 1) for row, col in sim.map.livable_locs.tolist()}
+        assert set(zip(rows.tolist(), cols.tolist())) <= livable
+        assert set(zip(to_rows.tolist(), to_cols.tolist())) <= livable
+        assert np.all(np.abs(rows - to_rows) + np.abs(cols - to_cols) == 1)
+        assert set(events['year'].tolist()) == set(range(6))
+
+    def test_same_results(self, island_map, tmp_path, population):
+        """Test if logging with sampling does not change the simulation."""
+        plain = BioSim(island_map, population, seed=9, vis_years=0)
+        plain.simulate(6)
+        logged = BioSim(island_map, population, seed=9, vis_years=0)
+        with EventLog(tmp_path / 'events.bin', rates={'move': 0.5, 'birth': 0.2}) as log:
+            logged.attach_event_log(log)
+            logged.simulate(6)
+        expected, result = plain.export_population(), logged.export_population()
+        assert np.array_equal(expected[['row', 'col', 'species', 'age']],
+                              result[['row', 'col', 'species', 'age']])
+        assert np.allclose(expected['weight'], result['weight'])
+
+    def test_rates(self, island_map, tmp_path, population):
+        """Test if event types with rate 0 are not logged and wrong rates are refused."""
+        file_name = tmp_path / 'events.bin'
+        sim = BioSim(island_map, population, seed=2, vis_years=0)
+        with EventLog(file_name, rates={'move': 0, 'death': 0}) as log:
+            sim.attach_event_log(log)
+            sim.simulate(3)
+        events = read_events(file_name)
+        assert len(events) > 0
+        assert not np.isin(events['event'], [MOVE, DEATH]).any()
+        with pytest.raises(KeyError):
+            EventLog(file_name, rates={'eat': 0.5})
+        with pytest.raises(ValueError):
+            EventLog(file_name, rates={'move': 2})
+
+    def test_empty_and_invalid(self, island_map, tmp_path):
+        """Test if an empty log is read and other files are refused."""
+        file_name = tmp_path / 'events.bin'
+        with EventLog(file_name) as log:
+            Map(island_map).attach_event_log(log)
+        assert len(read_events(file_name)) == 0
+        other = tmp_path / 'other.bin'
+        other.write_bytes(b'not an event log')
+        with pytest.raises(ValueError):
+            read_events(other)
+
+    def test_needs_individuals(self, island_map, tmp_path, population):
+        """Test if the cohort engine refuses an event log."""
+        sim = BioSim(island_map, population, seed=2, vis_years=0, engine='cohort')
+        with pytest.raises(RuntimeError):
+            sim.attach_event_log(EventLog(tmp_path / 'events.bin'))
+
+    def test_pickle_keeps_ids(self, island_map, population):
+        """Test if animals created after unpickling a map get new identifiers."""
+        island = Map(island_map)
+        island.add_population(population)
+        data = pickle.dumps(island)
+        Fauna.last_id = 0
+        copy = pickle.loads(data)
+        ids = [animal.id for cell in copy.populated_cells()
+               for group in cell.initial_population.values() for animal in group]
+        assert len(set(ids)) == 90
+        assert Fauna.last_id >= max(ids)
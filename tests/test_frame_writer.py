@@ -0,0 +1,60 @@
+"""
+This is the Test Frame Writer file which tests if all the functions in frame_writer.py runs properly
+with the Biosim package written for the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import os
+import numpy as np
+import pytest
+from biosim.frame_writer import FrameWriter
+
+
+class TestFrameWriter:
+
+    @pytest.fixture
+    def rgba_buffer(self):
+        """Return a small rendered RGBA canvas."""
+        buffer = np.zeros((20, 30, 4), dtype=np.uint8)
+        buffer[..., 0] = 255
+        buffer[..., 3] = 255
+        return buffer
+
+    @pytest.mark.parametrize('img_fmt', ['png', 'pdf'])
+    def test_frames_written(self, tmp_path, rgba_buffer, img_fmt):
+        """Test if all submitted frames are written with the BioSim file name pattern."""
+        img_base = os.path.join(tmp_path, 'dv')
+        with FrameWriter(workers=2, max_queue=2) as writer:
+            for img_number in range(5):
+                writer.submit(f'{img_base}_{img_number:05d}.{img_fmt}', rgba_buffer, img_fmt)
+
+        for img_number in range(5):
+            assert os.path.isfile(f'{img_base}_{img_number:05d}.{img_fmt}')
+
+    def test_queue_depth_bounded(self, tmp_path, rgba_buffer):
+        """Test if the number of pending frames never exceeds the queue depth."""
+        writer = FrameWriter(workers=1, max_queue=3)
+        for img_number in range(10):
+            writer.submit(os.path.join(tmp_path, f'dv_{img_number:05d}.png'), rgba_buffer, 'png')
+            assert len(writer.pending) <= 3
+        written = writer.flush()
+        writer.close()
+        assert writer.queue_depth == 0
+        assert len(written) == 10
+
+    def test_buffer_copied(self, tmp_path, rgba_buffer):
+        """Test if the canvas can be reused right after the frame is submitted."""
+        import matplotlib.image as mpimg
+        file_name = os.path.join(tmp_path, 'dv_00000.png')
+        with FrameWriter(workers=1) as writer:
+            writer.submit(file_name, rgba_buffer, 'png')
+            rgba_buffer[...] = 0
+        assert mpimg.imread(file_name)[0, 0, 0] == 1.0
+
+    @pytest.mark.parametrize('workers, max_queue', [(0, 4), (2, 0)])
+    def test_invalid_arguments(self, workers, max_queue):
+        """Test if invalid pool sizes raise a ValueError."""
+        with pytest.raises(ValueError):
+            FrameWriter(workers=workers, max_queue=max_queue)
@@ -0,0 +1,104 @@
+"""
+This is the Test Hybrid file which tests if all the functions in hybrid.py
+runs properly with the Biosim package written for the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import random
+import numpy as np
+import pytest
+from biosim.hybrid import HybridMap
+from biosim.map import Map
+from biosim.simulation import BioSim
+
+
+class TestHybrid:
+
+    def test_dense_cells(self, island_map, animals):
+        """Test if only the cells above the threshold keep cohorts."""
+        island = HybridMap(island_map, seed=1, threshold=50)
+        island.add_population([{'loc': (2, 2), 'pop': animals('Herbivore', 60)},
+                               {'loc': (3, 3), 'pop': animals('Herbivore', 40)}])
+        dense = island.livable_index[1, 1]
+        assert list(np.flatnonzero(island.dense)) == [dense]
+        assert island.counts['Herbivore'].sum() == 60
+        assert island.livable_dict[(1, 1)].initial_population['Herbivore'] == []
+        assert island.get_pop_tot_num_herb() == 100
+
+    def test_hysteresis(self, island_map, animals):
+        """Test if a dense cell turns sparse only below hysteresis times the threshold."""
+        island = HybridMap(island_map, seed=1, threshold=50, hysteresis=0.5)
+        island.add_population([{'loc': (3, 3), 'pop': animals('Herbivore', 60)}])
+        cell = island.livable_index[2, 2]
+        island.counts['Herbivore'][cell] *= 0
+        island.add_population([{'loc': (3, 3), 'pop': animals('Herbivore', 30)}])
+        assert island.dense[cell]
+        island.counts['Herbivore'][cell] *= 0
+        island.add_population([{'loc': (3, 3), 'pop': animals('Herbivore', 20, age=7)}])
+        assert not island.dense[cell]
+        ages = [animal.age for animal in
+                island.livable_dict[(2, 2)].initial_population['Herbivore']]
+        assert ages == [7] * 20
+
+    def test_add_to_dense_cell(self, island_map, animals):
+        """Test if animals added to a dense cell join its cohorts."""
+        island = HybridMap(island_map, seed=1, threshold=50)
+        island.add_population([{'loc': (3, 3), 'pop': animals('Herbivore', 60)}])
+        island.add_population([{'loc': (3, 3), 'pop': animals('Carnivore', 5)}])
+        assert island.counts['Carnivore'].sum() == 5
+        assert island.get_pop_tot_num_carn() == 5
+
+    @pytest.mark.parametrize('options', [{'threshold': 0}, {'hysteresis': 0},
+                                         {'hysteresis': 1.5}])
+    def test_invalid_options(self, island_map, options):
+        """Test if invalid thresholds raise a ValueError."""
+        with pytest.raises(ValueError):
+            HybridMap(island_map, seed=1, **options)
+
+    def test_migration_between_modes(self, island_map, animals):
+        """Test if animals migrating between sparse and dense cells are kept."""
+        random.seed(1)
+        island = HybridMap(island_map, seed=1, threshold=500)
+        island.add_population([{'loc': (3, 3), 'pop': animals('Herbivore', 1000)},
+                               {'loc': (2, 3), 'pop': animals('Herbivore', 100)}])
+        island.migrate()
+        sparse = island.livable_dict[(1, 2)]
+        assert island.get_pop_tot_num_herb() == 1100
+        assert island.counts['Herbivore'][~island.dense].sum() == 0
+        assert len(sparse.after_migration_population['Herbivore']) > 0
+        assert np.array(island.get_pop_matrix_herb())[2, 2] < 1000
+
+    def test_same_as_individual_engine(self, animals):
+        """Test if the mean number of herbivores follows the individual engine."""
+        island_map = "WWWW\nWLLW\nWWWW"
+        ini_pop = [{'loc': (2, 2), 'pop': animals('Herbivore', 50)}]
+        totals = {'individual': [], 'hybrid': []}
+        for seed in range(10):
+            random.seed(seed)
+            individual = Map(island_map)
+            individual.add_population(ini_pop)
+            random.seed(seed)
+            hybrid = HybridMap(island_map, seed=seed, threshold=100)
+            hybrid.add_population(ini_pop)
+            for _ in range(15):
+                individual.yearly_cycle()
+                hybrid.yearly_cycle()
+            totals['individual'].append(individual.get_pop_tot_num_herb())
+            totals['hybrid'].append(hybrid.get_pop_tot_num_herb())
+        assert np.mean(totals['hybrid']) == pytest.approx(np.mean(totals['individual']),
+                                                          rel=0.1)
+
+    def test_biosim_engine(self, island_map, animals):
+        """Test if BioSim runs the hybrid engine reproducibly."""
+        ini_pop = [{'loc': (3, 3), 'pop': animals('Herbivore', 150) +
+                    animals('Carnivore', 20)}]
+        sims = []
+        for _ in range(2):
+            sims.append(BioSim(island_map, ini_pop, seed=4, vis_years=0, engine='hybrid',
+                               engine_options={'threshold': 100}))
+            sims[-1].simulate(5)
+        assert sims[0].num_animals_per_species == sims[1].num_animals_per_species
+        assert len(sims[0].weight_animals_per_species()['Herbivore']) == \
+            sims[0].num_animals_per_species['Herbivore']
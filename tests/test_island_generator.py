@@ -0,0 +1,86 @@
+"""
+This is the Test Island Generator file which tests if all the functions in island_generator.py
+runs properly with the Biosim package written for the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import numpy as np
+import pytest
+from biosim.island_generator import IslandGenerator
+from biosim.map import Map
+from biosim.simulation import BioSim
+
+
+class TestIslandGenerator:
+
+    @pytest.mark.parametrize('rows, cols, complexity', [(3, 3, 0.0), (10, 25, 0.5),
+                                                        (40, 17, 1.0)])
+    def test_valid_map(self, rows, cols, complexity):
+        """Test if the generated island is accepted by Map and has the requested size."""
+        island_map = IslandGenerator(seed=1).island_map(rows, cols,
+                                                        coast_complexity=complexity)
+        lines = island_map.splitlines()
+        assert len(lines) == rows
+        assert all(len(line) == cols for line in lines)
+        Map(island_map)
+
+    def test_deterministic(self):
+        """Test if the same seed gives the same island and population."""
+        maps = [IslandGenerator(seed=7).island_map(20, 20) for _ in range(2)]
+        assert maps[0] == maps[1]
+        pops = [IslandGenerator(seed=7).population(maps[0], herbivore_density=3)
+                for _ in range(2)]
+        assert pops[0] == pops[1]
+
+    def test_fractions(self):
+        """Test if the shares of land and of the land types are met."""
+        codes = IslandGenerator(seed=3).landscape_codes(52, 52, land_fraction=0.5, lowland=2,
+                                                        highland=1, desert=1)
+        inner = codes[1:-1, 1:-1]
+        land = np.count_nonzero(inner)
+        assert land == inner.size // 2
+        assert np.count_nonzero(inner == 1) == land // 2
+        assert abs(np.count_nonzero(inner == 2) - land / 4) <= 1
+        assert np.count_nonzero(codes[[0, -1], :]) == 0
+        assert np.count_nonzero(codes[:, [0, -1]]) == 0
+
+    def test_single_land_type(self):
+        """Test if a land type with share zero does not appear."""
+        island_map = IslandGenerator(seed=5).island_map(15, 15, land_fraction=1.0, lowland=1,
+                                                        highland=0, desert=0)
+        assert set(island_map) == {'W', 'L', '\n'}
+
+    @pytest.mark.parametrize('kwargs', [{'rows': 2, 'cols': 5}, {'land_fraction': 1.5},
+                                        {'lowland': 0, 'highland': 0, 'desert': 0},
+                                        {'coast_complexity': -1}])
+    def test_invalid_arguments(self, kwargs):
+        """Test if invalid arguments raise a ValueError."""
+        arguments = {'rows': 10, 'cols': 10}
+        arguments.update(kwargs)
+        with pytest.raises(ValueError):
+            IslandGenerator(seed=1).landscape_codes(**arguments)
+
+    def test_exact_population(self):
+        """Test if exact densities give the exact number of animals on livable cells only."""
+        generator = IslandGenerator(seed=11)
+        island_map = generator.island_map(12, 12, land_fraction=0.5)
+        codes = generator.map_to_codes(island_map)
+        livable = np.count_nonzero(codes)
+        arrays = generator.population_arrays(island_map, herbivore_density=4,
+                                             carnivore_density=1, exact=True)
+        assert np.count_nonzero(arrays['species'] == 0) == 4 * livable
+        assert np.count_nonzero(arrays['species'] == 1) == livable
+        assert np.all(codes[arrays['row'] - 1, arrays['col'] - 1] > 0)
+
+    def test_population_in_simulation(self):
+        """Test if the ini_pop list can be used to start a simulation."""
+        generator = IslandGenerator(seed=2)
+        island_map = generator.island_map(8, 8)
+        ini_pop = generator.population(island_map, herbivore_density=3, carnivore_density=1,
+                                       exact=True, age=(1, 10), weight=(10.0, 30.0))
+        sim = BioSim(island_map, ini_pop, seed=1, vis_years=0)
+        total = sum(len(cell['pop']) for cell in ini_pop)
+        assert sim.num_animals == total
+        sim.simulate(2)
@@ -0,0 +1,165 @@
+"""
+This is the Test Job Server file which tests if all the functions in job_server.py
+runs properly with the Biosim package written for the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import json
+import os
+import signal
+import time
+import urllib.error
+import urllib.request
+import pytest
+from biosim.job_server import JobServer
+from biosim.map import Map
+from biosim.simulation import BioSim
+
+
+@pytest.fixture
+def job(island_map, animals):
+    """Return the function making a job spec with both species."""
+    def make(num_years=12, seed=1, **options):
+        return dict(island_map=island_map, seed=seed, num_years=num_years,
+                    ini_pop=[{'loc': [2, 2], 'pop': animals('Herbivore', 50)},
+                             {'loc': [3, 3], 'pop': animals('Carnivore', 5)}], **options)
+    return make
+
+
+def expected_totals(spec):
+    """Return the per-year totals of the job simulated without the server."""
+    ini_pop = [dict(entry, loc=tuple(entry['loc'])) for entry in spec['ini_pop']]
+    sim = BioSim(spec['island_map'], ini_pop, spec['seed'], vis_years=0)
+    sim.add_schedule(spec.get('schedule', []))
+    return [dict(year=snapshot.year, **snapshot.totals)
+            for snapshot in sim.iter_years(spec['num_years'])]
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Return a job server with two workers."""
+    job_server = JobServer(str(tmp_path), workers=2, checkpoint_years=3)
+    yield job_server
+    job_server.shutdown()
+
+
+class TestJobServer:
+
+    def test_run(self, job, server):
+        """Test if a job streams the totals of an ordinary simulation."""
+        spec = job()
+        job_id = server.submit(spec)
+        assert list(server.statistics(job_id)) == expected_totals(spec)
+        state = server.wait(job_id, timeout=30)
+        assert state['status'] == 'done' and state['years_done'] == 12
+        assert not os.listdir(server.directory)
+
+    def test_parameters_reset(self, job, tmp_path):
+        """Test if the parameters of a job do not change later jobs of the same worker."""
+        with JobServer(str(tmp_path), workers=1, checkpoint_years=5) as server:
+            first = server.submit(job(animal_parameters={'Herbivore': {'zeta': 0.5}}))
+            second = server.submit(job())
+            server.wait(second, timeout=30)
+            assert server.wait(first)['status'] == 'done'
+            assert list(server.statistics(second)) == expected_totals(job())
+
+    def test_schedule(self, job, animals, server):
+        """Test if a job applies its schedule, given with JSON lists."""
+        carnivores = [{'loc': [2, 3], 'pop': animals('Carnivore', 10)}]
+        job_id = server.submit(job(schedule=[[5, 'add_population', carnivores]]))
+        records = list(server.statistics(job_id))
+        assert records[4]['Carnivore'] < records[5]['Carnivore']
+        assert records == expected_totals(job(schedule=[(5, 'add_population', [
+            {'loc': (2, 3), 'pop': animals('Carnivore', 10)}])]))
+
+    @pytest.mark.parametrize('checkpoint_years', [4, 12])
+    def test_scheduled_parameters(self, job, tmp_path, checkpoint_years):
+        """Test if a scheduled parameter change lasts over the chunks of a job."""
+        spec = job(schedule=[[3, 'set_landscape_parameters', 'L', {'f_max': 5.0}]])
+        defaults = Map.parameter_state()
+        try:
+            expected = expected_totals(spec)
+        finally:
+            Map.restore_parameters(defaults)
+        with JobServer(str(tmp_path), workers=1, checkpoint_years=checkpoint_years) as server:
+            assert list(server.statistics(server.submit(spec))) == expected
+
+    def test_invalid_job(self, job, island_map, server):
+        """Test if incomplete jobs are refused and failing jobs report the error."""
+        with pytest.raises(ValueError):
+            server.submit({'island_map': island_map})
+        job_id = server.submit(job(animal_parameters={'Herbivore': {'unknown': 1}}))
+        state = server.wait(job_id, timeout=30)
+        assert state['status'] == 'failed' and 'unknown' in state['error']
+
+    def test_cancel(self, job, tmp_path):
+        """Test if running and queued jobs can be cancelled."""
+        with JobServer(str(tmp_path), workers=1, checkpoint_years=2) as server:
+            running = server.submit(job(num_years=10000))
+            queued = server.submit(job())
+            server.cancel(queued)
+            server.cancel(running)
+            assert server.wait(queued, timeout=30)['status'] == 'cancelled'
+            state = server.wait(running, timeout=30)
+            assert state['status'] == 'cancelled' and state['years_done'] < 10000
+
+    def test_worker_crash(self, job, server):
+        """Test if a job continues from its checkpoint after its worker was killed."""
+        spec = job(num_years=150)
+        job_id = server.submit(spec)
+        while server.jobs[job_id].describe()['years_done'] < 4:
+            time.sleep(0.01)
+        for pid in list(server.pool._processes):
+            os.kill(pid, signal.SIGKILL)
+        state = server.wait(job_id, timeout=60)
+        assert state['status'] == 'done' and state['crashes'] == 1
+        assert server.jobs[job_id].records == expected_totals(spec)
+
+    def test_http(self, job, server):
+        """Test if jobs can be submitted, followed and cancelled over HTTP."""
+        host, port = server.start()
+        base = f'http://{host}:{port}/jobs'
+        request = urllib.request.Request(base, data=json.dumps(job()).encode('utf-8'),
+                                         method='POST')
+        with urllib.request.urlopen(request) as answer:
+            assert answer.status == 201
+            job_id = json.load(answer)['id']
+        with urllib.request.urlopen(f'{base}/{job_id}/statistics?since=10') as answer:
+            lines = [json.loads(line) for line in answer]
+        assert [line['year'] for line in lines] == [10, 11]
+        with urllib.request.urlopen(f'{base}/{job_id}') as answer:
+            assert json.load(answer)['status'] == 'done'
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(urllib.request.Request(f'{base}/99', method='DELETE'))
+        assert error.value.code == 404
+
+    @pytest.mark.parametrize('schedule', [[[3, 'add_population']], [[3, 'grow', 'L']],
+                                          [[3, 'set_landscape_parameters', {'f_max': 1}]],
+                                          [3]])
+    def test_invalid_schedule(self, job, server, schedule):
+        """Test if malformed schedule items are refused before the job is queued."""
+        with pytest.raises(ValueError):
+            server.submit(job(schedule=schedule))
+        assert not server.jobs
+
+    def test_http_bad_requests(self, job, server):
+        """Test if malformed requests are answered with 400."""
+        host, port = server.start()
+        base = f'http://{host}:{port}/jobs'
+        spec = job(schedule=[[3, 'add_population']])
+        request = urllib.request.Request(base, data=json.dumps(spec).encode('utf-8'),
+                                         method='POST')
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request)
+        assert error.value.code == 400
+        job_id = server.submit(job(num_years=2))
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f'{base}/{job_id}/statistics?since=abc')
+        assert error.value.code == 400
+
+    def test_local_only(self, server):
+        """Test if the server refuses to listen on other addresses."""
+        with pytest.raises(ValueError):
+            server.start(host='0.0.0.0')
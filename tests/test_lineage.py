@@ -0,0 +1,87 @@
+"""
+This is the Test Lineage file which tests if all the functions in lineage.py and the parent
+identifiers of the animals run properly with the Biosim package written for the INF200
+project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import numpy as np
+from biosim.event_log import EventLog, EventSinks, read_events, BIRTH, DEATH, KILL, FOUND
+from biosim.lineage import LineageStore
+from biosim.simulation import BioSim
+
+
+def family():
+    """Return a store with founders 1 and 2, children 3 and 5 and grandchild 4."""
+    store = LineageStore()
+    store.add(FOUND, 0, 1, -1, 10.0)
+    store.add(FOUND, 0, 2, -1, 10.0)
+    store.year = 1
+    store.add(BIRTH, 0, 3, 1, 5.0)
+    store.add(BIRTH, 0, 5, 2, 5.0)
+    store.add(DEATH, 0, 1, -1, 9.0)
+    store.year = 2
+    store.add(BIRTH, 0, 4, 3, 5.0)
+    store.add(KILL, 0, 3, 9, 8.0)
+    store.year = 3
+    store.add(DEATH, 0, 5, -1, 9.0)
+    store.add(DEATH, 0, 2, -1, 9.0)
+    return store
+
+
+class TestLineage:
+
+    def test_arrays(self):
+        """Test if the records are ordered by identifier with their death years."""
+        ids, parents, births, deaths = family().arrays()
+        assert ids.tolist() == [1, 2, 3, 4, 5]
+        assert parents.tolist() == [0, 0, 1, 3, 2]
+        assert births.tolist() == [0, 0, 1, 2, 1]
+        assert deaths.tolist() == [1, 3, 2, -1, 3]
+
+    def test_queries(self):
+        """Test if descendants, founders and surviving lineages follow the parents."""
+        store = family()
+        assert store.descendants(1).tolist() == [3, 4]
+        assert store.descendants(4).tolist() == []
+        assert store.founders()[1].tolist() == [1, 2, 1, 1, 2]
+        assert store.surviving_lineages() == {0: 2, 1: 2, 2: 2, 3: 1}
+
+    def test_simulation(self, island_map, animals, tmp_path):
+        """Test if the store follows a simulation, next to an event log, and agrees with the
+        parents of the living animals."""
+        sim = BioSim(island_map, [{'loc': (2, 2), 'pop': animals('Herbivore', 40)},
+                                  {'loc': (2, 3), 'pop': animals('Carnivore', 5)}],
+                     seed=3, vis_years=0)
+        store = LineageStore()
+        with EventSinks(EventLog(tmp_path / 'events.bin'), store) as sinks:
+            sim.attach_event_log(sinks)
+            sim.simulate(5)
+        ids, parents, _, deaths = store.arrays()
+        living = [animal for cell in sim.map.populated_cells()
+                  for group in cell.initial_population.values() for animal in group]
+        alive = ids[deaths == -1]
+        assert sorted(animal.id for animal in living) == alive.tolist()
+        index = np.searchsorted(ids, [animal.id for animal in living])
+        assert parents[index].tolist() == [animal.parent_id for animal in living]
+        events = read_events(tmp_path / 'events.bin')
+        assert np.count_nonzero(np.isin(events['event'], [BIRTH, FOUND])) == len(store)
+        founders = ids[parents == 0]
+        assert len(founders) == 45
+        descendants = np.concatenate([store.descendants(founder) for founder in founders])
+        assert sorted(descendants.tolist()) == ids[parents != 0].tolist()
+        assert store.surviving_lineages()[0] <= 45
+
+    def test_scheduled_founders(self, island_map, animals):
+        """Test if animals added after the store was attached are founders."""
+        sim = BioSim(island_map, [{'loc': (2, 2), 'pop': animals('Herbivore', 10)}],
+                     seed=3, vis_years=0)
+        store = LineageStore()
+        sim.attach_event_log(store)
+        sim.simulate(2, schedule=[(1, 'add_population',
+                                   [{'loc': (3, 3), 'pop': animals('Carnivore', 3)}])])
+        ids, parents, births, _ = store.arrays()
+        assert np.count_nonzero(parents == 0) == 13
+        assert np.count_nonzero((parents == 0) & (births == 1)) == 3
@@ -8,9 +8,10 @@ __author__ = "Navneet Sharma and Sushant Kumar Srivastava"
 __email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
 
 import textwrap
+import numpy as np
 import pytest
 from biosim.simulation import BioSim
-from biosim.map import Map
+from biosim.map import Map, POPULATION_DTYPE
 
 
 class TestMap:
@@ -78,6 +79,34 @@ class TestMap:
         with pytest.raises(ValueError):
             Map(map_str)
 
+    def test_all_invalid_positions_reported(self):
+        """Test if 'check_invalid_maps()' reports every invalid position in one error.
+        """
+        with pytest.raises(ValueError, match=r'1,3; 2,2; 3,4'):
+            Map("WW?W\nW.LW\nWLW!\nWWWW")
+        with pytest.raises(ValueError, match=r'2,1; 3,4'):
+            Map("WWWW\nLLLW\nWLLD\nWWWW")
+        with pytest.raises(ValueError, match=r'rows :2, 4'):
+            Map("WWWW\nWLW\nWLLW\nWWWWW")
+
+    def test_non_ascii_character(self):
+        """Test if characters outside ASCII are reported at their position.
+        """
+        with pytest.raises(ValueError, match=r'2,2'):
+            Map("WWW\nWøW\nWWW")
+
+    def test_landscape_grid(self):
+        """Test if the map is parsed into the landscape code grid.
+        """
+        island_map = Map("""\
+                         WWWWW
+                         WLHDW
+                         WWWWW""")
+        assert island_map.landscape_grid.dtype == np.uint8
+        assert island_map.landscape_grid.tolist() == [[0, 0, 0, 0, 0],
+                                                      [0, 1, 2, 3, 0],
+                                                      [0, 0, 0, 0, 0]]
+
     # @pytest.fixture(autouse=True)
     def test_cell_list(self):
         """Test if the method 'geo_list()' generates a
@@ -217,3 +246,71 @@ class TestMap:
         t_sim, loc = create_map_for_test
         len_neighbours_at_loc_01 = len(t_sim.map.create_neighbours_dict()[loc[0] - 1, loc[0]])
         assert len_neighbours_at_loc_01 == 3
+
+    def test_water_cells_implicit(self):
+        """Test if only livable cells are stored and Water positions share one Water cell.
+        """
+        island_map = Map("WWWW\nWLHW\nWDWW\nWWWW")
+        assert len(island_map.livable_list) == 3
+        assert set(island_map.livable_cell_calculate()) == {(1, 1), (1, 2), (2, 1)}
+        assert len(island_map.cells_dict) == 16
+        assert island_map.cells_dict[(0, 0)] is island_map.cells_dict[(2, 2)]
+        assert type(island_map.cells_dict[(2, 2)]).__name__ == 'Water'
+        assert island_map.cells_dict[(1, 2)] is island_map.livable_dict[(1, 2)]
+        with pytest.raises(KeyError):
+            island_map.cells_dict[(4, 0)]
+
+    def test_neighbour_table(self):
+        """Test if the neighbour table holds the livable index of the neighbours, -1 for Water.
+        """
+        island_map = Map("WWWW\nWLHW\nWDWW\nWWWW")
+        index = island_map.livable_index
+        expected = [-1, -1, index[2, 1], index[1, 2]]
+        assert island_map.neighbour_table[index[1, 1]].tolist() == expected
+        assert island_map.neighbours_dict[(1, 1)][0] is island_map.water_cell
+
+    def test_memory_report(self):
+        """Test if the memory is reported per livable cell.
+        """
+        report = Map("WWWW\nWLHW\nWDWW\nWWWW").memory_report()
+        assert report['livable_cells'] == 3
+        assert report['water_cells'] == 13
+        assert report['bytes_per_livable_cell'] > 0
+
+    def test_add_population_arrays(self):
+        """Test if the bulk path creates the same animals as the population list.
+        """
+        population = [{'loc': (2, 2), 'pop': [{'species': 'Herbivore', 'age': age, 'weight': 15.0}
+                                              for age in range(4)]},
+                      {'loc': (2, 3), 'pop': [{'species': 'Carnivore', 'age': 3, 'weight': 0}]}]
+        from_list = Map("WWWW\nWLHW\nWWWW")
+        from_list.add_population(population)
+        from_arrays = Map("WWWW\nWLHW\nWWWW")
+        from_arrays.add_population_arrays(np.array([[2, 2]] * 4 + [[2, 3]]),
+                                          np.array(['Herbivore'] * 4 + ['Carnivore']),
+                                          np.array([0, 1, 2, 3, 3]),
+                                          np.array([15.0] * 4 + [0.0]))
+        for loc, cell in from_list.livable_dict.items():
+            for species, animals in cell.initial_population.items():
+                bulk = from_arrays.livable_dict[loc].initial_population[species]
+                assert [dict(vars(animal), id=None) for animal in bulk] == \
+                    [dict(vars(animal), id=None) for animal in animals]
+                assert all(type(animal).__name__ == species for animal in bulk)
+
+    def test_add_population_structured(self):
+        """Test if a structured array is accepted and the columns are checked.
+        """
+        records = np.zeros(3, dtype=POPULATION_DTYPE)
+        records['row'], records['col'] = 2, 3
+        records['species'] = [0, 1, 1]
+        records['age'], records['weight'] = 4, 30.0
+        island_map = Map("WWWW\nWLHW\nWWWW")
+        island_map.add_population_arrays(records)
+        assert island_map.count_total('Carnivore') == 2
+        records['weight'][0] = -1.0
+        with pytest.raises(ValueError):
+            island_map.add_population_arrays(records)
+        with pytest.raises(KeyError):
+            island_map.add_population_arrays(np.array([[9, 9]]), np.array([0]), np.array([1]),
+                                             np.array([10.0]))
+        assert island_map.count_total('Carnivore') == 2
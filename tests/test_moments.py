@@ -0,0 +1,110 @@
+"""
+This is the Test Moments file which tests if all the functions in moments.py and the moments
+kept by the landscape cells run properly with the Biosim package written for the INF200
+project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from biosim.fauna import Herbivore
+from biosim.map import Map
+from biosim.moments import accumulate, cell_summary, combine, MOMENT_KEYS
+from biosim.simulation import BioSim
+from biosim.visualization import Visualization
+
+
+@pytest.fixture
+def population(animals):
+    """Return an ini_pop with both species."""
+    return [{'loc': (2, 2), 'pop': animals('Herbivore', 100)},
+            {'loc': (3, 3), 'pop': animals('Herbivore', 30, weight=35.0)},
+            {'loc': (3, 3), 'pop': animals('Carnivore', 10)}]
+
+
+class TestMoments:
+
+    def test_accumulate_and_combine(self):
+        """Test if the running moments and their merge equal numpy's mean and variance."""
+        rng = np.random.default_rng(2)
+        groups = [[Herbivore(age, weight) for age, weight in
+                   zip(rng.integers(0, 30, size), rng.uniform(1, 60, size))]
+                  for size in (5, 0, 40)]
+        raw = np.array([accumulate(group) for group in groups])
+        weights = np.array([animal.weight for group in groups for animal in group])
+        fitness = np.array([animal.fitness for group in groups for animal in group])
+        summary = cell_summary(raw)
+        assert summary['count'].tolist() == [5, 0, 40]
+        assert summary['weight_mean'][2] == pytest.approx(np.mean(weights[5:]))
+        assert np.isnan(summary['fitness_var'][1])
+        island = combine(raw)
+        assert island['count'] == 45
+        assert island['weight_mean'] == pytest.approx(weights.mean())
+        assert island['weight_var'] == pytest.approx(weights.var())
+        assert island['fitness_var'] == pytest.approx(fitness.var())
+        assert all(np.isnan(combine(raw[1:2])[key]) for key in MOMENT_KEYS)
+
+    def test_cells_follow_cycle(self, island_map, population):
+        """Test if the moments updated in the death pass describe the animals of each cell."""
+        island = Map(island_map)
+        island.add_population(population)
+        island.track_moments()
+        for _ in range(3):
+            island.yearly_cycle()
+        moments = island.cell_moments('Herbivore')
+        for index, cell in enumerate(island.livable_list):
+            weights = [animal.weight for animal in cell.initial_population['Herbivore']]
+            assert moments['count'][index] == len(weights)
+            if weights:
+                assert moments['weight_mean'][index] == pytest.approx(np.mean(weights))
+                assert moments['weight_var'][index] == pytest.approx(np.var(weights))
+        fitness = island.get_pop_fitness_herb()
+        assert island.island_moments('Herbivore')['fitness_var'] == pytest.approx(
+            np.var(fitness))
+
+    def test_added_animals(self, island_map, animals, population):
+        """Test if animals added while tracking count at once, also on Water."""
+        sim = BioSim(island_map, population, seed=8, vis_years=0)
+        sim.track_moments()
+        sim.add_population([{'loc': (2, 2), 'pop': animals('Herbivore', 10, weight=50.0)},
+                            {'loc': (1, 1), 'pop': animals('Herbivore', 5)}])
+        moments = sim.map.island_moments('Herbivore')
+        assert moments['count'] == 145
+        assert moments['weight_mean'] == pytest.approx(np.mean(sim.map.get_pop_weight_herb()))
+        sim.simulate(2)
+        assert sim.map.island_moments('Herbivore')['count'] == \
+            len(sim.map.get_pop_weight_herb())
+
+    def test_recorded(self, island_map, population):
+        """Test if the simulation records the moments of every year, nan before tracking."""
+        sim = BioSim(island_map, population, seed=8, vis_years=0)
+        sim.simulate(1)
+        sim.track_moments()
+        sim.simulate(2)
+        moments = sim.statistics.moment_arrays()['Carnivore']
+        assert len(moments['weight_mean']) == len(sim.statistics)
+        assert np.isnan(moments['weight_mean'][:2]).all()
+        assert moments['weight_mean'][-1] == pytest.approx(np.mean(sim.map.get_pop_weight_carn()))
+
+    def test_needs_individuals(self, island_map, population):
+        """Test if the cohort engine refuses to keep moments per cell."""
+        sim = BioSim(island_map, population, seed=8, vis_years=0, engine='cohort')
+        with pytest.raises(RuntimeError):
+            sim.track_moments()
+
+    def test_overlays(self):
+        """Test if the overlay lines mark mean and standard deviation, and hide for nan."""
+        vis = Visualization()
+        vis.fig, (vis.ax_weight, vis.ax_fitness) = plt.subplots(1, 2)
+        nan = dict.fromkeys(MOMENT_KEYS, np.nan)
+        vis.update_moment_overlays({'Herbivore': {'weight_mean': 20.0, 'weight_var': 4.0,
+                                                  'fitness_mean': 0.5, 'fitness_var': 0.01},
+                                    'Carnivore': nan})
+        lines = vis.moment_lines['Herbivore', 'weight']
+        assert [line.get_xdata()[0] for line in lines] == [20.0, 18.0, 22.0]
+        assert all(line.get_visible() for line in lines)
+        assert not any(line.get_visible() for line in vis.moment_lines['Carnivore', 'fitness'])
+        plt.close(vis.fig)
@@ -0,0 +1,89 @@
+"""
+This is the Test Profiler file which tests if all the functions in profiler.py runs properly
+with the Biosim package written for the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import json
+import textwrap
+import pytest
+from biosim.profiler import PhaseProfiler
+from biosim.simulation import BioSim
+
+
+class TestProfiler:
+
+    @staticmethod
+    def create_sim(**kwargs):
+        """Return a small headless simulation with herbivores and carnivores."""
+        geogr = textwrap.dedent("""\
+                                WWWWW
+                                WLLHW
+                                WDLLW
+                                WWWWW""")
+        herbs = [{'species': 'Herbivore', 'age': 5, 'weight': 20} for _ in range(40)]
+        carns = [{'species': 'Carnivore', 'age': 5, 'weight': 20} for _ in range(5)]
+        ini_pop = [{'loc': (2, 2), 'pop': herbs + carns}]
+        return BioSim(geogr, ini_pop, seed=4321, vis_years=0, **kwargs)
+
+    def test_add_and_report(self):
+        """Test if the report sums time and counts and computes the shares."""
+        profiler = PhaseProfiler()
+        profiler.add('birth', 1.0, count=2)
+        profiler.add('birth', 1.0, count=2)
+        profiler.add('death', 2.0)
+        report = profiler.report()
+        assert report['birth'] == {'time': 2.0, 'count': 4, 'mean': 0.5, 'share': 0.5}
+        assert report['death']['share'] == 0.5
+        assert report['rendering'] == {'time': 0.0, 'count': 0, 'mean': 0.0, 'share': 0.0}
+
+    def test_unknown_phase(self):
+        """Test if an unknown phase raises a ValueError."""
+        with pytest.raises(ValueError):
+            PhaseProfiler().add('sleeping', 1.0)
+
+    def test_simulation_report(self):
+        """Test if all phases of the yearly cycle are timed during a simulation."""
+        sim = self.create_sim(profile=True)
+        sim.simulate(5)
+        report = sim.profile_report()
+        assert set(report) == set(PhaseProfiler.phases)
+        for phase in ('birth', 'grazing', 'predation', 'migration', 'aging', 'weight_loss',
+                      'death'):
+            assert report[phase]['count'] > 0
+            assert report[phase]['time'] > 0
+
+    def test_profiling_keeps_results(self):
+        """Test if profiling does not change the outcome of a seeded simulation."""
+        plain = self.create_sim()
+        plain.simulate(5)
+        profiled = self.create_sim(profile=True)
+        profiled.simulate(5)
+        assert plain.num_animals_per_species == profiled.num_animals_per_species
+
+    def test_report_disabled(self):
+        """Test if asking for a report without profiling raises a RuntimeError."""
+        sim = self.create_sim()
+        assert sim.map.profiler is None
+        with pytest.raises(RuntimeError):
+            sim.profile_report()
+
+    def test_chrome_trace(self, tmp_path):
+        """Test if the exported trace is valid trace-event JSON with one event per phase."""
+        sim = self.create_sim(profile_trace=True)
+        sim.simulate(3)
+        file_name = tmp_path / 'trace.json'
+        sim.export_profile_trace(file_name)
+        with open(file_name) as fh:
+            trace = json.load(fh)
+        events = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+        assert {event['name'] for event in events} == {
+            'birth', 'grazing', 'predation', 'migration', 'aging', 'weight_loss', 'death'}
+        assert {event['args']['year'] for event in events} == {0, 1, 2, 3}
+
+    def test_trace_disabled(self, tmp_path):
+        """Test if exporting a trace without trace events raises a RuntimeError."""
+        with pytest.raises(RuntimeError):
+            PhaseProfiler().export_chrome_trace(tmp_path / 'trace.json')
@@ -0,0 +1,93 @@
+"""
+This is the Test Quantiles file which tests if all the functions in quantiles.py and the
+quantile tracking of the simulation run properly with the Biosim package written for the
+INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import numpy as np
+import pytest
+from biosim.map import Map
+from biosim.quantiles import QuantileSketch, REPORTED_QUANTILES
+from biosim.simulation import BioSim
+
+
+@pytest.fixture
+def population(animals):
+    """Return an ini_pop with both species."""
+    return [{'loc': (2, 2), 'pop': animals('Herbivore', 150)},
+            {'loc': (3, 3), 'pop': animals('Carnivore', 20)}]
+
+
+class TestQuantiles:
+
+    def test_exact(self):
+        """Test if a small sketch gives the quantiles of numpy's inverted_cdf method."""
+        values = [3.0, 1.0, 2.0, 5.0, 4.0, 2.0]
+        quantiles = [0, 0.2, 0.5, 0.51, 0.95, 1]
+        sketch = QuantileSketch(values)
+        assert sketch.quantile(quantiles).tolist() == \
+            np.quantile(values, quantiles, method='inverted_cdf').tolist()
+        assert sketch.quantile(0.5) == 2.0
+        assert np.isnan(QuantileSketch().quantile(0.5))
+
+    def test_merged_rank_error(self):
+        """Test if merged compressed sketches stay within the rank error bound."""
+        values = np.random.default_rng(5).lognormal(2, 1, 50000)
+        sketch = QuantileSketch.merge([QuantileSketch(part, size=100)
+                                       for part in np.array_split(values, 40)], size=100)
+        assert len(sketch) == 100
+        assert sketch.count == pytest.approx(len(values))
+        for q in (0.05, 0.5, 0.95):
+            assert abs(np.mean(values <= sketch.quantile(q)) - q) <= 2 / 100
+
+    def test_cells_merge_exactly(self, island_map, population):
+        """Test if the island sketch of small cells equals the quantiles of all animals."""
+        island = Map(island_map)
+        island.add_population(population)
+        island.track_quantiles(1000)
+        for _ in range(3):
+            island.yearly_cycle()
+        weights = island.get_pop_weight_herb()
+        sketch = island.quantile_sketch('Herbivore', 'weight')
+        assert sketch.count == len(weights)
+        assert sketch.quantile(REPORTED_QUANTILES).tolist() == \
+            np.quantile(weights, REPORTED_QUANTILES, method='inverted_cdf').tolist()
+        with pytest.raises(KeyError):
+            island.quantile_sketch('Herbivore', 'height')
+
+    def test_added_animals(self, island_map, animals, population):
+        """Test if animals added while tracking are sketched at once, also on Water."""
+        sim = BioSim(island_map, population, seed=6, vis_years=0)
+        sim.track_quantiles(32)
+        sim.add_population([{'loc': (2, 2), 'pop': animals('Herbivore', 10, age=40)},
+                            {'loc': (1, 1), 'pop': animals('Herbivore', 5)}])
+        assert sim.map.quantile_sketch('Herbivore', 'age').count == 165
+        sim.simulate(2)
+        assert sim.map.quantile_sketch('Herbivore', 'age').count == \
+            len(sim.map.get_pop_age_herb())
+
+    def test_recorded(self, island_map, population):
+        """Test if the simulation records one row of quantiles per year."""
+        sim = BioSim(island_map, population, seed=6, vis_years=0)
+        sim.simulate(2)
+        sim.track_quantiles(size=50)
+        sim.simulate(3)
+        quantiles = sim.statistics.quantile_arrays()
+        fitness = quantiles['Herbivore']['fitness']
+        assert fitness.shape == (len(sim.statistics), len(REPORTED_QUANTILES))
+        assert np.isnan(fitness[:3]).all()
+        assert np.all(np.diff(fitness[3:], axis=1) >= 0)
+        assert np.all((fitness[3:] >= 0) & (fitness[3:] <= 1))
+
+    @pytest.mark.parametrize('engine', ['cohort', 'super'])
+    def test_engines(self, island_map, engine, population):
+        """Test if engines without single animals give quantiles from their arrays."""
+        sim = BioSim(island_map, population, seed=6, vis_years=0, engine=engine)
+        sim.track_quantiles()
+        sim.simulate(2)
+        ages = sim.statistics.quantile_arrays()['Carnivore']['age']
+        assert ages.shape == (3, 3)
+        assert not np.isnan(ages).any()
@@ -0,0 +1,92 @@
+"""
+This is the Test Result Cache file which tests if all the functions in result_cache.py
+runs properly with the Biosim package written for the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import os
+import random
+import numpy as np
+from biosim.fauna import Herbivore
+from biosim.landscape import Lowland
+from biosim.result_cache import ResultCache
+from biosim.simulation import BioSim
+
+ISLAND = """\
+WWWW
+WLLW
+WWWW"""
+
+INI_POP = [{'loc': (2, 2), 'pop': [{'species': 'Herbivore', 'age': 5, 'weight': 20.0}] * 20}]
+
+
+class TestResultCache:
+
+    def test_hit(self, tmp_path):
+        """Test if an identical run is loaded from the cache."""
+        cache = ResultCache(str(tmp_path))
+        first = cache.simulate(ISLAND, INI_POP, seed=1, num_years=5)
+        second = cache.simulate(ISLAND, INI_POP, seed=1, num_years=5)
+        assert (cache.misses, cache.hits) == (1, 1)
+        assert second.statistics.years == first.statistics.years
+        assert second.num_animals_per_species == first.num_animals_per_species
+
+    def test_resume_like_uninterrupted(self, tmp_path):
+        """Test if a longer run resumes from the cached run and matches a run without cache."""
+        cache = ResultCache(str(tmp_path))
+        cache.simulate(ISLAND, INI_POP, seed=2, num_years=5)
+        resumed = cache.simulate(ISLAND, INI_POP, seed=2, num_years=9)
+        direct = BioSim(ISLAND, INI_POP, seed=2, vis_years=0)
+        direct.simulate(9)
+        assert cache.resumed == 1
+        assert resumed.year == 9
+        totals = resumed.statistics.as_arrays()
+        expected = direct.statistics.as_arrays()
+        for key in expected:
+            assert np.array_equal(totals[key], expected[key])
+
+    def test_key_covers_inputs(self, tmp_path):
+        """Test if other seeds and parameters are separate entries."""
+        cache = ResultCache(str(tmp_path))
+        cache.simulate(ISLAND, INI_POP, seed=1, num_years=2)
+        cache.simulate(ISLAND, INI_POP, seed=3, num_years=2)
+        cache.simulate(ISLAND, INI_POP, seed=1, num_years=2,
+                       animal_parameters={'Herbivore': {'mu': 0.5}})
+        assert cache.misses == 3
+        assert Herbivore.parameters['mu'] != 0.5
+
+    def test_parameters_restored(self, tmp_path):
+        """Test if given and scheduled parameters do not outlast the call, and a hit leaves
+        the random module alone."""
+        cache = ResultCache(str(tmp_path))
+        options = dict(landscape_parameters={'L': {'f_max': 300.0}},
+                       schedule=[(2, 'set_animal_parameters', 'Herbivore', {'mu': 0.5})])
+        first = cache.simulate(ISLAND, INI_POP, seed=1, num_years=4, **options)
+        assert Lowland.parameters['f_max'] == 800.0
+        assert Herbivore.parameters['mu'] != 0.5
+        state = random.getstate()
+        second = cache.simulate(ISLAND, INI_POP, seed=1, num_years=4, **options)
+        assert random.getstate() == state
+        assert cache.hits == 1
+        assert second.statistics.years == first.statistics.years
+        assert Lowland.parameters['f_max'] == 800.0
+
+    def test_key_ignores_numpy_types(self):
+        """Test if numpy numbers in the population give the key of Python numbers."""
+        pop = [{'loc': (np.int64(2), np.int64(2)), 'pop': INI_POP[0]['pop']}]
+        assert ResultCache.scenario_key(ISLAND, pop, 1) == \
+            ResultCache.scenario_key(ISLAND, INI_POP, 1)
+
+    def test_lru_eviction(self, tmp_path):
+        """Test if the least recently used entry is removed when the cache is too large."""
+        cache = ResultCache(str(tmp_path))
+        for seed in (1, 2):
+            cache.simulate(ISLAND, INI_POP, seed=seed, num_years=1)
+        cache.simulate(ISLAND, INI_POP, seed=1, num_years=1)
+        entry_size = max(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+        cache.max_bytes = 2 * entry_size + entry_size // 2
+        cache.simulate(ISLAND, INI_POP, seed=3, num_years=1)
+        keys = [ResultCache.scenario_key(ISLAND, INI_POP, seed) for seed in (1, 2, 3)]
+        assert [cache.cached_years(key) for key in keys] == [[1], [], [1]]
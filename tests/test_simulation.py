@@ -7,6 +7,10 @@ with the Biosim package written for the INF200 project January 2023.
 __author__ = "Navneet Sharma and Sushant Kumar Srivastava"
 __email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
 
+import os
+import subprocess
+import sys
+import numpy as np
 import pytest
 
 from biosim.simulation import BioSim
@@ -157,3 +161,180 @@ class TestSimulation:
         """
         basic_sim.simulate(num_years=10)
         basic_sim.simulate(num_years=10)
+
+    def test_headless_import_skips_matplotlib(self):
+        """Test that importing the simulation module does not load the plotting stack.
+        """
+        probe = "import sys, biosim.simulation; print('matplotlib' in sys.modules)"
+        output = subprocess.check_output([sys.executable, '-c', probe], text=True)
+        assert output.strip() == 'False'
+
+    def test_headless_simulate_skips_matplotlib(self):
+        """Test that a simulation without graphics never loads the plotting stack.
+        """
+        probe = ("import sys\n"
+                 "from biosim.simulation import BioSim\n"
+                 "sim = BioSim('WWW\\nWLW\\nWWW', [], seed=1, vis_years=0)\n"
+                 "sim.simulate(3)\n"
+                 "print('matplotlib' in sys.modules)")
+        output = subprocess.check_output([sys.executable, '-c', probe], text=True)
+        assert output.strip() == 'False'
+
+    def test_close_frame_writer(self, tmp_path, monkeypatch):
+        """Test that closing the simulation writes all figures and stops the writer pool,
+        and that a later simulate call starts a new pool.
+        """
+        (tmp_path / 'run').mkdir()
+        (tmp_path / 'frames').mkdir()
+        monkeypatch.chdir(tmp_path / 'run')
+        pop = [{"species": "Herbivore", "age": 5, "weight": 20.0} for _ in range(10)]
+        with BioSim(island_map="WWWW\nWLLW\nWWWW", ini_pop=[{"loc": (2, 2), "pop": pop}],
+                    seed=1, img_dir='frames', img_base='dv', img_workers=1) as sim:
+            sim.simulate(num_years=2)
+            assert sim.frame_writer.executor is not None
+        assert sim.frame_writer is None
+        assert len(os.listdir(tmp_path / 'frames')) == 3
+        sim.simulate(num_years=1)
+        sim.close()
+        assert len(os.listdir(tmp_path / 'frames')) == 5
+
+    @pytest.fixture
+    def warm_sim(self):
+        """Return a simulation after a short herbivore-only burn-in"""
+        pop = [{"species": "Herbivore", "age": 5, "weight": 20.0} for _ in range(30)]
+        sim = BioSim(island_map="WWWW\nWLLW\nWWWW", ini_pop=[{"loc": (2, 2), "pop": pop}],
+                     seed=1, vis_years=0)
+        sim.simulate(num_years=5)
+        return sim
+
+    def test_fork_keeps_parent(self, warm_sim):
+        """Test that forked children continue from the warm state without changing it.
+        """
+        counts = warm_sim.num_animals_per_species
+        results = warm_sim.fork(3, 4, collect=lambda sim: (sim.year, sim.num_animals))
+        assert [year for year, _ in results] == [warm_sim.year + 4] * 3
+        assert warm_sim.num_animals_per_species == counts
+        assert warm_sim.year == 5
+
+    def test_fork_reproducible(self, warm_sim):
+        """Test that the children are reseeded independently and reproducibly.
+        """
+        first = warm_sim.fork(4, 5, seeds=[1, 2, 3, 1])
+        assert first == warm_sim.fork(4, 5, seeds=[1, 2, 3, 1])
+        assert first[0] == first[3]
+        assert len({tuple(result.values()) for result in first}) > 1
+
+    def test_fork_branch(self, warm_sim):
+        """Test that every child applies the branch before simulating.
+        """
+        def add_carnivores(sim, index):
+            sim.branch_index = index
+            sim.add_population([{"loc": (2, 3), "pop": [
+                {"species": "Carnivore", "age": 5, "weight": 20.0}] * 10}])
+
+        results = warm_sim.fork(2, 1, branch=add_carnivores,
+                                collect=lambda sim: (sim.branch_index,
+                                                     sim.num_animals_per_species["Carnivore"]))
+        assert [index for index, _ in results] == [0, 1]
+        assert all(carnivores > 0 for _, carnivores in results)
+        assert warm_sim.num_animals_per_species["Carnivore"] == 0
+
+    def test_fork_seeds(self, warm_sim):
+        """Test that one seed per child is required.
+        """
+        with pytest.raises(ValueError):
+            warm_sim.fork(2, 1, seeds=[1])
+
+    def test_schedule_same_as_calls(self):
+        """Test that a scheduled population gives the same run as separate simulate calls.
+        """
+        herbs = [{"loc": (2, 2), "pop": [{"species": "Herbivore", "age": 5, "weight": 20.0}
+                                         for _ in range(30)]}]
+        carns = [{"loc": (2, 3), "pop": [{"species": "Carnivore", "age": 5, "weight": 20.0}
+                                         for _ in range(5)]}]
+        manual = BioSim(island_map="WWWW\nWLLW\nWWWW", ini_pop=herbs, seed=2, vis_years=0)
+        manual.simulate(num_years=3)
+        manual.add_population(carns)
+        manual.simulate(num_years=3)
+        scheduled = BioSim(island_map="WWWW\nWLLW\nWWWW", ini_pop=herbs, seed=2, vis_years=0)
+        scheduled.simulate(num_years=7, schedule=[(4, 'add_population', carns)])
+        assert scheduled.statistics.totals == manual.statistics.totals
+        assert scheduled.schedule == []
+
+    def test_schedule_parameters(self, warm_sim):
+        """Test that parameter changes are applied just before their year.
+        """
+        from biosim.landscape import Lowland
+        f_max = Lowland.parameters['f_max']
+        warm_sim.add_schedule([(9, 'set_landscape_parameters', 'L', {'f_max': 123.0})])
+        try:
+            years = warm_sim.iter_years(5)
+            for _ in range(3):
+                next(years)
+            assert Lowland.parameters['f_max'] == f_max
+            next(years)
+            assert Lowland.parameters['f_max'] == 123.0
+        finally:
+            Lowland.set_parameters({'f_max': f_max})
+
+    def test_parameter_overrides_resume(self):
+        """Test that a pickled simulation continues with its scheduled parameters after the
+        class parameters were reset, as in another process.
+        """
+        import pickle
+        import random
+        from biosim.map import Map
+        herbs = [{"loc": (2, 2), "pop": [{"species": "Herbivore", "age": 5, "weight": 20.0}
+                                         for _ in range(40)]}]
+        defaults = Map.parameter_state()
+        schedule = [(3, 'set_landscape_parameters', 'L', {'f_max': 5.0})]
+        try:
+            plain = BioSim(island_map="WWWW\nWLLW\nWWWW", ini_pop=herbs, seed=4, vis_years=0)
+            plain.add_schedule(schedule)
+            list(plain.iter_years(10))
+            Map.restore_parameters(defaults)
+
+            resumed = BioSim(island_map="WWWW\nWLLW\nWWWW", ini_pop=herbs, seed=4,
+                             vis_years=0)
+            resumed.add_schedule(schedule)
+            list(resumed.iter_years(5))
+            data, state = pickle.dumps(resumed), random.getstate()
+            Map.restore_parameters(defaults)
+            resumed = pickle.loads(data)
+            random.setstate(state)
+            resumed.apply_parameter_overrides()
+            list(resumed.iter_years(5))
+            assert resumed.parameter_overrides == {'L': {'f_max': 5.0}}
+            assert resumed.statistics.totals == plain.statistics.totals
+        finally:
+            Map.restore_parameters(defaults)
+
+    @pytest.mark.parametrize("item", [(10, 'remove_population', []),
+                                      (2, 'add_population', [])])
+    def test_schedule_invalid(self, warm_sim, item):
+        """Test that unknown actions and past years are refused.
+        """
+        with pytest.raises(ValueError):
+            warm_sim.add_schedule([item])
+
+    @pytest.mark.parametrize("engine, options", [('individual', None), ('super', None),
+                                                 ('cohort', {'stochastic': True}),
+                                                 ('hybrid', {'threshold': 10})])
+    def test_export_population(self, engine, options):
+        """Test that the exported animals can be added to a new island.
+        """
+        from biosim.map import Map
+        pop = [{"species": "Herbivore", "age": 5, "weight": 20.0} for _ in range(30)] + \
+            [{"species": "Carnivore", "age": 3, "weight": 12.0} for _ in range(4)]
+        sim = BioSim(island_map="WWWW\nWLLW\nWWWW", ini_pop=[{"loc": (2, 2), "pop": pop}],
+                     seed=1, vis_years=0, engine=engine, engine_options=options)
+        sim.simulate(num_years=2)
+        exported = sim.export_population()
+        assert len(exported) == sim.num_animals
+        assert set(exported['species'].tolist()) <= {0, 1}
+        assert np.all(exported['fitness'] >= 0) and np.all(exported['fitness'] <= 1)
+        copy = Map("WWWW\nWLLW\nWWWW")
+        copy.add_population_arrays(exported)
+        assert copy.count_total('Herbivore') == np.sum(exported['species'] == 0)
+        if engine == 'individual':
+            assert np.array_equal(copy.export_population(), exported)
@@ -0,0 +1,98 @@
+"""
+This is the Test Snapshot file which tests if all the functions in snapshot.py and
+BioSim.iter_years runs properly with the Biosim package written for the INF200 project
+January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import numpy as np
+import pytest
+from biosim.map import Map
+from biosim.simulation import BioSim
+from biosim.snapshot import DEFAULT_HIST_SPECS, take_snapshot
+
+
+@pytest.fixture
+def population(animals):
+    """Return an ini_pop with both species."""
+    return [{'loc': (2, 2), 'pop': animals('Herbivore', 50)},
+            {'loc': (3, 3), 'pop': animals('Carnivore', 5)}]
+
+
+class TestSnapshot:
+
+    def test_take_snapshot(self, island_map, population):
+        """Test if the snapshot counts the animals of the island."""
+        island = Map(island_map)
+        island.add_population(population)
+        snapshot = take_snapshot(island, 7, matrices=True, hist_specs=DEFAULT_HIST_SPECS)
+        assert snapshot.year == 7
+        assert dict(snapshot.totals) == {'Herbivore': 50, 'Carnivore': 5}
+        assert snapshot.matrices['Herbivore'][1, 1] == 50
+        assert snapshot.matrices['Carnivore'].sum() == 5
+        assert snapshot.histograms['age']['Herbivore'].sum() == 50
+        assert set(snapshot.histograms) == set(DEFAULT_HIST_SPECS)
+
+    def test_read_only(self, island_map, population):
+        """Test if the snapshot can not be changed."""
+        island = Map(island_map)
+        island.add_population(population)
+        snapshot = take_snapshot(island, 0, matrices=True, hist_specs=DEFAULT_HIST_SPECS)
+        with pytest.raises(TypeError):
+            snapshot.totals['Herbivore'] = 0
+        with pytest.raises(ValueError):
+            snapshot.matrices['Herbivore'][1, 1] = 0
+        with pytest.raises(ValueError):
+            snapshot.histograms['weight']['Carnivore'][0] = 1
+
+    def test_optional_parts(self, island_map):
+        """Test if matrices and histograms are left out by default."""
+        island = Map(island_map)
+        snapshot = take_snapshot(island, 0)
+        assert snapshot.matrices is None and snapshot.histograms is None
+
+
+class TestIterYears:
+
+    def test_every(self, island_map, population):
+        """Test if a snapshot is yielded after every `every` years."""
+        sim = BioSim(island_map, population, seed=1, vis_years=0)
+        years = [snapshot.year for snapshot in sim.iter_years(10, every=3)]
+        assert years == [2, 5, 8]
+        assert sim.year == 9
+        assert len(sim.statistics) == 10
+
+    def test_same_as_simulate(self, island_map, population):
+        """Test if iterating gives the totals of simulate with the same seed."""
+        sim = BioSim(island_map, population, seed=3, vis_years=0)
+        totals = [snapshot.totals['Herbivore'] for snapshot in sim.iter_years(6)]
+        other = BioSim(island_map, population, seed=3, vis_years=0)
+        other.simulate(5)
+        assert totals == other.statistics.totals['Herbivore']
+
+    def test_stop_early(self, island_map, population):
+        """Test if a consumer can stop and the simulation continues afterwards."""
+        sim = BioSim(island_map, population, seed=1, vis_years=0)
+        for snapshot in sim.iter_years(100):
+            if snapshot.year == 4:
+                break
+        assert sim.year == 4 and sim.year_num == 5
+        next(sim.iter_years(1))
+        assert sim.statistics.years == list(range(6))
+
+    def test_histograms(self, island_map, population):
+        """Test if the histograms use the hist_specs of the simulation."""
+        specs = {'weight': {'max': 60, 'delta': 5}}
+        sim = BioSim(island_map, population, seed=1, vis_years=0, hist_specs=specs)
+        snapshot = next(sim.iter_years(1, matrices=True, histograms=True))
+        assert set(snapshot.histograms) == {'weight'}
+        assert np.allclose(snapshot.histograms['weight']['edges'], np.arange(0, 61, 5))
+        assert snapshot.matrices['Herbivore'].sum() == snapshot.totals['Herbivore']
+
+    def test_invalid_every(self, island_map, population):
+        """Test if a non-positive step raises a ValueError."""
+        sim = BioSim(island_map, population, seed=1, vis_years=0)
+        with pytest.raises(ValueError):
+            next(sim.iter_years(5, every=0))
@@ -0,0 +1,68 @@
+"""
+This is the Test Stop Conditions file which tests if all the functions in stop_conditions.py
+runs properly with the Biosim package written for the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import pytest
+from biosim.recorder import StatisticsRecorder
+from biosim.simulation import BioSim
+from biosim.stop_conditions import Extinction, SteadyState, Threshold
+
+
+def recorded(herbivores, carnivores):
+    """Return a StatisticsRecorder holding the given totals."""
+    statistics = StatisticsRecorder()
+    statistics.years = list(range(len(herbivores)))
+    statistics.totals = {'Herbivore': list(herbivores), 'Carnivore': list(carnivores)}
+    return statistics
+
+
+class TestStopConditions:
+
+    @pytest.mark.parametrize('condition, stops', [
+        (Extinction(), False), (Extinction('Carnivore'), True), (Extinction('Herbivore'), False),
+        (Threshold('Herbivore', below=20), True), (Threshold('Herbivore', above=20), False),
+        (SteadyState(window=3, tolerance=0.1), False)])
+    def test_check(self, condition, stops):
+        """Test if the conditions look at the last recorded totals."""
+        statistics = recorded([10, 30, 15], [4, 1, 0])
+        assert (condition.check(statistics) is not None) == stops
+
+    def test_steady_state(self):
+        """Test if the steady state needs the whole window within the band."""
+        condition = SteadyState(window=3, tolerance=0.1)
+        assert condition.check(recorded([100, 104], [0, 0])) is None
+        assert condition.check(recorded([50, 100, 104, 98], [0, 0, 0, 0])) is not None
+
+    @pytest.mark.parametrize('condition, options', [
+        (Threshold, {'species': 'Herbivore'}), (SteadyState, {'window': 1})])
+    def test_invalid(self, condition, options):
+        """Test if invalid conditions raise a ValueError."""
+        with pytest.raises(ValueError):
+            condition(**options)
+
+    def test_simulate_stops(self, island_map, animals):
+        """Test if simulate ends in the year the condition is met and records why."""
+        sim = BioSim(island_map, [{'loc': (2, 2), 'pop': animals('Carnivore', 5)}], seed=1,
+                     vis_years=0)
+        sim.simulate(50, stop=Extinction())
+        assert sim.stop_reason == 'extinction of all animals'
+        assert sim.stop_year < 50
+        assert sim.year == sim.stop_year
+        assert sim.statistics.years[-1] == sim.stop_year
+
+    def test_simulate_fill(self, island_map, animals):
+        """Test if the statistics of the skipped years repeat the stop year."""
+        sim = BioSim(island_map, [{'loc': (2, 2), 'pop': animals('Carnivore', 5)}], seed=1,
+                     vis_years=0)
+        sim.simulate(50, stop=[Threshold('Herbivore', above=1000), Extinction()], fill=True)
+        totals = sim.statistics.as_arrays()
+        assert list(totals['year']) == list(range(51))
+        assert totals['Carnivore'][-1] == 0
+        assert sim.year == 50
+        sim.simulate(5)
+        assert sim.stop_reason is None
+        assert sim.statistics.years[-1] == 56
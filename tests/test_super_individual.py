@@ -0,0 +1,156 @@
+"""
+This is the Test Super Individual file which tests if all the functions in super_individual.py
+runs properly with the Biosim package written for the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import random
+import numpy as np
+import pytest
+from biosim.fauna import Herbivore, Carnivore
+from biosim.landscape import Lowland
+from biosim.map import Map
+from biosim.simulation import BioSim
+from biosim.super_individual import SuperIndividualMap, SuperIndividuals
+
+
+class TestSuperIndividual:
+
+    def test_merge_equal_animals(self, island_map, animals):
+        """Test if equal animals in one cell are stored as one record."""
+        island = SuperIndividualMap(island_map, seed=1)
+        island.add_population([{'loc': (3, 3), 'pop': animals('Herbivore', 100)}])
+        assert len(island.records['Herbivore']) == 1
+        assert island.get_pop_tot_num_herb() == 100
+
+    @pytest.mark.parametrize('tolerance, records', [(0, 2), (0.05, 1)])
+    def test_merge_tolerance(self, tolerance, records):
+        """Test if weights within the tolerance are merged and the total weight is kept."""
+        group = SuperIndividuals([0, 0], [3, 3], [20.0, 20.4], [10, 30])
+        group.merge(tolerance)
+        assert len(group) == records
+        assert np.sum(group.weight * group.count) == pytest.approx(10 * 20.0 + 30 * 20.4)
+
+    def test_population_matrix(self, island_map, animals):
+        """Test if the population matrix counts the animals at their positions."""
+        island = SuperIndividualMap(island_map, seed=1)
+        island.add_population([{'loc': (2, 4), 'pop': animals('Carnivore', 7)}])
+        assert island.get_pop_matrix_carn()[1][3] == 7
+        assert island.get_pop_tot_num_carn() == 7
+
+    def test_cells_view(self, island_map):
+        """Test if the cells of livable positions raise a clear error, Water still works."""
+        island = SuperIndividualMap(island_map, seed=1)
+        assert island.cells_dict[(0, 0)] is island.water_cell
+        with pytest.raises(RuntimeError):
+            island.cells_dict[(1, 1)]
+
+    def test_add_population_in_water(self, island_map, animals):
+        """Test if animals placed in Water are rejected."""
+        island = SuperIndividualMap(island_map, seed=1)
+        with pytest.raises(ValueError):
+            island.add_population([{'loc': (1, 1), 'pop': animals('Herbivore', 1)}])
+
+    @pytest.mark.parametrize('options', [{'tolerance': 1.0}, {'tolerance': -0.1},
+                                         {'hunt_party': 0}])
+    def test_invalid_options(self, island_map, options):
+        """Test if invalid accuracy options raise a ValueError."""
+        with pytest.raises(ValueError):
+            SuperIndividualMap(island_map, seed=1, **options)
+
+    def test_grazing_limited_by_fodder(self, island_map, animals):
+        """Test if exactly as many herbivores eat as the fodder allows."""
+        island = SuperIndividualMap(island_map, seed=1)
+        island.add_population([{'loc': (3, 3), 'pop': animals('Herbivore', 200)}])
+        island.feed_herbivores()
+        params = Herbivore.parameters
+        fed = int(Lowland.parameters['f_max'] // params['F'])
+        weights = island.get_pop_weight_herb()
+        assert np.count_nonzero(weights > 20.0) == fed
+        assert np.max(weights) == pytest.approx(20.0 + params['beta'] * params['F'])
+
+    def test_predation_limited_by_appetite(self, island_map, animals):
+        """Test if no carnivore eats more than 'F'."""
+        island = SuperIndividualMap(island_map, seed=1)
+        island.add_population([{'loc': (3, 3),
+                                'pop': animals('Herbivore', 300, age=30, weight=5.0) +
+                                animals('Carnivore', 20, age=3, weight=40.0)}])
+        island.feed_carnivores()
+        gain = island.get_pop_weight_carn() - 40.0
+        assert island.get_pop_tot_num_herb() < 300
+        assert np.max(gain) <= Carnivore.parameters['beta'] * Carnivore.parameters['F'] + 1e-9
+
+    def test_weightless_prey(self, animals):
+        """Test if herbivores without weight are killed without feeding the carnivores."""
+        island = SuperIndividualMap("WWW\nWDW\nWWW", seed=1)
+        island.add_population([{'loc': (2, 2), 'pop': animals('Herbivore', 20, weight=0.0) +
+                                animals('Carnivore', 5, weight=0.0) +
+                                animals('Carnivore', 5, weight=20.0)}])
+        island.feed_carnivores()
+        assert island.get_pop_tot_num_herb() < 20
+        assert sorted(island.get_pop_weight_carn()) == [0.0] * 5 + [20.0] * 5
+
+    def test_no_appetite(self, island_map, animals, restore_parameters):
+        """Test if carnivores with 'F' = 0 do not hunt."""
+        sim = BioSim(island_map, [{'loc': (3, 3), 'pop': animals('Herbivore', 50, weight=5.0) +
+                                   animals('Carnivore', 5, weight=40.0)}],
+                     seed=1, vis_years=0, engine='super')
+        sim.set_animal_parameters('Carnivore', {'F': 0})
+        sim.map.feed_carnivores()
+        assert sim.map.get_pop_tot_num_herb() == 50
+        assert list(sim.map.get_pop_weight_carn()) == [40.0] * 5
+        sim.simulate(2)
+        assert sim.num_animals_per_species['Carnivore'] > 0
+
+    def test_migration_keeps_animals(self, island_map, animals):
+        """Test if migration moves animals only between livable cells."""
+        island = SuperIndividualMap(island_map, seed=1)
+        island.add_population([{'loc': (3, 3), 'pop': animals('Herbivore', 1000)}])
+        island.migrate()
+        matrix = np.array(island.get_pop_matrix_herb())
+        assert matrix.sum() == 1000
+        assert 0 < matrix[2, 2] < 1000
+        assert matrix[[0, -1], :].sum() == 0 and matrix[:, [0, -1]].sum() == 0
+
+    def test_same_as_individual_engine(self, animals):
+        """Test if the mean number of herbivores follows the individual engine."""
+        island_map = "WWW\nWLW\nWWW"
+        ini_pop = [{'loc': (2, 2), 'pop': animals('Herbivore', 50)}]
+        totals = {'individual': [], 'super': []}
+        for seed in range(10):
+            random.seed(seed)
+            individual = Map(island_map)
+            individual.add_population(ini_pop)
+            grouped = SuperIndividualMap(island_map, seed=seed)
+            grouped.add_population(ini_pop)
+            for _ in range(20):
+                individual.yearly_cycle()
+                grouped.yearly_cycle()
+            totals['individual'].append(individual.get_pop_tot_num_herb())
+            totals['super'].append(grouped.get_pop_tot_num_herb())
+        assert np.mean(totals['super']) == pytest.approx(np.mean(totals['individual']), rel=0.1)
+
+    def test_biosim_engine(self, island_map, animals):
+        """Test if BioSim runs the super-individual engine reproducibly."""
+        ini_pop = [{'loc': (3, 3), 'pop': animals('Herbivore', 150) +
+                    animals('Carnivore', 20)}]
+        sims = [BioSim(island_map, ini_pop, seed=4, vis_years=0, engine='super',
+                       engine_options={'tolerance': 0.1}) for _ in range(2)]
+        for sim in sims:
+            sim.simulate(5)
+        assert sims[0].num_animals_per_species == sims[1].num_animals_per_species
+        assert sims[0].num_animals > 0
+
+    def test_unknown_engine(self, island_map):
+        """Test if an unknown engine raises a ValueError."""
+        with pytest.raises(ValueError):
+            BioSim(island_map, [], seed=1, vis_years=0, engine='cells')
+
+    def test_profiled_cycle(self, island_map, animals):
+        """Test if the phases of the super-individual cycle are profiled."""
+        sim = BioSim(island_map, [{'loc': (3, 3), 'pop': animals('Herbivore', 10)}], seed=1,
+                     vis_years=0, engine='super', profile=True)
+        sim.simulate(2)
+        assert sim.profile_report()['grazing']['count'] == 3
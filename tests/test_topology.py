@@ -0,0 +1,94 @@
+"""
+This is the Test Topology file which tests if all the functions in topology.py
+runs properly with the Biosim package written for the INF200 project January 2023.
+"""
+
+__author__ = "Navneet Sharma and Sushant Kumar Srivastava"
+__email__ = "navneet.sharma@nmbu.no and sushant.kumar.srivastava@nmbu.no"
+
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pytest
+from biosim.cohort import CohortMap
+from biosim.map import Map
+from biosim.simulation import BioSim
+from biosim.topology import SharedTopology
+
+
+def run_seed(topology, ini_pop, seed):
+    """Simulate a few years on a worker process and return the number of animals."""
+    sim = BioSim(topology, ini_pop, seed=seed, vis_years=0)
+    sim.simulate(3)
+    return sim.map.topology is not None, sim.num_animals
+
+
+@pytest.fixture
+def island_map():
+    """Return an island with Lowland, Highland and Desert cells."""
+    return """\
+WWWWWW
+WLLHDW
+WLHLLW
+WWWWWW"""
+
+
+@pytest.fixture
+def topology(island_map):
+    """Share the topology of the island and unlink it after the test."""
+    with Map(island_map).share_topology() as shared:
+        yield shared
+
+
+class TestSharedTopology:
+
+    def test_same_arrays(self, island_map, topology):
+        """Test if a map built from the topology has the arrays of the parsed map."""
+        parsed, attached = Map(island_map), Map(topology)
+        for key in ('landscape_grid', 'livable_locs', 'livable_index', 'neighbour_table'):
+            assert np.array_equal(getattr(parsed, key), getattr(attached, key))
+        assert attached.neighbours_dict.keys() == parsed.neighbours_dict.keys()
+        assert set(topology.arrays) == {'landscape_grid', 'livable_locs', 'livable_index',
+                                        'neighbour_table'}
+
+    def test_map_string(self, island_map, topology):
+        """Test if the topology gives back the map string."""
+        assert str(topology) == island_map
+
+    def test_read_only(self, topology):
+        """Test if attached arrays cannot be changed."""
+        with pytest.raises(ValueError):
+            Map(topology).neighbour_table[0, 0] = 3
+
+    def test_pickle_attaches(self, topology):
+        """Test if unpickling attaches to the same blocks instead of copying the arrays."""
+        attached = pickle.loads(pickle.dumps(topology))
+        assert not attached.owner
+        assert attached.descriptor == topology.descriptor
+        assert np.array_equal(attached.arrays['livable_index'], topology.arrays['livable_index'])
+        with pytest.raises(RuntimeError):
+            attached.unlink()
+
+    def test_unlinked(self, island_map):
+        """Test if a topology cannot be attached after it was unlinked."""
+        shared = Map(island_map).share_topology()
+        descriptor = shared.descriptor
+        shared.unlink()
+        shared.close()
+        with pytest.raises(FileNotFoundError):
+            SharedTopology.attach(descriptor)
+
+    def test_engines(self, animals, topology):
+        """Test if the engines simulate on an attached topology like on the map string."""
+        island = CohortMap(topology, seed=1)
+        island.add_population([{'loc': (2, 3), 'pop': animals('Herbivore', 10)}])
+        island.yearly_cycle()
+        assert island.get_pop_tot_num_herb() > 0
+
+    def test_workers(self, animals, topology):
+        """Test if worker processes simulate on the shared topology."""
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(run_seed, [topology] * 2,
+                                    [[{'loc': (2, 2), 'pop': animals('Herbivore', 20)}]] * 2,
+                                    [1, 2]))
+        assert all(attached and number > 0 for attached, number in results)